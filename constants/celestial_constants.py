@@ -1,4 +1,4 @@
-__all__ = ['kAUm', 'kG_E', 'kr_E', 'kJ2', 'kJ3', 'kJ4', 'kAE']
+__all__ = ['kAUm', 'kG_E', 'kr_E', 'kJ2', 'kJ3', 'kJ4', 'kAE', 'kr_Sun']
 
 kAUm = 149597870691
 kG_E = 398600.8
@@ -7,3 +7,4 @@ kJ2 = +1.0826158*(10**(-3))
 kJ3 = -2.5388100*(10**(-6))
 kJ4 = -1.6559700*(10**(-6))
 kAE = 1.0
+kr_Sun = 696000.0
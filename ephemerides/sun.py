@@ -1,6 +1,14 @@
 import numpy as np
 from acstoolbox.constants.celestial_constants import *
 from acstoolbox.constants.time_constants import *
+from acstoolbox.foundation.files import LoadVersionedArrays, SaveVersionedArrays
+
+
+# Number of epochs evaluated at once by Sun.GetMODFromJSJ2000UTC.
+SUN_CHUNK_SIZE = 1 << 20
+
+# Format version of saved Sun tables.
+SUN_TABLE_VERSION = 1
 
 
 def Wrap(deg):
@@ -18,19 +26,24 @@ def DegToRad(deg):
 # -----------------------------------------------------------------------
 # -----------------------------------------------------------------------
 class Sun:
-    def __init__(self, time):
+    def __init__(self, time, out_of_range="clamp"):
         """Low Precision Sun Vector
         Source: Astronomical Almanac 1992:C24
         Accuracy: 0.01 deg
 
         Inputs: 1. Clock object, UTC time
+                2. out_of_range: dUT1 of epochs outside the EOP table, "clamp"ed to
+                   the table bounds or "raise" a ValueError
         Output: 1. Sun vector in MOD frame
 
         Comments: This is a low precision algorithm with an accuracy of 0.01 degrees
-                  in the Mean of Date (MOD) frame.
+                  in the Mean of Date (MOD) frame. dUT1 (below 0.9 s, i.e. about
+                  1e-5 deg of Sun motion) is clamped by default, such that epochs past
+                  the end of the EOP table, e.g. predicted ones, are supported.
         """
 
         self.time_ = time
+        self.out_of_range_ = out_of_range
 
     def GetUnitMODPositionFromTUT1(self, c_tdb):
         # An appropriate approximation to c_tdb is t_ut1.
@@ -47,23 +60,51 @@ class Sun:
         )
         obliquity = WrapToRad(23.439291 - 0.0130042 * c_tdb)
 
-        s_MOD = np.array(
+        # c_tdb may be a scalar, returning a (3,) vector, or an array, returning (..., 3).
+        s_MOD = np.stack(
             [
                 np.cos(lambda_ecliptic_rad),
                 np.cos(obliquity) * np.sin(lambda_ecliptic_rad),
                 np.sin(obliquity) * np.sin(lambda_ecliptic_rad),
-            ]
+            ],
+            axis=-1,
         )
 
-        return s_MOD / np.linalg.norm(s_MOD)
+        return s_MOD / np.sqrt(np.sum(s_MOD * s_MOD, axis=-1, keepdims=True))
 
-    def GetMODFromJSJ2000UTC(self, js_j2000_utc):
-        jd_utc = self.time_.JSJ2000ToJD(js_j2000_utc)
-        mjd_utc = self.time_.MJD(jd_utc)
-        dut1_s = self.time_.GetEarthObservationParameter(mjd_utc, "dUT1_s")
-        t_ut1 = self.time_.JDToT(jd_utc + dut1_s / DAY_IN_SECONDS)
+    def GetMODFromJSJ2000UTC(self, js_j2000_utc, out=None):
+        """Unit Sun vectors [MOD] at JS from J2000 (UTC).
+        A scalar epoch returns a (3,) vector. An array of epochs returns (..., 3)
+        vectors, evaluated in chunks of SUN_CHUNK_SIZE epochs into out if given.
+        """
 
-        return self.GetUnitMODPositionFromTUT1(t_ut1)
+        def Compute(js):
+            jd_utc = self.time_.JSJ2000ToJD(js)
+            mjd_utc = self.time_.MJD(jd_utc)
+            dut1_s = self.time_.GetEarthObservationParameter(
+                mjd_utc, "dUT1_s", self.out_of_range_
+            )
+            t_ut1 = self.time_.JDToT(jd_utc + dut1_s / DAY_IN_SECONDS)
+
+            return self.GetUnitMODPositionFromTUT1(t_ut1)
+
+        if np.ndim(js_j2000_utc) == 0:
+            # Repeated epochs are served from the clock's conversion cache, if enabled.
+            return self.time_.Memoize(
+                ("Sun.GetMODFromJSJ2000UTC", js_j2000_utc, self.out_of_range_),
+                lambda: Compute(js_j2000_utc),
+            )
+
+        js_j2000_utc = np.asarray(js_j2000_utc, dtype=np.float64)
+        if out is None:
+            out = np.empty(js_j2000_utc.shape + (3,))
+
+        js_flat, out_flat = js_j2000_utc.reshape(-1), out.reshape(-1, 3)
+        for start in range(0, len(js_flat), SUN_CHUNK_SIZE):
+            chunk = slice(start, start + SUN_CHUNK_SIZE)
+            out_flat[chunk] = Compute(js_flat[chunk])
+
+        return out
 
     # -----------------------------------------------------------------------
     def GetUnitMODPositionFromUTC(self, gregorian_utc):
@@ -75,6 +116,147 @@ class Sun:
 
         # Unit Test: 1. test_sun_vector_from_utc
 
-        t_ut1 = self.time_.UTCGregotianToTUT1(gregorian_utc)
+        t_ut1 = self.time_.UTCGregotianToTUT1(gregorian_utc, self.out_of_range_)
 
         return self.GetUnitMODPositionFromTUT1(t_ut1)
+
+    # -----------------------------------------------------------------------
+    def Tabulate(self, js_start, js_end, step_s=3600.0, max_error_deg=1e-4):
+        """Example Call:
+        table = sun.Tabulate(js_start, js_start + 5 * 365 * DAY_IN_SECONDS)
+        s_mod = table.GetMODFromJSJ2000UTC(js_start + np.arange(0.0, 86400.0, 0.1))
+        """
+
+        return SunTable.FromSun(self, js_start, js_end, step_s, max_error_deg)
+
+
+# -----------------------------------------------------------------------
+# -----------------------------------------------------------------------
+class SunTable:
+    def __init__(self, js_start, step_s, s_mod, metadata=None):
+        """Sun Vector Table
+        Inputs: 1. js_start: time of the first node [JS from J2000, UTC]
+                2. step_s: uniform node spacing [s]
+                3. s_mod: (n_nodes, 3) unit Sun vectors [MOD] at the nodes
+                4. metadata: dictionary of numbers kept with the table (e.g. its error bound)
+        Output: 1. Sun vectors [MOD] by cubic Hermite interpolation of the nodes,
+                   normalized, with the interface of Sun.GetMODFromJSJ2000UTC
+
+        Comments: The Sun vector turns by about 1 deg/day, so hourly nodes interpolate
+                  the Almanac model to far below its 0.01 deg accuracy.
+        """
+
+        self.js_start_ = float(js_start)
+        self.step_s_ = float(step_s)
+        self.s_mod_ = np.asarray(s_mod, dtype=np.float64)
+        self.metadata_ = dict(metadata or {})
+
+        if len(self.s_mod_) < 3:
+            raise ValueError("A Sun table needs at least three nodes.")
+        self.js_end_ = self.js_start_ + (len(self.s_mod_) - 1) * self.step_s_
+
+        # Cubic Hermite polynomials of each step in u in [0, 1], from the node
+        # derivatives [per step] by central differences in the interior.
+        ds_mod = np.gradient(self.s_mod_, axis=0, edge_order=2)
+        s_0, s_1 = self.s_mod_[:-1], self.s_mod_[1:]
+        ds_0, ds_1 = ds_mod[:-1], ds_mod[1:]
+        self.polynomials_ = np.stack(
+            [
+                s_0,
+                ds_0,
+                3.0 * (s_1 - s_0) - 2.0 * ds_0 - ds_1,
+                2.0 * (s_0 - s_1) + ds_0 + ds_1,
+            ],
+            axis=1,
+        )
+
+    @classmethod
+    def FromSun(cls, sun, js_start, js_end, step_s=3600.0, max_error_deg=1e-4):
+        """Tabulate the Sun vectors of a Sun object over [js_start, js_end] [JS from
+        J2000, UTC], checked against the model between the nodes.
+        Inputs: 1. step_s: node spacing [s]
+                2. max_error_deg: bound on the angle to the model vector
+
+        Comments: Spans past the end of the EOP table follow the out_of_range of the
+                  Sun object, which clamps dUT1 by default.
+        """
+        if js_end <= js_start:
+            raise ValueError("The Sun table must span a positive time interval.")
+
+        n_steps = max(int(np.ceil((js_end - js_start) / step_s)), 2)
+        s_mod = sun.GetMODFromJSJ2000UTC(js_start + np.arange(n_steps + 1) * step_s)
+        table = cls(js_start, step_s, s_mod)
+
+        # Angle to the model at the quarter points of every step.
+        js_check = (
+            js_start + (np.arange(n_steps)[:, None] + [0.25, 0.5, 0.75]) * step_s
+        ).ravel()
+        error_deg = np.degrees(
+            table.AngleTo(sun.GetMODFromJSJ2000UTC(js_check), js_check).max()
+        )
+        if error_deg > max_error_deg:
+            raise ValueError(
+                f"The Sun table error {error_deg} deg exceeds {max_error_deg} deg "
+                f"with steps of {step_s} s."
+            )
+
+        table.metadata_ = {
+            "max_error_deg": float(max_error_deg),
+            "checked_error_deg": float(error_deg),
+        }
+        return table
+
+    def GetMODFromJSJ2000UTC(self, js_j2000_utc, out=None):
+        """Unit Sun vectors [MOD] at JS from J2000 (UTC).
+        A scalar epoch returns a (3,) vector. An array of epochs returns (..., 3)
+        vectors, evaluated in chunks of SUN_CHUNK_SIZE epochs into out if given.
+        """
+        js_j2000_utc = np.asarray(js_j2000_utc, dtype=np.float64)
+        if np.any(js_j2000_utc < self.js_start_) or np.any(js_j2000_utc > self.js_end_):
+            raise ValueError(
+                f"Times outside the Sun table [{self.js_start_}, {self.js_end_}] JS."
+            )
+        if out is None:
+            out = np.empty(js_j2000_utc.shape + (3,))
+
+        js_flat, out_flat = js_j2000_utc.reshape(-1), out.reshape(-1, 3)
+        for start in range(0, len(js_flat), SUN_CHUNK_SIZE):
+            chunk = slice(start, start + SUN_CHUNK_SIZE)
+            x = (js_flat[chunk] - self.js_start_) / self.step_s_
+            k = np.minimum(x.astype(np.int64), len(self.polynomials_) - 1)
+            u = (x - k)[:, None]
+
+            # Horner evaluation of the step polynomials.
+            c = self.polynomials_[k]
+            s = c[:, 0] + u * (c[:, 1] + u * (c[:, 2] + u * c[:, 3]))
+            out_flat[chunk] = s / np.linalg.norm(s, axis=1, keepdims=True)
+
+        return out
+
+    def AngleTo(self, s_mod, js_j2000_utc):
+        # Angle [rad] between unit vectors s_mod and the table at the same times.
+        s_table = self.GetMODFromJSJ2000UTC(js_j2000_utc)
+        return 2.0 * np.arcsin(
+            np.clip(0.5 * np.linalg.norm(s_table - s_mod, axis=-1), 0.0, 1.0)
+        )
+
+    def Save(self, table_file):
+        # Serialize the table to an .npz file, to reuse it across runs.
+        SaveVersionedArrays(
+            table_file,
+            SUN_TABLE_VERSION,
+            {"js_start": self.js_start_, "step_s": self.step_s_, "s_mod": self.s_mod_},
+            self.metadata_,
+        )
+
+    @classmethod
+    def Load(cls, table_file):
+        saved, metadata = LoadVersionedArrays(
+            table_file, SUN_TABLE_VERSION, "Sun table"
+        )
+        return cls(
+            float(saved["js_start"]),
+            float(saved["step_s"]),
+            saved["s_mod"],
+            metadata,
+        )
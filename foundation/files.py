@@ -0,0 +1,73 @@
+"""ACS Toolbox: Files Module
+This module contains file utilities shared by the stores, archives and saved
+fits.
+"""
+
+# Standard libraries.
+import os
+import tempfile
+
+# Third party libraries.
+import numpy as np
+
+
+def AtomicWrite(path, write):
+    """Write a file atomically.
+    Inputs: 1. path: path of the file, replaced if it exists
+            2. write: function of the binary file object which writes the contents
+
+    Comments: The contents are written to a temporary file in the same directory
+              and renamed, such that a concurrent reader sees either the old or the
+              new file but never a partial one.
+    """
+    path = os.path.abspath(path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            write(tmp_file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def SaveVersionedArrays(path, version, arrays, metadata):
+    """Save arrays and float metadata to an .npz file with a format version.
+    Inputs: 1. path: path of the .npz file
+            2. version: format version of the saved object
+            3. arrays: dictionary of the arrays
+            4. metadata: dictionary of float metadata
+    """
+    np.savez(
+        path,
+        version=version,
+        metadata_keys=np.array(list(metadata.keys())),
+        metadata_values=np.array(list(metadata.values()), dtype=np.float64),
+        **arrays,
+    )
+
+
+def LoadVersionedArrays(path, version, description):
+    """Load the arrays and metadata saved by SaveVersionedArrays.
+    Inputs: 1. path: path of the .npz file
+            2. version: expected format version
+            3. description: name of the saved object, for error messages
+    Output: Dictionaries of the arrays and of the metadata
+    """
+    with np.load(path) as saved:
+        if int(saved["version"]) != version:
+            raise ValueError(
+                f"{description} version {int(saved['version'])} of {path} "
+                f"is not supported (expected {version})."
+            )
+        metadata = dict(
+            zip(saved["metadata_keys"].tolist(), saved["metadata_values"].tolist())
+        )
+        arrays = {
+            key: saved[key]
+            for key in saved.files
+            if key not in ("version", "metadata_keys", "metadata_values")
+        }
+
+    return arrays, metadata
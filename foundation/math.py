@@ -18,3 +18,48 @@ def vX(v):
     """Construct the cross-matrix which enables cross products in R3."""
     is_column(v)
     return np.array([[0, -v[2], v[1]], [v[2], 0, -v[0]], [-v[1], v[0], 0]])
+
+
+def is_column_stack(v):
+    """Check if the numpy array is a stack of N columns in R3, shape (N, 3)."""
+    assert (
+        np.ndim(v) == 2 and np.shape(v)[1] == 3
+    ), f"Array of shape {np.shape(v)} is *not* a stack of columns of shape (N, 3)."
+    return 1 == 1
+
+
+def is_matrix_stack(C):
+    """Check if the numpy array is a stack of N 3x3 matrices, shape (N, 3, 3)."""
+    shape = np.shape(C)
+    assert len(shape) == 3 and shape[1:] == (
+        3,
+        3,
+    ), f"Array of shape {shape} is *not* a stack of matrices of shape (N, 3, 3)."
+    return 1 == 1
+
+
+def vX_stack(v):
+    """Construct the (N, 3, 3) cross-matrices of a stack of (N, 3) columns."""
+    is_column_stack(v)
+    v = np.asarray(v, dtype=np.float64)
+    vx = np.zeros((len(v), 3, 3))
+    vx[:, 0, 1], vx[:, 0, 2] = -v[:, 2], v[:, 1]
+    vx[:, 1, 0], vx[:, 1, 2] = v[:, 2], -v[:, 0]
+    vx[:, 2, 0], vx[:, 2, 1] = -v[:, 1], v[:, 0]
+    return vx
+
+
+def transpose_stack(C):
+    """Transpose each matrix of a (N, 3, 3) stack."""
+    is_matrix_stack(C)
+    return np.swapaxes(C, 1, 2)
+
+
+def compose_stack(A, B):
+    """Products A[n] B[n] of two (N, 3, 3) stacks; a single (3, 3) matrix broadcasts."""
+    return np.matmul(A, B)
+
+
+def apply_stack(C, v):
+    """Products C[n] v[n] of a (N, 3, 3) stack and (N, 3) columns; either may be single."""
+    return np.einsum("...ij,...j->...i", C, v)
@@ -0,0 +1,164 @@
+"""ACS Toolbox: Quaternion Module
+This module contains a quaternion type backed by an (N, 4) array, for attitude
+histories at 4 floats per sample instead of a 3x3 rotation matrix.
+
+Convention: scalar-last, q = [a sin(phi/2), cos(phi/2)], with the rotation matrix
+            of so3.EulerAxis(a, phi), i.e. C(q) = (q4^2 - qv.qv) I + 2 qv qv^T - 2 q4 [qv x],
+            and products such that C(q * p) = C(q) C(p).
+"""
+
+# Standard libraries.
+import numpy as np
+
+# ACSToolbox packages.
+from acstoolbox.foundation.math import is_matrix_stack
+
+
+def _Stack(qv, q4):
+    # (N, 4) quaternions of (N, 3) (or (1, 3)) vector and (N, 1) (or (1, 1)) scalar parts.
+    n = max(len(qv), len(q4))
+    return np.hstack([np.broadcast_to(qv, (n, 3)), np.broadcast_to(q4, (n, 1))])
+
+
+class Quaternion:
+    def __init__(self, q):
+        """Quaternions
+        Input: 1. q: (N, 4) (or a single (4,)) scalar-last quaternions
+
+        Example Call:
+            q_ab = Quaternion.FromEulerAxis(a, phi)
+            q_ac = q_ab * Quaternion.FromDCM(C_bc)
+            v_c = q_ac.Inverse().Rotate(v_a)
+        """
+        q = np.asarray(q, dtype=np.float64)
+        assert (
+            q.ndim in (1, 2) and q.shape[-1] == 4
+        ), f"Array of shape {q.shape} is *not* a stack of quaternions of shape (N, 4)."
+        self.q_ = np.atleast_2d(q)
+
+    @classmethod
+    def Identity(cls, n=1):
+        q = np.zeros((n, 4))
+        q[:, 3] = 1.0
+        return cls(q)
+
+    @classmethod
+    def FromEulerAxis(cls, a, phi):
+        # Quaternions of (N, 3) unit axes (a) and (N,) angles (phi) of so3.EulerAxis.
+        a = np.atleast_2d(np.asarray(a, dtype=np.float64))
+        phi = np.asarray(phi, dtype=np.float64).reshape(-1, 1)
+        return cls(_Stack(a * np.sin(phi / 2), np.cos(phi / 2)))
+
+    @classmethod
+    def FromDCM(cls, C):
+        """Quaternions of (N, 3, 3) (or a single (3, 3)) rotation matrices, by
+        Shepperd's method: the largest of |q1|, ..., |q4| is evaluated from the trace
+        and diagonal, and the others from the off-diagonal terms divided by it."""
+        C = np.asarray(C, dtype=np.float64)
+        if C.ndim == 2:
+            C = C[np.newaxis]
+        is_matrix_stack(C)
+
+        trace = np.trace(C, axis1=1, axis2=2)
+        diagonal = np.diagonal(C, axis1=1, axis2=2)
+        # 4 q_k^2 - 1 + ... : [C11, C22, C33, trace], the largest picks the pivot.
+        pivot = np.argmax(np.column_stack([diagonal, trace]), axis=1)
+
+        # Off-diagonal sums and differences of the passive convention.
+        d23 = C[:, 1, 2] - C[:, 2, 1]
+        d31 = C[:, 2, 0] - C[:, 0, 2]
+        d12 = C[:, 0, 1] - C[:, 1, 0]
+        s12 = C[:, 0, 1] + C[:, 1, 0]
+        s13 = C[:, 0, 2] + C[:, 2, 0]
+        s23 = C[:, 1, 2] + C[:, 2, 1]
+
+        # Rows of 4 q_pivot q for each pivot.
+        candidates = np.stack(
+            [
+                np.stack([1 + 2 * diagonal[:, 0] - trace, s12, s13, d23], axis=1),
+                np.stack([s12, 1 + 2 * diagonal[:, 1] - trace, s23, d31], axis=1),
+                np.stack([s13, s23, 1 + 2 * diagonal[:, 2] - trace, d12], axis=1),
+                np.stack([d23, d31, d12, 1 + trace], axis=1),
+            ],
+            axis=1,
+        )
+        q = candidates[np.arange(len(C)), pivot]
+        return cls(q / np.linalg.norm(q, axis=1, keepdims=True))
+
+    def __len__(self):
+        return len(self.q_)
+
+    def __getitem__(self, index):
+        return Quaternion(self.q_[index])
+
+    def __mul__(self, other):
+        return self.Multiply(other)
+
+    def Multiply(self, other):
+        # Products q * p, element by element (a single quaternion broadcasts).
+        qv, q4 = self.q_[:, :3], self.q_[:, 3:]
+        pv, p4 = other.q_[:, :3], other.q_[:, 3:]
+        return Quaternion(
+            _Stack(
+                q4 * pv + p4 * qv - np.cross(qv, pv),
+                q4 * p4 - np.sum(qv * pv, axis=1, keepdims=True),
+            )
+        )
+
+    def Norm(self):
+        return np.linalg.norm(self.q_, axis=1)
+
+    def Normalize(self):
+        return Quaternion(self.q_ / self.Norm()[:, np.newaxis])
+
+    def Conjugate(self):
+        return Quaternion(self.q_ * [-1.0, -1.0, -1.0, 1.0])
+
+    def Inverse(self):
+        return Quaternion(self.Conjugate().q_ / (self.Norm() ** 2)[:, np.newaxis])
+
+    def Rotate(self, v):
+        # C(q) v of (N, 3) (or a single (3,)) vectors, without forming C(q).
+        qv, q4 = self.q_[:, :3], self.q_[:, 3:]
+        v = np.asarray(v, dtype=np.float64)
+        return (
+            (q4**2 - np.sum(qv * qv, axis=1, keepdims=True)) * v
+            + 2 * np.sum(qv * v, axis=-1, keepdims=True) * qv
+            - 2 * q4 * np.cross(qv, v)
+        )
+
+    def DCM(self):
+        # (N, 3, 3) rotation matrices of the (unit) quaternions.
+        qv, q4 = self.q_[:, :3], self.q_[:, 3]
+        C = 2 * qv[:, :, np.newaxis] * qv[:, np.newaxis, :]
+        C[:, [0, 1, 2], [0, 1, 2]] += (q4**2 - np.sum(qv * qv, axis=1))[:, np.newaxis]
+
+        # - 2 q4 [qv x]
+        q4qv = 2 * q4[:, np.newaxis] * qv
+        C[:, 0, 1] += q4qv[:, 2]
+        C[:, 0, 2] -= q4qv[:, 1]
+        C[:, 1, 0] -= q4qv[:, 2]
+        C[:, 1, 2] += q4qv[:, 0]
+        C[:, 2, 0] += q4qv[:, 1]
+        C[:, 2, 1] -= q4qv[:, 0]
+        return C
+
+    def Slerp(self, other, t):
+        """Spherical linear interpolation from these (unit) quaternions (t = 0) to
+        other (t = 1), along the shortest rotation, at (N,) fractions t."""
+        q0, q1 = self.q_, other.q_
+        t = np.asarray(t, dtype=np.float64).reshape(-1, 1)
+
+        cos_theta = np.sum(q0 * q1, axis=1, keepdims=True)
+        q1 = np.where(cos_theta < 0.0, -q1, q1)
+        cos_theta = np.abs(cos_theta)
+
+        # Nearly equal quaternions are interpolated linearly, then normalized.
+        theta = np.arccos(np.minimum(cos_theta, 1.0))
+        sin_theta = np.sin(theta)
+        linear = sin_theta < 1e-6
+        sin_theta = np.where(linear, 1.0, sin_theta)
+        w0 = np.where(linear, 1.0 - t, np.sin((1.0 - t) * theta) / sin_theta)
+        w1 = np.where(linear, t, np.sin(t * theta) / sin_theta)
+
+        return Quaternion(w0 * q0 + w1 * q1).Normalize()
@@ -0,0 +1,40 @@
+"""ACS Toolbox: Roots Module
+This module contains root finders vectorized over many independent brackets,
+such that each iteration evaluates the function once for all of them.
+"""
+
+# Standard libraries.
+import numpy as np
+
+
+def Bisection(f, a, b, fa=None, fb=None, tol=1e-6, n_iter_max=100):
+    """Roots of f in the brackets [a, b], by vectorized bisection.
+    Inputs: 1. f: function of an (n,) array of abscissae, where element i belongs to
+               bracket i, returning the (n,) function values
+            2. a, b: (n,) bracket bounds
+            3. fa, fb: optional (n,) values of f at a and b
+            4. tol: bracket width at which the iteration stops
+            5. n_iter_max: maximum number of iterations
+    Output: (n,) roots; NaN where f(a) and f(b) have the same sign.
+    """
+    a = np.array(a, dtype=np.float64)
+    b = np.array(b, dtype=np.float64)
+    fa = f(a) if fa is None else np.array(fa, dtype=np.float64)
+    fb = f(b) if fb is None else np.array(fb, dtype=np.float64)
+
+    bracketed = np.sign(fa) * np.sign(fb) <= 0.0
+    for _ in range(n_iter_max):
+        if np.all(np.abs(b - a) <= tol):
+            break
+
+        c = 0.5 * (a + b)
+        fc = f(c)
+
+        # Keep the half of each bracket whose end values differ in sign.
+        left = np.sign(fa) * np.sign(fc) <= 0.0
+        b = np.where(left, c, b)
+        fb = np.where(left, fc, fb)
+        a = np.where(left, a, c)
+        fa = np.where(left, fa, fc)
+
+    return np.where(bracketed, 0.5 * (a + b), np.nan)
@@ -7,7 +7,7 @@ These special orthogonal matrices are the foundation for all attitude representa
 import numpy as np
 
 # ACSToolbox packages.
-from acstoolbox.foundation.math import is_column, vX
+from acstoolbox.foundation.math import is_column, is_column_stack, vX, vX_stack
 
 
 def EulerAxis(a, phi):
@@ -18,3 +18,19 @@ def EulerAxis(a, phi):
         + (1 - np.cos(phi)) * np.outer(a, a)
         - np.sin(phi) * vX(a)
     )
+
+
+def EulerAxisStack(a, phi):
+    """Construct (N, 3, 3) rotation matrices from (N, 3) axes (a) and (N,) angles (phi)
+    of rotation, with the convention of EulerAxis."""
+    is_column_stack(a)
+    a = np.asarray(a, dtype=np.float64)
+    phi = np.broadcast_to(np.asarray(phi, dtype=np.float64), (len(a),))
+
+    cos_phi = np.cos(phi)[:, np.newaxis, np.newaxis]
+    sin_phi = np.sin(phi)[:, np.newaxis, np.newaxis]
+    return (
+        cos_phi * np.identity(3)
+        + (1 - cos_phi) * a[:, :, np.newaxis] * a[:, np.newaxis, :]
+        - sin_phi * vX_stack(a)
+    )
@@ -0,0 +1,312 @@
+"""ACS Toolbox: Time Series Module
+This module stores epoch-indexed columns (e.g. SGP4 states, Sun vectors and
+attitude matrices) in an append-only binary file of chunks, and reads back
+time windows without loading the whole file.
+
+File layout:
+    1. 8-byte magic, little-endian uint64 size of a JSON schema (format version,
+       dtype and row shape of each column), the schema, padded to 64 bytes.
+    2. Chunks: 8-byte chunk magic, uint64 size of a JSON chunk header (number of
+       rows, first and last epoch, byte offset, size and compression of each
+       column), the header, then the columns, each aligned to 64 bytes.
+    3. Index footer: JSON list of the offset, number of rows, first and last
+       epoch of every chunk, its uint64 size, and an 8-byte footer magic.
+
+Appending truncates the footer, writes chunks and rewrites the footer on close.
+If a writer stops before its footer is written, the index is rebuilt from the
+chunk headers. Epochs must increase across chunks, so a time window is located
+by a binary search of the index, and uncompressed chunks are read as zero-copy
+views of a memory map.
+
+Example Call:
+    with TimeSeriesWriter("run.acsts", compression="zlib") as writer:
+        for _, block in profile.Blocks(js_start, js_end, 0.1):
+            writer.Append({key: block[key] for key in ("js_j2000_utc", "attitude")})
+    window = TimeSeriesFile("run.acsts").Read(js_start + 3600.0, js_start + 7200.0)
+"""
+
+# Standard libraries.
+import json
+import os
+import struct
+import zlib
+
+# Third party libraries.
+import numpy as np
+
+TIME_SERIES_MAGIC = b"ACSTSF\x00\x00"
+TIME_SERIES_CHUNK_MAGIC = b"ACSTSC\x00\x00"
+TIME_SERIES_INDEX_MAGIC = b"ACSTSI\x00\x00"
+TIME_SERIES_VERSION = 1
+TIME_SERIES_ALIGNMENT = 64
+
+# Column of the epochs [JS from J2000, UTC] which indexes the rows.
+TIME_SERIES_EPOCH_COLUMN = "js_j2000_utc"
+
+TIME_SERIES_COMPRESSION = (None, "zlib")
+
+
+def _Padding(n_bytes):
+    return b"\x00" * (-n_bytes % TIME_SERIES_ALIGNMENT)
+
+
+def _PackedHeader(magic, header, offset):
+    # Magic, size and JSON header, padded such that the data after it is aligned.
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (
+        -(offset + len(magic) + 8 + len(header_bytes)) % TIME_SERIES_ALIGNMENT
+    )
+    return magic + struct.pack("<Q", len(header_bytes)) + header_bytes
+
+
+def _ReadHeader(stream, magic, path):
+    if stream.read(len(magic)) != magic:
+        raise ValueError(f"{path} is not a time series file, or it is corrupted.")
+    (header_size,) = struct.unpack("<Q", stream.read(8))
+    return json.loads(stream.read(header_size))
+
+
+def _ReadIndex(stream, path):
+    """Index rows (offset, n_rows, first epoch, last epoch) of every chunk and the
+    offset of the footer, or of the end of the last complete chunk."""
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    footer_size = len(TIME_SERIES_INDEX_MAGIC) + 8
+    if size >= footer_size:
+        stream.seek(size - footer_size)
+        (index_size,) = struct.unpack("<Q", stream.read(8))
+        if stream.read(len(TIME_SERIES_INDEX_MAGIC)) == TIME_SERIES_INDEX_MAGIC:
+            index_offset = size - footer_size - index_size
+            stream.seek(index_offset)
+            return json.loads(stream.read(index_size)), index_offset
+
+    # No footer: rebuild the index from the chunk headers.
+    stream.seek(0)
+    _ReadHeader(stream, TIME_SERIES_MAGIC, path)
+    index, offset = [], stream.tell()
+    while True:
+        # Chunks cut short by the end of the file are incomplete.
+        stream.seek(offset)
+        if (
+            offset + len(TIME_SERIES_CHUNK_MAGIC) + 8 > size
+            or stream.read(len(TIME_SERIES_CHUNK_MAGIC)) != TIME_SERIES_CHUNK_MAGIC
+        ):
+            return index, offset
+        (header_size,) = struct.unpack("<Q", stream.read(8))
+        if stream.tell() + header_size > size:
+            return index, offset
+        header = json.loads(stream.read(header_size))
+        end = stream.tell() + header["nbytes"]
+        if end > size:
+            return index, offset
+        index.append([offset, header["n_rows"], header["js_first"], header["js_last"]])
+        offset = end
+
+
+class TimeSeriesWriter:
+    def __init__(self, path, columns=None, compression=None, level=6):
+        """Time Series Writer (append-only)
+        Inputs: 1. path: path of the file, appended to if it exists
+                2. columns: dictionary of the dtype and row shape of each column, e.g.
+                   {"js_j2000_utc": ("<f8", ()), "attitude": ("<f8", (3, 3))} (default:
+                   the schema of the existing file, or of the first appended block)
+                3. compression: None, or "zlib" for compressed chunks
+                4. level: zlib compression level
+        """
+        if compression not in TIME_SERIES_COMPRESSION:
+            raise ValueError(
+                f"Unknown compression '{compression}', expected one of "
+                f"{list(TIME_SERIES_COMPRESSION)}."
+            )
+        self.path_ = path
+        self.compression_ = compression
+        self.level_ = level
+        self.index_ = []
+        self.columns_ = None
+        self.file_ = None
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.file_ = open(path, "r+b")
+            schema = _ReadHeader(self.file_, TIME_SERIES_MAGIC, path)
+            self.columns_ = schema["columns"]
+            if columns is not None and self._Schema(columns) != self.columns_:
+                raise ValueError(f"The columns differ from the schema of {path}.")
+            self.index_, end = _ReadIndex(self.file_, path)
+            self.file_.truncate(end)
+            self.file_.seek(end)
+        elif columns is not None:
+            self._Create(columns)
+
+    @staticmethod
+    def _Schema(columns):
+        schema = {
+            name: {"dtype": np.dtype(dtype).str, "shape": list(shape)}
+            for name, (dtype, shape) in columns.items()
+        }
+        if TIME_SERIES_EPOCH_COLUMN not in schema:
+            raise ValueError(f"The columns must include '{TIME_SERIES_EPOCH_COLUMN}'.")
+        return schema
+
+    def _Create(self, columns):
+        self.columns_ = self._Schema(columns)
+        self.file_ = open(self.path_, "w+b")
+        self.file_.write(
+            _PackedHeader(
+                TIME_SERIES_MAGIC,
+                {"version": TIME_SERIES_VERSION, "columns": self.columns_},
+                0,
+            )
+        )
+
+    def Append(self, block):
+        """Write a dictionary of (n, ...) column arrays as one chunk. The epochs must
+        increase, and follow the last epoch of the file."""
+        if self.columns_ is None:
+            self._Create(
+                {
+                    name: (np.asarray(value).dtype, np.shape(value)[1:])
+                    for name, value in block.items()
+                }
+            )
+
+        js = np.asarray(block[TIME_SERIES_EPOCH_COLUMN], dtype=np.float64)
+        if len(js) == 0:
+            return
+        if np.any(np.diff(js) <= 0.0) or (self.index_ and js[0] <= self.index_[-1][3]):
+            raise ValueError("Time series epochs must increase across appends.")
+
+        payloads, header_columns, offset = [], {}, 0
+        for name, column in self.columns_.items():
+            value = np.ascontiguousarray(block[name], dtype=np.dtype(column["dtype"]))
+            if value.shape != (len(js),) + tuple(column["shape"]):
+                raise ValueError(
+                    f"Column '{name}' of shape {value.shape} does not match the "
+                    f"schema ({len(js)}, *{column['shape']})."
+                )
+
+            payload = value.tobytes()
+            if self.compression_ == "zlib":
+                payload = zlib.compress(payload, self.level_)
+            header_columns[name] = {
+                "offset": offset,
+                "stored_nbytes": len(payload),
+                "compression": self.compression_,
+            }
+            payloads.append(payload + _Padding(len(payload)))
+            offset += len(payloads[-1])
+
+        chunk_offset = self.file_.tell()
+        header = {
+            "n_rows": len(js),
+            "js_first": float(js[0]),
+            "js_last": float(js[-1]),
+            "nbytes": offset,
+            "columns": header_columns,
+        }
+        self.file_.write(_PackedHeader(TIME_SERIES_CHUNK_MAGIC, header, chunk_offset))
+        for payload in payloads:
+            self.file_.write(payload)
+        self.index_.append([chunk_offset, len(js), float(js[0]), float(js[-1])])
+
+    def Close(self):
+        # Write the index footer.
+        if self.file_ is None:
+            return
+        index_bytes = json.dumps(self.index_).encode("utf-8")
+        self.file_.write(index_bytes)
+        self.file_.write(struct.pack("<Q", len(index_bytes)))
+        self.file_.write(TIME_SERIES_INDEX_MAGIC)
+        self.file_.close()
+        self.file_ = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.Close()
+
+
+class TimeSeriesFile:
+    def __init__(self, path):
+        """Time Series File (read-only, memory-mapped snapshot)
+        Inputs: 1. path: path of a file written by TimeSeriesWriter
+        """
+        self.path_ = path
+        with open(path, "rb") as stream:
+            schema = _ReadHeader(stream, TIME_SERIES_MAGIC, path)
+            index, _ = _ReadIndex(stream, path)
+
+        if schema["version"] != TIME_SERIES_VERSION:
+            raise ValueError(
+                f"Time series version {schema['version']} of {path} is not supported "
+                f"(expected {TIME_SERIES_VERSION})."
+            )
+        self.columns_ = schema["columns"]
+
+        index = np.array(index, dtype=np.float64).reshape(-1, 4)
+        self.chunk_offset_ = index[:, 0].astype(np.int64)
+        self.chunk_rows_ = index[:, 1].astype(np.int64)
+        self.chunk_js_first_ = index[:, 2]
+        self.chunk_js_last_ = index[:, 3]
+        self.n_rows_ = int(self.chunk_rows_.sum())
+        self.map_ = np.memmap(path, dtype=np.uint8, mode="r") if len(index) else None
+
+    def __len__(self):
+        return self.n_rows_
+
+    def Chunk(self, k, columns=None):
+        """Columns of chunk k: views of the memory map if uncompressed, else decompressed."""
+        offset = int(self.chunk_offset_[k])
+        (header_size,) = struct.unpack(
+            "<Q", self.map_[offset + 8 : offset + 16].tobytes()
+        )
+        header = json.loads(
+            self.map_[offset + 16 : offset + 16 + header_size].tobytes()
+        )
+        data_offset = offset + 16 + header_size
+
+        chunk = {}
+        for name in columns or list(self.columns_):
+            column, stored = self.columns_[name], header["columns"][name]
+            start = data_offset + stored["offset"]
+            payload = self.map_[start : start + stored["stored_nbytes"]]
+            if stored["compression"] == "zlib":
+                payload = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+            chunk[name] = payload.view(np.dtype(column["dtype"])).reshape(
+                (header["n_rows"],) + tuple(column["shape"])
+            )
+
+        return chunk
+
+    def Read(self, js_start=-np.inf, js_end=np.inf, columns=None):
+        """Rows with epochs in [js_start, js_end] [JS from J2000, UTC].
+        Output: Dictionary of column arrays; a window within a single uncompressed
+                chunk is a view of the memory map.
+        """
+        columns = list(columns or self.columns_)
+        first = np.searchsorted(self.chunk_js_last_, js_start, side="left")
+        last = np.searchsorted(self.chunk_js_first_, js_end, side="right")
+
+        pieces = []
+        for k in range(first, last):
+            chunk = self.Chunk(k, set(columns) | {TIME_SERIES_EPOCH_COLUMN})
+            js = chunk[TIME_SERIES_EPOCH_COLUMN]
+            rows = slice(
+                np.searchsorted(js, js_start, side="left"),
+                np.searchsorted(js, js_end, side="right"),
+            )
+            pieces.append({name: chunk[name][rows] for name in columns})
+
+        if len(pieces) == 1:
+            return pieces[0]
+        return {
+            name: (
+                np.concatenate([piece[name] for piece in pieces])
+                if pieces
+                else np.empty(
+                    (0,) + tuple(self.columns_[name]["shape"]),
+                    dtype=np.dtype(self.columns_[name]["dtype"]),
+                )
+            )
+            for name in columns
+        }
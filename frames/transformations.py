@@ -0,0 +1,299 @@
+"""ACS Toolbox: Frame Transformations Module
+This module computes stacks of (N, 3, 3) rotation matrices between the TEME,
+PEF, ITRF, TOD, MOD and GCRF frames over arrays of epochs, with the IAU-76/FK5
+reduction (Vallado, Fundamentals of Astrodynamics and Applications, 3.7):
+
+    r_GCRF = P N R W r_ITRF,    r_PEF = R3(GMST) r_TEME
+
+    P: IAU-76 precession (MOD -> GCRF), the frame bias is neglected.
+    N: IAU-80 nutation (TOD -> MOD), truncated to its largest terms.
+    R: sidereal rotation by GAST (PEF -> TOD).
+    W: polar motion (ITRF -> PEF).
+
+Precession-nutation angles vary slowly: they are evaluated (and cached) at
+nodes every 6 h of TT and interpolated linearly between them. dUT1 and the
+polar motion are interpolated from the Clock's EOP table for every epoch.
+"""
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.constants.time_constants import *
+from acstoolbox.time.clock import Clock
+
+FRAMES = ("TEME", "PEF", "ITRF", "TOD", "MOD", "GCRF")
+
+# Frames which rotate with the Earth.
+EARTH_FIXED_FRAMES = ("PEF", "ITRF")
+
+# Nominal Earth rotation rate [rad/s].
+EARTH_ROTATION_RATE = 7.292115146706979e-5
+
+ARCSEC_TO_RAD = np.pi / (180.0 * 3600.0)
+
+# IAU-80 nutation terms larger than 0.0005": multipliers of the Delaunay arguments
+# (l, l', F, D, Omega) and coefficients of dpsi (A + B T) and deps (C + D T)
+# [0.0001"]. Reference: Seidelmann (1982), Vallado Table D-6.
+IAU80_NUTATION_TERMS = np.array(
+    [
+        [0, 0, 0, 0, 1, -171996.0, -174.2, 92025.0, 8.9],
+        [0, 0, 2, -2, 2, -13187.0, -1.6, 5736.0, -3.1],
+        [0, 0, 2, 0, 2, -2274.0, -0.2, 977.0, -0.5],
+        [0, 0, 0, 0, 2, 2062.0, 0.2, -895.0, 0.5],
+        [0, 1, 0, 0, 0, 1426.0, -3.4, 54.0, -0.1],
+        [1, 0, 0, 0, 0, 712.0, 0.1, -7.0, 0.0],
+        [0, 1, 2, -2, 2, -517.0, 1.2, 224.0, -0.6],
+        [0, 0, 2, 0, 1, -386.0, -0.4, 200.0, 0.0],
+        [1, 0, 2, 0, 2, -301.0, 0.0, 129.0, -0.1],
+        [0, -1, 2, -2, 2, 217.0, -0.5, -95.0, 0.3],
+        [1, 0, 0, -2, 0, -158.0, 0.0, -1.0, 0.0],
+        [0, 0, 2, -2, 1, 129.0, 0.1, -70.0, 0.0],
+        [-1, 0, 2, 0, 2, 123.0, 0.0, -53.0, 0.0],
+        [1, 0, 0, 0, 1, 63.0, 0.1, -33.0, 0.0],
+        [0, 0, 0, 2, 0, 63.0, 0.0, -2.0, 0.0],
+        [-1, 0, 2, 2, 2, -59.0, 0.0, 26.0, 0.0],
+        [-1, 0, 0, 0, 1, -58.0, -0.1, 32.0, 0.0],
+        [1, 0, 2, 0, 1, -51.0, 0.0, 27.0, 0.0],
+        [2, 0, 0, -2, 0, 48.0, 0.0, 1.0, 0.0],
+        [-2, 0, 2, 0, 1, 46.0, 0.0, -24.0, 0.0],
+        [0, 0, 2, 2, 2, -38.0, 0.0, 16.0, 0.0],
+        [2, 0, 2, 0, 2, -31.0, 0.0, 13.0, 0.0],
+        [2, 0, 0, 0, 0, 29.0, 0.0, -1.0, 0.0],
+        [1, 0, 2, -2, 2, 29.0, 0.0, -12.0, 0.0],
+        [0, 0, 2, 0, 0, 26.0, 0.0, -1.0, 0.0],
+        [0, 0, 2, -2, 0, -22.0, 0.0, 0.0, 0.0],
+        [-1, 0, 2, 0, 1, 21.0, 0.0, -10.0, 0.0],
+        [0, 2, 0, 0, 0, 17.0, -0.1, 0.0, 0.0],
+        [0, 2, 2, -2, 2, -16.0, 0.1, 7.0, 0.0],
+        [-1, 0, 0, 2, 1, 16.0, 0.0, -8.0, 0.0],
+        [0, 1, 0, 0, 1, -15.0, 0.0, 9.0, 0.0],
+        [1, 0, 0, -2, 1, -13.0, 0.0, 7.0, 0.0],
+        [0, -1, 0, 0, 1, -12.0, 0.0, 6.0, 0.0],
+        [2, 0, -2, 0, 0, 11.0, 0.0, 0.0, 0.0],
+        [-1, 0, 2, 2, 1, -10.0, 0.0, 5.0, 0.0],
+        [1, 0, 2, 2, 2, -8.0, 0.0, 3.0, 0.0],
+        [0, -1, 2, 0, 2, -7.0, 0.0, 3.0, 0.0],
+        [0, 0, 2, 2, 1, -7.0, 0.0, 3.0, 0.0],
+        [1, 1, 0, -2, 0, -7.0, 0.0, 0.0, 0.0],
+        [0, 1, 2, 0, 2, 7.0, 0.0, -3.0, 0.0],
+    ]
+)
+
+# Precession-nutation angles cached at nodes (MJD / node spacing, TT). Linear
+# interpolation between nodes 6 h apart is accurate to 0.5 mas.
+PRECESSION_NUTATION_NODE_DAYS = 0.25
+_precession_nutation_nodes = {}
+_PRECESSION_NUTATION_CACHE_SIZE = 262144
+
+
+def FrameRotation(axis, angle_rad):
+    """(..., 3, 3) frame rotations about axis 0, 1 or 2 (x, y, z) by angles [rad],
+    with the convention of so3.EulerAxis (e.g. Vallado's ROT3)."""
+    c, s = np.cos(angle_rad), np.sin(angle_rad)
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+
+    R = np.zeros(np.shape(angle_rad) + (3, 3))
+    R[..., axis, axis] = 1.0
+    R[..., i, i] = c
+    R[..., j, j] = c
+    R[..., i, j] = s
+    R[..., j, i] = -s
+
+    return R
+
+
+def PrecessionNutationAnglesExact(t_tt):
+    """IAU-76 precession (zeta, theta, z) and IAU-80 nutation (mean obliquity,
+    dpsi, deps) angles [rad] at Julian centuries from J2000 (TT)."""
+    t = np.asarray(t_tt, dtype=np.float64)
+    t2, t3 = t * t, t * t * t
+
+    zeta = (2306.2181 * t + 0.30188 * t2 + 0.017998 * t3) * ARCSEC_TO_RAD
+    theta = (2004.3109 * t - 0.42665 * t2 - 0.041833 * t3) * ARCSEC_TO_RAD
+    z = (2306.2181 * t + 1.09468 * t2 + 0.018203 * t3) * ARCSEC_TO_RAD
+
+    epsilon_mean = np.radians(23.439291 - 0.0130042 * t - 1.64e-7 * t2 + 5.04e-7 * t3)
+
+    # Delaunay arguments [deg]: l, l', F, D and Omega.
+    delaunay = np.radians(
+        np.stack(
+            [
+                134.96298139 + (1325.0 * 360.0 + 198.8673981) * t + 0.0086972 * t2,
+                357.52772333 + (99.0 * 360.0 + 359.0503400) * t - 0.0001603 * t2,
+                93.27191028 + (1342.0 * 360.0 + 82.0175381) * t - 0.0036825 * t2,
+                297.85036306 + (1236.0 * 360.0 + 307.1114800) * t - 0.0019142 * t2,
+                125.04452222 - (5.0 * 360.0 + 134.1362608) * t + 0.0020708 * t2,
+            ],
+            axis=-1,
+        )
+    )
+    argument = delaunay @ IAU80_NUTATION_TERMS[:, :5].T
+    terms = IAU80_NUTATION_TERMS[:, 5:] * 1e-4 * ARCSEC_TO_RAD
+    t = t[..., np.newaxis]
+    dpsi = np.sum((terms[:, 0] + terms[:, 1] * t) * np.sin(argument), axis=-1)
+    deps = np.sum((terms[:, 2] + terms[:, 3] * t) * np.cos(argument), axis=-1)
+
+    return np.stack([zeta, theta, z, epsilon_mean, dpsi, deps, delaunay[..., 4]])
+
+
+def PrecessionNutationAngles(mjd_tt):
+    """Precession-nutation angles (see PrecessionNutationAnglesExact) at MJDs (TT),
+    interpolated linearly between the cached angles at nodes every 6 h of TT."""
+    x = np.asarray(mjd_tt, dtype=np.float64) / PRECESSION_NUTATION_NODE_DAYS
+    node = np.floor(x)
+
+    # Evaluate the nodes missing from the cache in one call.
+    nodes = np.unique(np.concatenate([node.ravel(), node.ravel() + 1.0]))
+    missing = [n for n in nodes.tolist() if n not in _precession_nutation_nodes]
+    if missing:
+        if (
+            len(_precession_nutation_nodes) + len(missing)
+            > _PRECESSION_NUTATION_CACHE_SIZE
+        ):
+            _precession_nutation_nodes.clear()
+        t_tt = (
+            np.array(missing) * PRECESSION_NUTATION_NODE_DAYS
+            + MODIFIED_JULIAN_DATE_OFFSET
+            - JD_J2000
+        ) / kCenturyInJulianDays
+        for n, angles in zip(missing, PrecessionNutationAnglesExact(t_tt).T):
+            _precession_nutation_nodes[n] = angles
+
+    table = np.array([_precession_nutation_nodes[n] for n in nodes.tolist()]).T
+    index = np.searchsorted(nodes, node)
+    fraction = x - node
+
+    return table[:, index] + fraction * (table[:, index + 1] - table[:, index])
+
+
+def GMST(t_ut1):
+    # IAU-82 Greenwich Mean Sidereal Time [rad] at Julian centuries from J2000 (UT1).
+    t = np.asarray(t_ut1, dtype=np.float64)
+    gmst_s = (
+        67310.54841
+        + (876600.0 * 3600.0 + 8640184.812866) * t
+        + 0.093104 * t**2
+        - 6.2e-6 * t**3
+    )
+
+    return np.mod(gmst_s / 240.0, 360.0) * np.pi / 180.0
+
+
+def EquationOfEquinoxes(epsilon_mean, dpsi, omega_moon):
+    # Equation of the equinoxes [rad], with the kinematic terms (IAU, 1997).
+    return (
+        dpsi * np.cos(epsilon_mean)
+        + (0.00264 * np.sin(omega_moon) + 0.000063 * np.sin(2.0 * omega_moon))
+        * ARCSEC_TO_RAD
+    )
+
+
+class FrameTransformations:
+    def __init__(self, js_j2000_utc, clock=None, out_of_range="clamp"):
+        """Frame Transformations at an array of epochs
+        Inputs: 1. js_j2000_utc: (N,) epochs [JS from J2000, UTC]
+                2. clock: Clock providing the leap seconds and EOP (default: Clock())
+                3. out_of_range: EOP of epochs outside the EOP table, "clamp"ed to the
+                   table bounds or "raise" a ValueError
+
+        Comments: Each elementary rotation is evaluated once for all epochs, and any
+                  pair of frames is composed from them.
+
+                  By default, epochs after the end of the EOP table (e.g. current or
+                  predicted ones) hold the last dUT1 and polar motion. The inertial
+                  rotations (TEME, TOD, MOD, GCRF) barely depend on them, but the
+                  Earth-fixed ones (PEF, ITRF) err by up to 0.9 s of Earth rotation
+                  (about 0.4 km at the equator) and 0.3" of polar motion (10 m);
+                  ingest a newer EOP file (IngestEarthObservationParameters) or use
+                  out_of_range="raise" where that matters.
+
+        Example Call:
+            frames = FrameTransformations(js_j2000_utc)
+            r_itrf = frames.Transform(r_teme, "TEME", "ITRF")
+            r_gcrf, v_gcrf = frames.TransformState(r_teme, v_teme, "TEME", "GCRF")
+        """
+        clock = clock if clock is not None else Clock()
+        self.js_j2000_utc_ = np.atleast_1d(np.asarray(js_j2000_utc, dtype=np.float64))
+
+        mjd_utc = (
+            self.js_j2000_utc_ / DAY_IN_SECONDS + JD_J2000 - MODIFIED_JULIAN_DATE_OFFSET
+        )
+        eop = clock.GetEarthObservationParameters(
+            mjd_utc, ["dUT1_s", "x_arcsec", "y_arcsec"], out_of_range
+        )
+
+        # Time scales.
+        mjd_tt = (
+            mjd_utc
+            + (clock.dAT_.GetdATBatch(mjd_utc) + ATOMIC_TO_TERRESTRIAL_S)
+            / DAY_IN_SECONDS
+        )
+        t_ut1 = (
+            (self.js_j2000_utc_ + eop["dUT1_s"]) / DAY_IN_SECONDS / kCenturyInJulianDays
+        )
+
+        zeta, theta, z, epsilon_mean, dpsi, deps, omega_moon = PrecessionNutationAngles(
+            mjd_tt
+        )
+        gmst = GMST(t_ut1)
+        gast = gmst + EquationOfEquinoxes(epsilon_mean, dpsi, omega_moon)
+
+        # Elementary rotations, r_to = M r_from.
+        precession = (
+            FrameRotation(2, zeta) @ FrameRotation(1, -theta) @ FrameRotation(2, z)
+        )
+        nutation = (
+            FrameRotation(0, -epsilon_mean)
+            @ FrameRotation(2, dpsi)
+            @ FrameRotation(0, epsilon_mean + deps)
+        )
+        polar_motion = FrameRotation(
+            0, eop["y_arcsec"] * ARCSEC_TO_RAD
+        ) @ FrameRotation(1, eop["x_arcsec"] * ARCSEC_TO_RAD)
+
+        # Rotations of each frame to GCRF, r_GCRF = M r_frame.
+        mod = precession
+        tod = mod @ nutation
+        pef = tod @ FrameRotation(2, -gast)
+        self.to_gcrf_ = {
+            "GCRF": np.broadcast_to(np.identity(3), mod.shape),
+            "MOD": mod,
+            "TOD": tod,
+            "PEF": pef,
+            "ITRF": pef @ polar_motion,
+            "TEME": pef @ FrameRotation(2, gmst),
+        }
+
+    def __len__(self):
+        return len(self.js_j2000_utc_)
+
+    def Rotation(self, from_frame, to_frame):
+        """(N, 3, 3) rotation matrices M such that r_to = M r_from."""
+        for frame in (from_frame, to_frame):
+            if frame not in FRAMES:
+                raise ValueError(f"Unknown frame '{frame}', expected one of {FRAMES}.")
+
+        return np.swapaxes(self.to_gcrf_[to_frame], -1, -2) @ self.to_gcrf_[from_frame]
+
+    def Transform(self, r, from_frame, to_frame):
+        """Rotate (N, 3) vectors (one per epoch) from one frame to another."""
+        return np.einsum("nij,nj->ni", self.Rotation(from_frame, to_frame), r)
+
+    def TransformState(self, r, v, from_frame, to_frame):
+        """Transform (N, 3) positions and velocities, including the velocity of the
+        Earth rotation between the Earth-fixed (PEF, ITRF) and the other frames."""
+        rotating_from = from_frame in EARTH_FIXED_FRAMES
+        if rotating_from == (to_frame in EARTH_FIXED_FRAMES):
+            M = self.Rotation(from_frame, to_frame)
+            return np.einsum("nij,nj->ni", M, r), np.einsum("nij,nj->ni", M, v)
+
+        # Through PEF, where v_inertial = v_PEF + w x r_PEF.
+        omega = np.array([0.0, 0.0, EARTH_ROTATION_RATE])
+        r_pef = self.Transform(r, from_frame, "PEF")
+        v_pef = self.Transform(v, from_frame, "PEF")
+        v_pef = v_pef + np.cross(omega, r_pef) * (1.0 if rotating_from else -1.0)
+
+        return self.Transform(r_pef, "PEF", to_frame), self.Transform(
+            v_pef, "PEF", to_frame
+        )
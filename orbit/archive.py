@@ -0,0 +1,259 @@
+"""ACS Toolbox: TLE Archive Module
+This module stores years of TLE history of many objects in a compact binary
+columnar file, sorted by (NORAD ID, epoch), and memory-maps it for reading.
+
+File layout: an 8-byte magic, the little-endian uint64 size of a JSON header,
+the header (format version, number of rows, and the dtype and byte offset of
+each column), then the raw columns aligned to 64 bytes. The index holds the
+unique NORAD IDs and the offset of each object's first row.
+
+Lookups of the element set in effect at many (object, time) pairs are a
+single searchsorted pass over an int64 composite key of (object rank, epoch).
+
+Example Call:
+    WriteTLEArchive("history.tlea", ReadTLECatalog("history.txt"))
+    archive = TLEArchive("history.tlea")
+    elements, dt_min = archive.ElementsAt(norad_ids, js_j2000_utc)
+    r_teme, v_teme, error = SGP4Catalog(elements).Propagate(dt_min[:, np.newaxis])
+"""
+
+# Standard libraries.
+import json
+import os
+import struct
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.foundation.files import AtomicWrite
+from acstoolbox.orbit.catalog import TLE_ELEMENT_COLUMNS
+
+TLE_ARCHIVE_MAGIC = b"ACSTLEA\x00"
+TLE_ARCHIVE_VERSION = 1
+TLE_ARCHIVE_ALIGNMENT = 64
+
+# Handling of lookups without an element set in effect.
+TLE_ARCHIVE_OUT_OF_RANGE = ("raise", "mask")
+
+# Columns of the archive rows, in file order.
+TLE_ARCHIVE_COLUMNS = [
+    ("norad_id", np.int64),
+    ("epoch_jsj2000_utc", np.float64),
+    ("key", np.int64),
+] + [(key, np.float64) for key in TLE_ELEMENT_COLUMNS]
+
+# Composite key: object rank times a stride, plus the epoch [ms] from the first epoch.
+# The millisecond key only locates the candidate row; the exact epochs decide.
+TLE_ARCHIVE_KEY_STRIDE_MS = 2**40
+
+
+def _CompositeKey(rank, epoch_js, epoch_js_first):
+    # Epochs outside the key range are clipped, to stay within the object's keys.
+    epoch_ms = np.clip(
+        np.floor((np.asarray(epoch_js) - epoch_js_first) * 1000.0),
+        -1,
+        TLE_ARCHIVE_KEY_STRIDE_MS - 1,
+    )
+    return rank * TLE_ARCHIVE_KEY_STRIDE_MS + epoch_ms.astype(np.int64)
+
+
+def WriteTLEArchive(archive_file, columns):
+    """Write a TLE archive from column arrays, as returned by ReadTLECatalog.
+    Inputs: 1. archive_file: path of the archive
+            2. columns: dictionary of norad_id, epoch_jsj2000_utc and the element columns
+
+    Comments: Rows are sorted by (NORAD ID, epoch). Of element sets with the same
+              NORAD ID and epoch, the last one given is kept.
+    """
+    norad_id = np.asarray(columns["norad_id"], dtype=np.int64)
+    epoch_js = np.asarray(columns["epoch_jsj2000_utc"], dtype=np.float64)
+
+    # Stable sort, then keep the last of duplicate (NORAD ID, epoch) rows.
+    order = np.lexsort((epoch_js, norad_id))
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = (norad_id[order][1:] != norad_id[order][:-1]) | (
+        epoch_js[order][1:] != epoch_js[order][:-1]
+    )
+    order = order[last]
+
+    # Index of the unique objects and the offset of their first row.
+    index_norad_id, index_offset = np.unique(norad_id[order], return_index=True)
+    index_offset = np.append(index_offset, len(order)).astype(np.int64)
+    if len(order) and np.ptp(epoch_js) * 1000.0 >= TLE_ARCHIVE_KEY_STRIDE_MS:
+        raise ValueError("The TLE epochs span more than the composite key allows.")
+
+    epoch_js_first = float(epoch_js.min()) if len(order) else 0.0
+    rank = np.repeat(np.arange(len(index_norad_id)), np.diff(index_offset))
+    arrays = {
+        "norad_id": norad_id[order],
+        "epoch_jsj2000_utc": epoch_js[order],
+        "key": _CompositeKey(rank, epoch_js[order], epoch_js_first),
+    }
+    for key in TLE_ELEMENT_COLUMNS:
+        arrays[key] = np.asarray(columns[key], dtype=np.float64)[order]
+    arrays["index_norad_id"] = index_norad_id.astype(np.int64)
+    arrays["index_offset"] = index_offset
+
+    # Header with the byte offset of each column from the start of the data.
+    header = {
+        "version": TLE_ARCHIVE_VERSION,
+        "n_rows": int(len(order)),
+        "epoch_jsj2000_utc_first": epoch_js_first,
+        "columns": {},
+    }
+    offset = 0
+    for name, array in arrays.items():
+        header["columns"][name] = {
+            "dtype": array.dtype.str,
+            "offset": offset,
+            "length": len(array),
+        }
+        offset += -(-array.nbytes // TLE_ARCHIVE_ALIGNMENT) * TLE_ARCHIVE_ALIGNMENT
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_offset = len(TLE_ARCHIVE_MAGIC) + 8 + len(header_bytes)
+    padding = -data_offset % TLE_ARCHIVE_ALIGNMENT
+    header_bytes += b" " * padding
+
+    def Write(archive):
+        archive.write(TLE_ARCHIVE_MAGIC)
+        archive.write(struct.pack("<Q", len(header_bytes)))
+        archive.write(header_bytes)
+        for name, array in arrays.items():
+            archive.write(np.ascontiguousarray(array).tobytes())
+            archive.write(b"\x00" * (-array.nbytes % TLE_ARCHIVE_ALIGNMENT))
+
+    AtomicWrite(archive_file, Write)
+
+
+class TLEArchive:
+    def __init__(self, archive_file):
+        """TLE Archive (read-only, memory-mapped)
+        Inputs: 1. archive_file: path of a file written by WriteTLEArchive
+        """
+        with open(archive_file, "rb") as archive:
+            magic = archive.read(len(TLE_ARCHIVE_MAGIC))
+            if magic != TLE_ARCHIVE_MAGIC:
+                raise ValueError(f"{archive_file} is not a TLE archive.")
+            (header_size,) = struct.unpack("<Q", archive.read(8))
+            self.header_ = json.loads(archive.read(header_size))
+
+        if self.header_["version"] != TLE_ARCHIVE_VERSION:
+            raise ValueError(
+                f"TLE archive version {self.header_['version']} of {archive_file} "
+                f"is not supported (expected {TLE_ARCHIVE_VERSION})."
+            )
+
+        self.archive_file_ = archive_file
+        data_offset = len(TLE_ARCHIVE_MAGIC) + 8 + header_size
+        self.columns_ = {}
+        for name, column in self.header_["columns"].items():
+            if column["length"] == 0:
+                self.columns_[name] = np.empty(0, dtype=column["dtype"])
+                continue
+            self.columns_[name] = np.memmap(
+                archive_file,
+                dtype=column["dtype"],
+                mode="r",
+                offset=data_offset + column["offset"],
+                shape=(column["length"],),
+            )
+
+        self.norad_ids_ = self.columns_["index_norad_id"]
+        self.offsets_ = self.columns_["index_offset"]
+        self.epoch_js_first_ = self.header_["epoch_jsj2000_utc_first"]
+
+    def __len__(self):
+        return self.header_["n_rows"]
+
+    def Object(self, norad_id):
+        # Column views of the element sets of one object, sorted by epoch.
+        rank = np.searchsorted(self.norad_ids_, norad_id)
+        if rank == len(self.norad_ids_) or self.norad_ids_[rank] != norad_id:
+            raise KeyError(f"NORAD ID {norad_id} is not in the TLE archive.")
+
+        rows = slice(self.offsets_[rank], self.offsets_[rank + 1])
+        return {name: self.columns_[name][rows] for name, _ in TLE_ARCHIVE_COLUMNS}
+
+    def Lookup(self, norad_ids, js_j2000_utc, out_of_range="raise"):
+        """Rows of the element sets with the latest epoch at or before each query.
+        Inputs: 1. norad_ids: NORAD IDs of the queries
+                2. js_j2000_utc: query epochs [JS from J2000, UTC], broadcast with them
+                3. out_of_range: "raise" a KeyError for unknown objects or epochs
+                   before an object's first element set, or "mask" them with row -1
+        Output: Array of row indices (-1 where masked)
+        """
+        if out_of_range not in TLE_ARCHIVE_OUT_OF_RANGE:
+            raise ValueError(
+                f"Unknown out_of_range '{out_of_range}', expected one of "
+                f"{list(TLE_ARCHIVE_OUT_OF_RANGE)}."
+            )
+        norad_ids, js = np.broadcast_arrays(
+            np.asarray(norad_ids, dtype=np.int64),
+            np.asarray(js_j2000_utc, dtype=np.float64),
+        )
+
+        rank = np.searchsorted(self.norad_ids_, norad_ids)
+        known = np.array(rank < len(self.norad_ids_))
+        known[known] = self.norad_ids_[rank[known]] == norad_ids[known]
+        rank = np.where(known, rank, 0)
+
+        # Candidate row of the composite key, then corrected on the exact epochs.
+        keys = self.columns_["key"]
+        epochs = self.columns_["epoch_jsj2000_utc"]
+        first = self.offsets_[rank]
+        query_key = _CompositeKey(rank, js, self.epoch_js_first_)
+        rows = np.searchsorted(keys, query_key, side="right") - 1
+
+        # Candidates past the exact epoch (same millisecond) step back. An empty
+        # archive has no candidates.
+        def Late(rows):
+            return (rows >= first) & (epochs[np.maximum(rows, 0)] > js)
+
+        late = Late(rows) if len(keys) else False
+        while np.any(late):
+            rows = np.where(late, rows - 1, rows)
+            late = Late(rows)
+
+        found = known & (rows >= first)
+        if out_of_range == "raise" and not np.all(found):
+            missing = np.flatnonzero(~found.ravel())[0]
+            raise KeyError(
+                f"No element set of NORAD ID {norad_ids.flat[missing]} at or before "
+                f"{js.flat[missing]} s from J2000."
+            )
+
+        return np.where(found, rows, -1)
+
+    def Elements(self, rows):
+        """Element columns of archive rows, as SGP4Catalog inputs.
+        Rows -1 (masked by Lookup) give NaN elements and NORAD ID -1; other rows
+        outside the archive raise an IndexError."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if np.any((rows < -1) | (rows >= len(self))):
+            raise IndexError(f"Rows outside the TLE archive of {len(self)} rows.")
+
+        valid = rows >= 0
+        elements = {}
+        for name, dtype in TLE_ARCHIVE_COLUMNS:
+            if name == "key":
+                continue
+            column = np.full(rows.shape, -1 if name == "norad_id" else np.nan, dtype)
+            column[valid] = self.columns_[name][rows[valid]]
+            elements[name] = column
+
+        return elements
+
+    def ElementsAt(self, norad_ids, js_j2000_utc, out_of_range="raise"):
+        """SGP4 inputs of many (object, time) pairs in one vectorized pass.
+        Inputs: 1. out_of_range: "raise" or "mask", as in Lookup; masked pairs have
+                   NaN elements and times
+        Output: 1. dictionary of element columns (SGP4Catalog input), one per pair
+                2. times [min] from each element set's epoch to its query
+        """
+        js = np.asarray(js_j2000_utc, dtype=np.float64)
+        elements = self.Elements(self.Lookup(norad_ids, js, out_of_range))
+        dt_min = (js - elements["epoch_jsj2000_utc"]) / 60.0
+
+        return elements, dt_min
@@ -0,0 +1,148 @@
+"""ACS Toolbox: SGP4 Catalog Module
+This module propagates a whole catalog of TLEs with the SGP4 equations of
+orbit/tle.py. The elements are stored as column arrays (struct-of-arrays) and
+evaluated over a (satellites x times) grid by broadcasting, in chunks of
+satellites to bound the memory of the intermediate arrays.
+"""
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.orbit.tle import SGP4Initialize, SGP4Propagate
+
+# TLE parameter columns required by the catalog, as returned by TLEParametersFromFile.
+TLE_ELEMENT_COLUMNS = [
+    "bstar",
+    "inclination",
+    "argument_perigee",
+    "eccentricity",
+    "right_ascension",
+    "mean_anomaly",
+    "mean_motion",
+]
+
+
+def SliceEpoch(epoch, start, stop):
+    # Epoch quantities of satellites [start, stop) with a trailing time axis.
+    return {
+        key: value[start:stop, np.newaxis] if value.ndim else value
+        for key, value in epoch.items()
+    }
+
+
+class SGP4Catalog:
+    def __init__(self, elements):
+        """SGP4 Catalog
+        Input: 1. elements: dictionary of column arrays, one element per satellite, with
+                  the TLE parameter keys (bstar, inclination [rad], argument_perigee [rad],
+                  eccentricity, right_ascension [rad], mean_anomaly [rad],
+                  mean_motion [rad/min]). Other columns, such as norad_id and
+                  epoch_jsj2000_utc, are kept with the catalog.
+
+        Example Call:
+            catalog = SGP4Catalog.FromTLEParameters([tle_param_1, tle_param_2])
+            r_teme, v_teme, error = catalog.Propagate(np.arange(0.0, 1440.0, 1.0))
+        """
+        missing = [key for key in TLE_ELEMENT_COLUMNS if key not in elements]
+        if missing:
+            raise ValueError(f"The catalog elements are missing the columns {missing}.")
+
+        self.elements_ = {
+            key: np.atleast_1d(np.asarray(value)) for key, value in elements.items()
+        }
+        self.n_satellites_ = len(self.elements_["mean_motion"])
+
+        # Iterative solver for Kepler's equation.
+        self.dEw_max = 1e-5
+        self.n_iter_max = 30
+
+        # Epoch-dependent quantities of every satellite are evaluated once.
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.epoch_ = SGP4Initialize(
+                *[self.elements_[key].astype(np.float64) for key in TLE_ELEMENT_COLUMNS]
+            )
+
+    @classmethod
+    def FromTLEParameters(cls, tle_params):
+        # Build a catalog from a list of TLE parameter dictionaries.
+        keys = [key for key in tle_params[0] if np.ndim(tle_params[0][key]) == 0]
+        return cls({key: np.array([p[key] for p in tle_params]) for key in keys})
+
+    def __len__(self):
+        return self.n_satellites_
+
+    def _Times(self, dt_min):
+        # (T,) or (S, T) propagation times [min], validated before any output is sized.
+        dt_min = np.asarray(dt_min, dtype=np.float64)
+        if dt_min.ndim not in (1, 2) or (
+            dt_min.ndim == 2 and dt_min.shape[0] != self.n_satellites_
+        ):
+            raise ValueError(
+                f"Times of shape {dt_min.shape} must be (T,) or ({self.n_satellites_}, T)."
+            )
+
+        return dt_min
+
+    def PropagateChunks(self, dt_min, chunk_size=1024):
+        """Propagate the catalog in chunks of satellites.
+        Inputs: 1. dt_min: (T,) times [min] from every TLE epoch, or (S, T) times per satellite
+                2. chunk_size: number of satellites per chunk
+        Output: Generator of (start, stop, r_teme, v_teme, error), with (n, T, 3) states of
+                the satellites [start, stop) and (n, T) SGP4 error codes.
+        """
+        dt_min = self._Times(dt_min)
+
+        for start in range(0, self.n_satellites_, chunk_size):
+            stop = min(start + chunk_size, self.n_satellites_)
+            dt_chunk = dt_min[np.newaxis, :] if dt_min.ndim == 1 else dt_min[start:stop]
+            with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+                r_teme, v_teme, error = SGP4Propagate(
+                    SliceEpoch(self.epoch_, start, stop),
+                    dt_chunk,
+                    self.dEw_max,
+                    self.n_iter_max,
+                    return_error=True,
+                )
+
+            yield start, stop, r_teme, v_teme, error
+
+    def Propagate(self, dt_min, chunk_size=1024, out=None):
+        """Propagate every satellite to every time.
+        Inputs: 1. dt_min: (T,) times [min] from every TLE epoch, or (S, T) times per satellite
+                2. chunk_size: number of satellites per chunk
+                3. out: optional preallocated (r_teme, v_teme, error) arrays
+        Output: 1. (S, T, 3) positions [km] in TEME frame
+                2. (S, T, 3) velocities [km/s] in TEME frame
+                3. (S, T) SGP4 error codes (SGP4_ERROR_*); states in error are NaN
+
+        Comments: Errors, such as decayed orbits or non-convergence, are reported
+                  per satellite and time instead of raised.
+        """
+        dt_min = self._Times(dt_min)
+        n_times = dt_min.shape[-1]
+        if out is None:
+            out = (
+                np.empty((self.n_satellites_, n_times, 3)),
+                np.empty((self.n_satellites_, n_times, 3)),
+                np.empty((self.n_satellites_, n_times), dtype=np.int8),
+            )
+
+        r_out, v_out, error_out = out
+        for start, stop, r_teme, v_teme, error in self.PropagateChunks(
+            dt_min, chunk_size
+        ):
+            r_out[start:stop] = r_teme
+            v_out[start:stop] = v_teme
+            error_out[start:stop] = error
+
+        return r_out, v_out, error_out
+
+    def PropagateToJSJ2000UTC(self, js_j2000_utc, chunk_size=1024, out=None):
+        # Propagate to common epochs [JS from J2000, UTC] from the epoch_jsj2000_utc column.
+        dt_min = (
+            np.asarray(js_j2000_utc, dtype=np.float64)[np.newaxis, :]
+            - self.elements_["epoch_jsj2000_utc"][:, np.newaxis]
+        ) / 60.0
+
+        return self.Propagate(dt_min, chunk_size, out)
@@ -0,0 +1,365 @@
+"""ACS Toolbox: Conjunction Screening Module
+This module screens close approaches between primary satellites and a TLE
+catalog propagated with SGP4, without all-pairs distance checks:
+
+    1. Apogee/perigee filter: pairs whose radial shells are further apart than
+       the threshold (plus a pad) never come close.
+    2. Spatial binning: at each coarse time step the positions are hashed into
+       a uniform grid and only objects in the 27 neighbouring cells are
+       compared, which keeps the cost O(N) per step.
+    3. Orbit path filter: candidates whose orbits, with their secularly drifted
+       planes and perigees at the time step, pass further apart than the
+       threshold (plus a pad) near both mutual nodes are dropped.
+    4. Refinement: the time of closest approach (TCA) of each candidate is the
+       root of the relative range-rate within its time step.
+
+Example Call:
+    catalog = SGP4Catalog(ReadTLECatalog("catalog.txt"))
+    conjunctions = ScreenConjunctions(
+        catalog, js_start, js_start + 7 * DAY_IN_SECONDS, primaries=[0, 1, 2]
+    )
+"""
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.constants.celestial_constants import kr_E
+from acstoolbox.foundation.roots import Bisection
+from acstoolbox.orbit.catalog import SGP4Catalog
+from acstoolbox.orbit.illumination import OrbitNormals
+from acstoolbox.orbit.tle import SGP4Propagate
+
+# Upper bound of the relative speed [km/s] for which the grid cells are sized.
+CONJUNCTION_MAX_RELATIVE_SPEED_KMS = 20.0
+
+# Grid cell coordinates are offset to be positive and packed in 21 bits each.
+_CELL_BITS = 21
+_CELL_OFFSET = 1 << (_CELL_BITS - 1)
+
+# Neighbouring cell offsets, including the cell itself.
+_NEIGHBOURS = np.array(
+    [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)],
+    dtype=np.int64,
+)
+
+
+def PerigeeApogeeRadii(catalog):
+    # Mean perigee and apogee radii [km] of every satellite at its TLE epoch.
+    a_km = catalog.epoch_["ai"] * kr_E
+    e = catalog.epoch_["e0"]
+
+    return a_km * (1.0 - e), a_km * (1.0 + e)
+
+
+def PerigeeApogeeFilter(r_perigee_1, r_apogee_1, r_perigee_2, r_apogee_2, distance_km):
+    # True for pairs whose [perigee, apogee] shells are within distance_km.
+    gap = np.maximum(r_perigee_1, r_perigee_2) - np.minimum(r_apogee_1, r_apogee_2)
+    return gap <= distance_km
+
+
+def _Wrap(angle):
+    # Angles wrapped to [-pi, pi).
+    return np.mod(angle + np.pi, 2.0 * np.pi) - np.pi
+
+
+def _RadiusRange(a_km, e, nu, delta):
+    # Minimum and maximum radii of orbits over true anomalies [nu - delta, nu + delta].
+    p_km = a_km * (1.0 - e**2)
+    r_ends = p_km[:, np.newaxis] / (
+        1.0 + e[:, np.newaxis] * np.cos(np.stack([nu - delta, nu + delta], axis=1))
+    )
+    r_min = np.where(np.abs(_Wrap(nu)) <= delta, a_km * (1.0 - e), r_ends.min(axis=1))
+    r_max = np.where(
+        np.abs(_Wrap(nu - np.pi)) <= delta, a_km * (1.0 + e), r_ends.max(axis=1)
+    )
+    return r_min, r_max
+
+
+def _OrbitGeometry(catalog, index, js_j2000_utc):
+    # Mean semi-major axis [km], eccentricity, argument of perigee, unit node and
+    # normal vectors of the orbit planes at times [JS from J2000, UTC].
+    epoch = catalog.epoch_
+    dt_min = (js_j2000_utc - catalog.elements_["epoch_jsj2000_utc"][index]) / 60.0
+    w = epoch["w_rad"][index] + epoch["wdot"][index] * dt_min
+    Omega = epoch["Omega_rad"][index] + epoch["Omegadot"][index] * dt_min
+    i = epoch["i0_rad"][index]
+
+    node = np.stack([np.cos(Omega), np.sin(Omega), np.zeros_like(Omega)], axis=1)
+    normal = OrbitNormals(i, Omega)
+    return epoch["ai"][index] * kr_E, epoch["e0"][index], w, node, normal
+
+
+def OrbitPathFilter(catalog, index_1, index_2, js_j2000_utc, distance_km):
+    """True for pairs whose orbit paths can come within distance_km of each other.
+    Inputs: 1. catalog: SGP4Catalog with an epoch_jsj2000_utc column
+            2. index_1, index_2: catalog indices of the pairs
+            3. js_j2000_utc: time [JS from J2000, UTC] of the drifted orbit planes
+            4. distance_km: distance, including a pad for osculating radii
+
+    Comments: A point of orbit 1 at the argument of latitude u from a mutual node
+              is at least r_1 |sin(u)| sin(I) from the plane of orbit 2, I being
+              their relative inclination. Close approaches are thus within
+              asin(distance_km / (r_perigee sin(I))) of a node, where the radius
+              ranges of the orbits must overlap. Nearly coplanar pairs are kept.
+    """
+    a_1, e_1, w_1, node_1, normal_1 = _OrbitGeometry(catalog, index_1, js_j2000_utc)
+    a_2, e_2, w_2, node_2, normal_2 = _OrbitGeometry(catalog, index_2, js_j2000_utc)
+
+    # Mutual node line and relative inclination.
+    k = np.cross(normal_1, normal_2)
+    sin_I = np.linalg.norm(k, axis=1)
+    k /= np.where(sin_I > 0.0, sin_I, 1.0)[:, np.newaxis]
+
+    near = np.zeros(len(k), dtype=bool)
+    sin_delta = distance_km / (np.minimum(a_1 * (1 - e_1), a_2 * (1 - e_2)) * sin_I)
+    coplanar = ~(sin_delta < 1.0)
+    delta = np.arcsin(np.minimum(sin_delta, 1.0))
+
+    # Arguments of latitude of the node line in each orbit plane.
+    u_1 = np.arctan2(
+        np.sum(k * np.cross(normal_1, node_1), axis=1), np.sum(k * node_1, axis=1)
+    )
+    u_2 = np.arctan2(
+        np.sum(k * np.cross(normal_2, node_2), axis=1), np.sum(k * node_2, axis=1)
+    )
+    for node_angle in (0.0, np.pi):
+        r_min_1, r_max_1 = _RadiusRange(a_1, e_1, u_1 + node_angle - w_1, delta)
+        r_min_2, r_max_2 = _RadiusRange(a_2, e_2, u_2 + node_angle - w_2, delta)
+        gap = np.maximum(r_min_1, r_min_2) - np.minimum(r_max_1, r_max_2)
+        near |= gap <= distance_km
+
+    return near | coplanar
+
+
+def _CellKeys(cells):
+    cells = cells + _CELL_OFFSET
+    return (
+        (cells[..., 0] << (2 * _CELL_BITS))
+        | (cells[..., 1] << _CELL_BITS)
+        | cells[..., 2]
+    )
+
+
+def GridCandidates(r, queries, cell_km):
+    """Pairs (query, object) of objects in the 27 cells around each query object.
+    Inputs: 1. r: (N, 3) positions [km]; NaN positions are ignored
+            2. queries: indices of the query objects
+            3. cell_km: size of the grid cells
+    Output: Arrays of query and object indices, excluding self-pairs.
+    """
+    valid = np.flatnonzero(np.all(np.isfinite(r), axis=1))
+    cells = np.floor(r[valid] / cell_km).astype(np.int64)
+    keys = _CellKeys(cells)
+    order = np.argsort(keys)
+    keys = keys[order]
+    objects = valid[order]
+
+    queries = queries[np.all(np.isfinite(r[queries]), axis=1)]
+    query_cells = np.floor(r[queries] / cell_km).astype(np.int64)
+
+    # Objects of each neighbouring cell are a contiguous range of the sorted keys.
+    neighbour_keys = _CellKeys(query_cells[:, np.newaxis, :] + _NEIGHBOURS).ravel()
+    start = np.searchsorted(keys, neighbour_keys, side="left")
+    count = np.searchsorted(keys, neighbour_keys, side="right") - start
+
+    query_index = np.repeat(np.repeat(queries, len(_NEIGHBOURS)), count)
+    first = np.repeat(start - np.cumsum(count) + count, count)
+    object_index = objects[first + np.arange(count.sum())]
+
+    distinct = query_index != object_index
+    return query_index[distinct], object_index[distinct]
+
+
+def _PropagateObjects(catalog, index, js_j2000_utc):
+    # States of the satellites index at times [JS from J2000, UTC], element by element.
+    epoch = {
+        key: value[index] if np.ndim(value) else value
+        for key, value in catalog.epoch_.items()
+    }
+    dt_min = (js_j2000_utc - catalog.elements_["epoch_jsj2000_utc"][index]) / 60.0
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        r, v, _ = SGP4Propagate(
+            epoch, dt_min, catalog.dEw_max, catalog.n_iter_max, return_error=True
+        )
+
+    return r, v
+
+
+def _RangeRate(catalog, primary, secondary, js_j2000_utc):
+    # Relative range-rate times range, dr . dv [km^2/s], of the pairs.
+    r_1, v_1 = _PropagateObjects(catalog, primary, js_j2000_utc)
+    r_2, v_2 = _PropagateObjects(catalog, secondary, js_j2000_utc)
+
+    return np.sum((r_2 - r_1) * (v_2 - v_1), axis=1)
+
+
+def _ConjunctionTable(primary, secondary, js_tca, miss_km, relative_speed_kms):
+    # Conjunction table sorted by TCA.
+    order = np.argsort(js_tca, kind="stable")
+    return {
+        "primary": primary[order],
+        "secondary": secondary[order],
+        "tca_jsj2000_utc": js_tca[order],
+        "miss_km": miss_km[order],
+        "relative_speed_kms": relative_speed_kms[order],
+    }
+
+
+def ScreenConjunctions(
+    catalog,
+    js_start,
+    js_end,
+    threshold_km=5.0,
+    primaries=None,
+    step_s=60.0,
+    pad_km=30.0,
+    tol_s=1e-3,
+    max_states=2**24,
+):
+    """Screen the conjunctions of primary satellites with a catalog.
+    Inputs: 1. catalog: SGP4Catalog with an epoch_jsj2000_utc column
+            2. js_start, js_end: screening interval [JS from J2000, UTC]
+            3. threshold_km: miss distance below which conjunctions are reported
+            4. primaries: catalog indices of the primaries (default: all against all)
+            5. step_s: coarse time step [s]
+            6. pad_km: pad of the apogee/perigee and orbit path filters for the
+               difference between mean and osculating orbits
+            7. tol_s: TCA tolerance [s]
+            8. max_states: number of states propagated at once
+    Output: Table (dictionary of column arrays), sorted by TCA, of the primary and
+            secondary catalog indices, TCA [JS from J2000, UTC], miss distance [km]
+            and relative speed [km/s] at TCA.
+
+    Comments: A conjunction is screened at the coarse step closest to its TCA, where
+              the range is at most threshold_km + (relative speed) * step_s / 2.
+              A TCA on the boundary of two steps is bracketed by both, and
+              reported once.
+    """
+    if js_end <= js_start:
+        raise ValueError(
+            f"Screening interval end ({js_end}) must be after its start ({js_start})."
+        )
+
+    n_satellites = len(catalog)
+    is_primary = np.zeros(n_satellites, dtype=bool)
+    is_primary[np.arange(n_satellites) if primaries is None else primaries] = True
+    primaries = np.flatnonzero(is_primary)
+
+    # 1. Apogee/perigee filter of the objects which can come close to a primary.
+    r_perigee, r_apogee = PerigeeApogeeRadii(catalog)
+    if is_primary.all():
+        screened = np.arange(n_satellites)
+    else:
+        near = np.zeros(n_satellites, dtype=bool)
+        for primary in primaries:
+            near |= PerigeeApogeeFilter(
+                r_perigee[primary],
+                r_apogee[primary],
+                r_perigee,
+                r_apogee,
+                threshold_km + pad_km,
+            )
+        screened = np.flatnonzero(near | is_primary)
+
+    sub_catalog = SGP4Catalog(
+        {key: value[screened] for key, value in catalog.elements_.items()}
+    )
+    sub_primaries = np.flatnonzero(is_primary[screened])
+
+    # 2. Grid candidates at the coarse time steps, propagated in chunks of steps.
+    js_steps = np.arange(js_start, js_end + 0.5 * step_s, step_s)
+    cell_km = threshold_km + CONJUNCTION_MAX_RELATIVE_SPEED_KMS * step_s / 2.0
+    chunk_steps = max(1, max_states // max(len(screened), 1))
+
+    candidates = []
+    for chunk_start in range(0, len(js_steps), chunk_steps):
+        js_chunk = js_steps[chunk_start : chunk_start + chunk_steps]
+        r_chunk, v_chunk, _ = sub_catalog.PropagateToJSJ2000UTC(js_chunk)
+
+        for k in range(len(js_chunk)):
+            r, v = r_chunk[:, k], v_chunk[:, k]
+            query, other = GridCandidates(r, sub_primaries, cell_km)
+
+            # Each pair of primaries is kept once.
+            once = ~is_primary[screened[other]] | (query < other)
+            query, other = query[once], other[once]
+
+            range_km = np.linalg.norm(r[other] - r[query], axis=1)
+            speed_kms = np.linalg.norm(v[other] - v[query], axis=1)
+            close = range_km <= threshold_km + speed_kms * step_s / 2.0
+            close &= PerigeeApogeeFilter(
+                r_perigee[screened[query]],
+                r_apogee[screened[query]],
+                r_perigee[screened[other]],
+                r_apogee[screened[other]],
+                threshold_km + pad_km,
+            )
+            # 3. Orbit path filter of the remaining candidates.
+            close[close] = OrbitPathFilter(
+                catalog,
+                screened[query[close]],
+                screened[other[close]],
+                js_chunk[k],
+                threshold_km + pad_km,
+            )
+
+            candidates.append(
+                (
+                    screened[query[close]],
+                    screened[other[close]],
+                    np.full(np.count_nonzero(close), js_chunk[k]),
+                )
+            )
+
+    primary, secondary, js_candidate = (
+        np.concatenate(column) for column in zip(*candidates)
+    )
+    if len(primary) == 0:
+        return _ConjunctionTable(primary, secondary, *np.empty((3, 0)))
+
+    # 4. TCA: root of the relative range-rate within the candidate's time step.
+    def RangeRate(js):
+        return _RangeRate(catalog, primary, secondary, js)
+
+    js_tca = Bisection(
+        RangeRate,
+        np.maximum(js_candidate - step_s / 2.0, js_start),
+        np.minimum(js_candidate + step_s / 2.0, js_end),
+        tol=tol_s,
+    )
+
+    # Conjunctions at minima of the range (range-rate increasing through zero).
+    minimum = np.isfinite(js_tca)
+    minimum[minimum] = (
+        RangeRate(js_tca + tol_s)[minimum] >= RangeRate(js_tca - tol_s)[minimum]
+    )
+    primary, secondary, js_tca = primary[minimum], secondary[minimum], js_tca[minimum]
+
+    # Same-pair TCAs within the tolerance are the same conjunction.
+    order = np.lexsort((js_tca, secondary, primary))
+    primary, secondary, js_tca = primary[order], secondary[order], js_tca[order]
+    distinct = np.ones(len(js_tca), dtype=bool)
+    distinct[1:] = (
+        (primary[1:] != primary[:-1])
+        | (secondary[1:] != secondary[:-1])
+        | (np.diff(js_tca) > 2.0 * tol_s)
+    )
+    primary, secondary, js_tca = (
+        primary[distinct],
+        secondary[distinct],
+        js_tca[distinct],
+    )
+
+    r_1, v_1 = _PropagateObjects(catalog, primary, js_tca)
+    r_2, v_2 = _PropagateObjects(catalog, secondary, js_tca)
+    miss_km = np.linalg.norm(r_2 - r_1, axis=1)
+    reported = miss_km <= threshold_km
+
+    return _ConjunctionTable(
+        primary[reported],
+        secondary[reported],
+        js_tca[reported],
+        miss_km[reported],
+        np.linalg.norm(v_2 - v_1, axis=1)[reported],
+    )
@@ -0,0 +1,192 @@
+"""ACS Toolbox: Ephemeris Module
+This module fits piecewise Chebyshev polynomials to SGP4 states sampled on a
+coarse grid, such that dense (10-100 Hz) queries are served from the fit
+instead of propagating SGP4 at every time.
+
+The segments have a uniform length, so a query finds its segment in O(1), and
+the fit is checked against direct propagation at points between the fit nodes:
+segments are halved until the position error bound is met.
+"""
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.foundation.files import LoadVersionedArrays, SaveVersionedArrays
+
+# Format version of saved ephemerides.
+EPHEMERIS_VERSION = 1
+
+# Number of queries evaluated at once.
+EPHEMERIS_QUERY_CHUNK = 8192
+
+
+def ChebyshevNodes(n_nodes):
+    # Chebyshev points of the first kind in [-1, 1], increasing.
+    return -np.cos((2 * np.arange(n_nodes) + 1) * np.pi / (2 * n_nodes))
+
+
+def ChebyshevBasis(tau, degree):
+    # (..., degree + 1) Chebyshev polynomials T_k(tau) by their recurrence.
+    tau = np.asarray(tau, dtype=np.float64)
+    basis = np.empty(tau.shape + (degree + 1,))
+    basis[..., 0] = 1.0
+    if degree > 0:
+        basis[..., 1] = tau
+    for k in range(2, degree + 1):
+        basis[..., k] = 2.0 * tau * basis[..., k - 1] - basis[..., k - 2]
+
+    return basis
+
+
+class ChebyshevEphemeris:
+    def __init__(
+        self, t_start_min, t_end_min, segment_min, coefficients, metadata=None
+    ):
+        """Piecewise Chebyshev Ephemeris
+        Inputs: 1. t_start_min, t_end_min: time interval [min from TLE epoch]
+                2. segment_min: length of every segment [min], from t_start_min
+                3. coefficients: (n_segments, degree + 1, 6) Chebyshev coefficients of
+                   the position [km] and velocity [km/s] in TEME frame
+                4. metadata: dictionary of numbers kept with the fit (e.g. its error bound)
+
+        Example Call:
+            ephemeris = ChebyshevEphemeris.FromSGP4(sgp4, 0.0, 1440.0, max_error_km=1e-3)
+            r_teme, v_teme = ephemeris.GetOrbitState(np.arange(0.0, 1440.0, 0.01 / 60.0))
+        """
+        self.t_start_min_ = float(t_start_min)
+        self.t_end_min_ = float(t_end_min)
+        self.segment_min_ = float(segment_min)
+        self.coefficients_ = np.asarray(coefficients, dtype=np.float64)
+        self.metadata_ = dict(metadata or {})
+
+        self.n_segments_, n_coefficients, _ = self.coefficients_.shape
+        self.degree_ = n_coefficients - 1
+
+    @classmethod
+    def FromSGP4(
+        cls,
+        sgp4,
+        t_start_min,
+        t_end_min,
+        max_error_km=1e-3,
+        degree=10,
+        segment_min=30.0,
+        min_segment_min=0.5,
+        n_checks=4,
+    ):
+        """Fit the states of an SGP4 object (or any object with GetOrbitStates) over
+        [t_start_min, t_end_min] [min from TLE epoch].
+        Inputs: 1. max_error_km: bound on the position error against direct propagation
+                2. degree: degree of the Chebyshev polynomials
+                3. segment_min: initial segment length [min], halved until the bound is met
+                4. min_segment_min: shortest segment [min] before giving up
+                5. n_checks: number of check points per segment, between the fit nodes
+        """
+        if t_end_min <= t_start_min:
+            raise ValueError("The ephemeris must span a positive time interval.")
+
+        # Least-squares fit over twice as many nodes as coefficients.
+        tau_fit = ChebyshevNodes(2 * (degree + 1))
+        basis_pinv = np.linalg.pinv(ChebyshevBasis(tau_fit, degree))
+        tau_check = (np.arange(n_checks) + 0.5) / n_checks * 2.0 - 1.0
+        basis_check = ChebyshevBasis(tau_check, degree)
+
+        while True:
+            n_segments = int(np.ceil((t_end_min - t_start_min) / segment_min))
+            t_mid = t_start_min + (np.arange(n_segments) + 0.5) * segment_min
+            half = 0.5 * segment_min
+
+            # States at the fit nodes of every segment, fitted in a single product.
+            r_fit, v_fit = sgp4.GetOrbitStates(
+                (t_mid[:, None] + half * tau_fit).ravel()
+            )
+            states = np.concatenate([r_fit, v_fit], axis=1).reshape(n_segments, -1, 6)
+            if not np.all(np.isfinite(states)):
+                raise ValueError("SGP4 failed within the ephemeris time interval.")
+            coefficients = np.einsum("kn,snc->skc", basis_pinv, states)
+
+            # Position error against direct propagation at the check points.
+            r_check, _ = sgp4.GetOrbitStates(
+                (t_mid[:, None] + half * tau_check).ravel()
+            )
+            r_fitted = np.einsum("nk,skc->snc", basis_check, coefficients[:, :, :3])
+            error_km = np.linalg.norm(r_fitted.reshape(-1, 3) - r_check, axis=1).max()
+
+            if error_km <= max_error_km:
+                break
+            if segment_min / 2.0 < min_segment_min:
+                raise ValueError(
+                    f"The ephemeris error {error_km} km exceeds {max_error_km} km "
+                    f"with segments of {segment_min} min."
+                )
+            segment_min /= 2.0
+
+        metadata = {
+            "max_error_km": float(max_error_km),
+            "checked_error_km": float(error_km),
+        }
+        return cls(t_start_min, t_end_min, segment_min, coefficients, metadata)
+
+    def Segment(self, t_min):
+        # O(1) segment index and normalized time tau in [-1, 1] of each query.
+        t_min = np.asarray(t_min, dtype=np.float64)
+        if np.any(t_min < self.t_start_min_) or np.any(t_min > self.t_end_min_):
+            raise ValueError(
+                f"Times outside the ephemeris [{self.t_start_min_}, {self.t_end_min_}] min."
+            )
+
+        x = (t_min - self.t_start_min_) / self.segment_min_
+        segment = np.minimum(np.floor(x).astype(np.int64), self.n_segments_ - 1)
+
+        return segment, 2.0 * (x - segment) - 1.0
+
+    def GetOrbitState(self, t_min):
+        """Position [km] and velocity [km/s] in TEME frame at times [min from TLE epoch].
+        A scalar time returns (3,) vectors; an array of times returns (..., 3) arrays.
+        """
+        segment, tau = self.Segment(t_min)
+
+        # Queries are evaluated in chunks to bound the gathered coefficients.
+        states = np.empty(np.shape(tau) + (6,))
+        segment_flat, tau_flat = segment.ravel(), tau.ravel()
+        states_flat = states.reshape(-1, 6)
+        for start in range(0, len(tau_flat), EPHEMERIS_QUERY_CHUNK):
+            chunk = slice(start, start + EPHEMERIS_QUERY_CHUNK)
+            states_flat[chunk] = np.einsum(
+                "nk,nkc->nc",
+                ChebyshevBasis(tau_flat[chunk], self.degree_),
+                self.coefficients_[segment_flat[chunk]],
+            )
+
+        return states[..., :3], states[..., 3:]
+
+    def GetOrbitStates(self, t_min):
+        return self.GetOrbitState(np.atleast_1d(np.asarray(t_min, dtype=np.float64)))
+
+    def Save(self, ephemeris_file):
+        # Serialize the fit to an .npz file, to reuse it across runs.
+        SaveVersionedArrays(
+            ephemeris_file,
+            EPHEMERIS_VERSION,
+            {
+                "t_start_min": self.t_start_min_,
+                "t_end_min": self.t_end_min_,
+                "segment_min": self.segment_min_,
+                "coefficients": self.coefficients_,
+            },
+            self.metadata_,
+        )
+
+    @classmethod
+    def Load(cls, ephemeris_file):
+        saved, metadata = LoadVersionedArrays(
+            ephemeris_file, EPHEMERIS_VERSION, "Ephemeris"
+        )
+        return cls(
+            float(saved["t_start_min"]),
+            float(saved["t_end_min"]),
+            float(saved["segment_min"]),
+            saved["coefficients"],
+            metadata,
+        )
@@ -0,0 +1,162 @@
+"""ACS Toolbox: Orbit Events Module
+This module finds eclipse entries and exits of an orbit from the sign changes
+of shadow functions of the satellite and Sun positions. The shadow functions
+are sampled on a coarse step to bracket the sign changes, which are then
+refined by bisection, instead of thresholding the states sampled at 1 s.
+
+Shadow models:
+    cylindrical: Earth shadow as a cylinder of radius R_E, boundary "shadow".
+    conical: apparent Sun and Earth disks (Montenbruck & Gill, 3.4.2), boundaries
+             "penumbra" (the Sun is partially hidden) and "umbra" (fully hidden).
+
+Comments: Shadows shorter than the coarse step may be missed.
+"""
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.constants.celestial_constants import kAUm, kr_E, kr_Sun
+from acstoolbox.foundation.roots import Bisection
+
+SHADOW_BOUNDARIES = {"cylindrical": ("shadow",), "conical": ("penumbra", "umbra")}
+
+
+def CylindricalShadowFunction(r_km, s_unit):
+    """Continuous function of (..., 3) satellite positions [km] and unit Sun vectors,
+    negative inside the cylindrical Earth shadow."""
+    r_dot_s = np.sum(r_km * s_unit, axis=-1)
+    r_norm = np.linalg.norm(r_km, axis=-1)
+    r_perpendicular = np.sqrt(np.maximum(r_norm**2 - r_dot_s**2, 0.0))
+
+    # On the Sun side the distance from the shadow axis is replaced by |r|, which
+    # matches it at r.s = 0 and is always above R_E.
+    return np.where(r_dot_s < 0.0, r_perpendicular, r_norm) - kr_E
+
+
+def ConicalShadowFunctions(r_km, s_unit, sun_distance_km=kAUm / 1000.0):
+    """Penumbra and umbra functions of (..., 3) satellite positions [km] and unit Sun
+    vectors, negative inside the penumbra and umbra respectively."""
+    d_km = s_unit * sun_distance_km - r_km
+    d_norm = np.linalg.norm(d_km, axis=-1)
+    r_norm = np.linalg.norm(r_km, axis=-1)
+
+    # Apparent radii of the Sun (a) and Earth (b), and their separation (c).
+    a = np.arcsin(kr_Sun / d_norm)
+    b = np.arcsin(kr_E / r_norm)
+    c = np.arccos(np.clip(-np.sum(r_km * d_km, axis=-1) / (r_norm * d_norm), -1.0, 1.0))
+
+    return {"penumbra": c - (a + b), "umbra": c - (b - a)}
+
+
+class ShadowEventFinder:
+    def __init__(self, orbit, epoch_jsj2000_utc, sun, model="conical"):
+        """Shadow Event Finder
+        Inputs: 1. orbit: SGP4 (or ChebyshevEphemeris) object with GetOrbitStates(dt_min)
+                2. epoch_jsj2000_utc: epoch of the orbit times [JS from J2000, UTC]
+                3. sun: Sun object
+                4. model: shadow model, "cylindrical" or "conical"
+
+        Comments: The orbit (TEME) and Sun (MOD) frames differ by less than the
+                  accuracy of the low precision Sun vector.
+
+        Example Call:
+            finder = ShadowEventFinder(tle.SGP4(tle_param), tle_param["epoch_jsj2000_utc"], Sun(clock))
+            events = finder.Events(js_start, js_start + 90 * DAY_IN_SECONDS)
+            umbra_start, umbra_end = finder.Windows(js_start, js_end, "umbra")
+        """
+        if model not in SHADOW_BOUNDARIES:
+            raise ValueError(
+                f"Unknown shadow model '{model}', expected one of {list(SHADOW_BOUNDARIES)}."
+            )
+
+        self.orbit_ = orbit
+        self.epoch_jsj2000_utc_ = epoch_jsj2000_utc
+        self.sun_ = sun
+        self.model_ = model
+        self.boundaries_ = SHADOW_BOUNDARIES[model]
+
+        # Number of orbit and Sun evaluations.
+        self.n_evaluations_ = 0
+
+    def Shadow(self, js_j2000_utc):
+        """Shadow functions of each boundary at times [JS from J2000, UTC], negative inside."""
+        js_j2000_utc = np.atleast_1d(np.asarray(js_j2000_utc, dtype=np.float64))
+        self.n_evaluations_ += len(js_j2000_utc)
+
+        r_km, _ = self.orbit_.GetOrbitStates(
+            (js_j2000_utc - self.epoch_jsj2000_utc_) / 60.0
+        )
+        s_unit = self.sun_.GetMODFromJSJ2000UTC(js_j2000_utc)
+        if self.model_ == "cylindrical":
+            return {"shadow": CylindricalShadowFunction(r_km, s_unit)}
+
+        return ConicalShadowFunctions(r_km, s_unit)
+
+    def Events(self, js_start, js_end, step_s=60.0, tol_s=1e-3):
+        """Shadow entries and exits within [js_start, js_end] [JS from J2000, UTC].
+        Inputs: 1. step_s: coarse step [s] bracketing the sign changes
+                2. tol_s: event time tolerance [s]
+        Output: Table (dictionary of column arrays), sorted by time, of the event
+                time [JS from J2000, UTC], boundary, and whether it is an entry.
+        """
+        js_steps = np.append(np.arange(js_start, js_end, step_s), js_end)
+        shadow = self.Shadow(js_steps)
+
+        times, boundaries, entering = [], [], []
+        for boundary in self.boundaries_:
+            g = shadow[boundary]
+            bracket = np.flatnonzero((g[:-1] > 0.0) != (g[1:] > 0.0))
+
+            js_event = Bisection(
+                lambda js: self.Shadow(js)[boundary],
+                js_steps[bracket],
+                js_steps[bracket + 1],
+                g[bracket],
+                g[bracket + 1],
+                tol=tol_s,
+            )
+
+            times.append(js_event)
+            boundaries.append(np.full(len(bracket), boundary))
+            entering.append(g[bracket] > 0.0)
+
+        times = np.concatenate(times)
+        order = np.argsort(times, kind="stable")
+
+        return {
+            "js_j2000_utc": times[order],
+            "boundary": np.concatenate(boundaries)[order],
+            "entering": np.concatenate(entering)[order],
+        }
+
+    def Windows(self, js_start, js_end, boundary=None, step_s=60.0, tol_s=1e-3):
+        """Start and end times of the windows inside a shadow boundary (default: the
+        outermost, i.e. any eclipse), clipped to [js_start, js_end]."""
+        boundary = boundary or self.boundaries_[0]
+        events = self.Events(js_start, js_end, step_s, tol_s)
+        is_boundary = events["boundary"] == boundary
+        js_event = events["js_j2000_utc"][is_boundary]
+        entering = events["entering"][is_boundary]
+
+        # Windows open at the start of the span if it starts inside the shadow.
+        inside = self.Shadow([js_start])[boundary][0] <= 0.0
+        js_start_windows = js_event[entering]
+        js_end_windows = js_event[~entering]
+        if inside:
+            js_start_windows = np.insert(js_start_windows, 0, js_start)
+        if len(js_end_windows) < len(js_start_windows):
+            js_end_windows = np.append(js_end_windows, js_end)
+
+        return js_start_windows, js_end_windows
+
+    def SunlitWindows(self, js_start, js_end, step_s=60.0, tol_s=1e-3):
+        # Windows of full Sun visibility: the complement of the outermost shadow windows.
+        js_shadow_start, js_shadow_end = self.Windows(
+            js_start, js_end, step_s=step_s, tol_s=tol_s
+        )
+        js_lit_start = np.insert(js_shadow_end, 0, js_start)
+        js_lit_end = np.append(js_shadow_start, js_end)
+        lit = js_lit_end > js_lit_start
+
+        return js_lit_start[lit], js_lit_end[lit]
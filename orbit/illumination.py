@@ -0,0 +1,119 @@
+"""ACS Toolbox: Orbit Illumination Module
+This module evaluates the beta angle (elevation of the Sun above the orbit
+plane) and the eclipse fraction of every orbit of many candidate orbits over a
+lifetime, from the secular SGP4 rates instead of propagated states:
+
+    1. Orbit plane: the RAAN drifts at the secular rate Omegadot of the SGP4
+       epoch quantities, and the inclination is constant.
+    2. Beta angle: beta = asin(h . s), with h the unit orbit normal and s the
+       unit Sun vector at the middle of each orbit.
+    3. Eclipse fraction: cylindrical Earth shadow of a circular orbit of the
+       mean semi-major axis a, f = acos(sqrt(a^2 - R_E^2) / (a cos beta)) / pi
+       for |beta| < asin(R_E / a), and 0 otherwise.
+
+Comments: Drag decay of the semi-major axis and the eccentricity are neglected,
+          and the orbit (TEME) and Sun (MOD) frames are not distinguished.
+"""
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.constants.celestial_constants import kr_E
+
+
+def OrbitNormals(i_rad, Omega_rad):
+    # (..., 3) unit orbit normals of inclinations and RAANs [rad].
+    return np.stack(
+        [
+            np.sin(i_rad) * np.sin(Omega_rad),
+            -np.sin(i_rad) * np.cos(Omega_rad),
+            np.cos(i_rad) * np.ones_like(Omega_rad),
+        ],
+        axis=-1,
+    )
+
+
+def BetaAngles(h_unit, s_unit):
+    # Beta angles [rad] of (..., 3) unit orbit normals and unit Sun vectors.
+    return np.arcsin(np.clip(np.sum(h_unit * s_unit, axis=-1), -1.0, 1.0))
+
+
+def EclipseFractions(beta_rad, a_km):
+    # Fractions of circular orbits of radius a_km in the cylindrical Earth shadow.
+    beta_rad, a_km = np.broadcast_arrays(beta_rad, a_km)
+    fraction = np.zeros(beta_rad.shape)
+
+    shadowed = np.abs(beta_rad) < np.arcsin(np.clip(kr_E / a_km, 0.0, 1.0))
+    fraction[shadowed] = (
+        np.arccos(
+            np.sqrt(a_km[shadowed] ** 2 - kr_E**2)
+            / (a_km[shadowed] * np.cos(beta_rad[shadowed]))
+        )
+        / np.pi
+    )
+
+    return fraction
+
+
+def LifetimeIllumination(
+    catalog, sun, js_start, js_end, epoch_jsj2000_utc=None, max_samples=2**22
+):
+    """Beta angle and eclipse fraction of every orbit of every catalog satellite.
+    Inputs: 1. catalog: SGP4Catalog of the candidate orbits
+            2. sun: Sun (or SunTable) object, which may extend past the end of the
+               EOP table (see Sun out_of_range)
+            3. js_start, js_end: lifetime [JS from J2000, UTC]
+            4. epoch_jsj2000_utc: TLE epochs [JS from J2000, UTC] (default: the
+               epoch_jsj2000_utc column of the catalog)
+            5. max_samples: number of orbits evaluated at once
+    Output: Table (dictionary of (S, n_orbits) column arrays) of the middle time of
+            each orbit [JS from J2000, UTC], beta angle [rad] and eclipse fraction.
+            Orbits are consecutive nodal periods from js_start; orbits which end
+            after js_end are NaN.
+
+    Example Call:
+        catalog = SGP4Catalog.FromTLEParameters(candidate_tle_params)
+        table = LifetimeIllumination(catalog, Sun(clock).Tabulate(js_start, js_end), js_start, js_end)
+    """
+    if epoch_jsj2000_utc is None:
+        epoch_jsj2000_utc = catalog.elements_["epoch_jsj2000_utc"]
+    epoch_jsj2000_utc = np.broadcast_to(
+        np.asarray(epoch_jsj2000_utc, dtype=np.float64), (len(catalog),)
+    )
+
+    epoch = catalog.epoch_
+    period_s = 2.0 * np.pi / (epoch["Mdot"] + epoch["wdot"]) * 60.0
+    a_km = epoch["ai"] * kr_E
+    n_orbits = np.floor((js_end - js_start) / period_s).astype(np.int64)
+
+    n_orbits_max = max(int(n_orbits.max(initial=0)), 0)
+    table = {
+        key: np.full((len(catalog), n_orbits_max), np.nan)
+        for key in ("js_j2000_utc", "beta_rad", "eclipse_fraction")
+    }
+
+    # Satellites are evaluated in chunks of whole lifetimes.
+    chunk_size = max(1, max_samples // max(n_orbits_max, 1))
+    for start in range(0, len(catalog), chunk_size):
+        stop = min(start + chunk_size, len(catalog))
+        satellite, k = np.nonzero(
+            np.arange(n_orbits_max)[np.newaxis, :] < n_orbits[start:stop, np.newaxis]
+        )
+        satellite += start
+        js = js_start + (k + 0.5) * period_s[satellite]
+
+        dt_min = (js - epoch_jsj2000_utc[satellite]) / 60.0
+        Omega_rad = (
+            epoch["Omega_rad"][satellite] + epoch["Omegadot"][satellite] * dt_min
+        )
+        h_unit = OrbitNormals(epoch["i0_rad"][satellite], Omega_rad)
+        beta_rad = BetaAngles(h_unit, sun.GetMODFromJSJ2000UTC(js))
+
+        table["js_j2000_utc"][satellite, k] = js
+        table["beta_rad"][satellite, k] = beta_rad
+        table["eclipse_fraction"][satellite, k] = EclipseFractions(
+            beta_rad, a_km[satellite]
+        )
+
+    return table
@@ -0,0 +1,238 @@
+"""ACS Toolbox: Parallel SGP4 Catalog Propagation
+This module splits the (satellites x times) grid of an SGP4Catalog into fixed
+tiles and propagates them on a process pool. Workers write their states
+directly into output arrays in multiprocessing.shared_memory, or into .npy
+memory maps, so that no states are pickled back to the parent process.
+
+The tiles depend only on the tile sizes, never on the number of workers or the
+order in which they finish, and every state is computed independently: the
+results are identical for any number of workers.
+
+Example Call:
+    catalog = SGP4Catalog.FromTLEParameters(tle_params)
+    r_teme, v_teme, error = PropagateCatalogParallel(
+        catalog, np.arange(0.0, 1440.0, 1.0), n_workers=32
+    )
+"""
+
+# Standard libraries.
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.orbit.catalog import SGP4Catalog, SliceEpoch
+from acstoolbox.orbit.tle import SGP4Propagate
+from acstoolbox.time.shared import AttachSharedMemory
+
+# Output arrays of the catalog propagation: name, trailing shape and dtype.
+OUTPUT_ARRAYS = [
+    ("r_teme", (3,), np.float64),
+    ("v_teme", (3,), np.float64),
+    ("error", (), np.int8),
+]
+
+# Catalog, times and output arrays of a worker process (set by _InitializeWorker).
+_worker = {}
+
+
+def CatalogTiles(n_satellites, n_times, tile_satellites=256, tile_times=None):
+    """Deterministic tiles ((s0, s1), (t0, t1)) of the (satellites x times) grid,
+    ordered by satellite then time. tile_times=None tiles over satellites only."""
+    tile_times = tile_times or n_times
+    return [
+        (
+            (s0, min(s0 + tile_satellites, n_satellites)),
+            (t0, min(t0 + tile_times, n_times)),
+        )
+        for s0 in range(0, n_satellites, tile_satellites)
+        for t0 in range(0, n_times, tile_times)
+    ]
+
+
+def _OpenOutputs(descriptions):
+    # Attach to the output arrays described by the parent process.
+    outputs, handles = [], []
+    for description in descriptions:
+        if "name" in description:
+            shm = AttachSharedMemory(description["name"])
+            outputs.append(
+                np.ndarray(description["shape"], description["dtype"], buffer=shm.buf)
+            )
+            handles.append(shm)
+        else:
+            outputs.append(np.load(description["file"], mmap_mode="r+"))
+
+    return outputs, handles
+
+
+def _InitializeWorker(
+    elements, dt_min, descriptions, dEw_max, n_iter_max, outputs=None
+):
+    catalog = SGP4Catalog(elements)
+    catalog.dEw_max = dEw_max
+    catalog.n_iter_max = n_iter_max
+
+    # The calling process writes into its own output arrays.
+    handles = []
+    if outputs is None:
+        outputs, handles = _OpenOutputs(descriptions)
+    _worker.update(catalog=catalog, dt_min=dt_min, outputs=outputs, handles=handles)
+
+
+def _PropagateTile(tile):
+    # Propagate one tile and write its states into the output arrays.
+    (s0, s1), (t0, t1) = tile
+    catalog = _worker["catalog"]
+    dt_min = _worker["dt_min"]
+    dt_tile = dt_min[t0:t1] if dt_min.ndim == 1 else dt_min[s0:s1, t0:t1]
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        states = SGP4Propagate(
+            SliceEpoch(catalog.epoch_, s0, s1),
+            dt_tile if dt_tile.ndim == 2 else dt_tile[np.newaxis, :],
+            catalog.dEw_max,
+            catalog.n_iter_max,
+            return_error=True,
+        )
+
+    for output, state in zip(_worker["outputs"], states):
+        output[s0:s1, t0:t1] = state
+
+    return (s1 - s0) * (t1 - t0)
+
+
+class _OutputBuffers:
+    def __init__(self, n_satellites, n_times, output_dir=None):
+        # Output arrays in shared memory, or .npy memory maps in output_dir.
+        self.shms_ = []
+        self.descriptions_ = []
+        self.arrays_ = []
+        for name, trailing_shape, dtype in OUTPUT_ARRAYS:
+            shape = (n_satellites, n_times) + trailing_shape
+            if output_dir is not None:
+                file = os.path.join(output_dir, f"{name}.npy")
+                array = np.lib.format.open_memmap(
+                    file, mode="w+", dtype=dtype, shape=shape
+                )
+                array.flush()
+                self.descriptions_.append({"file": file})
+            else:
+                nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+                array = np.ndarray(shape, dtype, buffer=shm.buf)
+                self.shms_.append(shm)
+                self.descriptions_.append(
+                    {"name": shm.name, "shape": shape, "dtype": np.dtype(dtype).str}
+                )
+
+            self.arrays_.append(array)
+
+    def Results(self):
+        """Memory maps are returned as is. Shared memory is copied out, and each
+        segment is released as soon as its array is copied, so the peak memory is
+        the outputs plus the largest one (r_teme or v_teme), about 1.5 times the
+        outputs; PropagateCatalogParallel(output_dir=...) avoids the copies."""
+        if not self.shms_:
+            for array in self.arrays_:
+                array.flush()
+            return tuple(self.arrays_)
+
+        results = []
+        for k, shm in enumerate(self.shms_):
+            results.append(self.arrays_[k].copy())
+            self.arrays_[k] = None
+            self._Release(shm)
+        self.shms_ = []
+        return tuple(results)
+
+    @staticmethod
+    def _Release(shm):
+        shm.close()
+        shm.unlink()
+
+    def Close(self):
+        self.arrays_ = []
+        for shm in self.shms_:
+            self._Release(shm)
+        self.shms_ = []
+
+
+def PropagateCatalogParallel(
+    catalog,
+    dt_min,
+    n_workers=None,
+    tile_satellites=256,
+    tile_times=None,
+    output_dir=None,
+    progress=None,
+    mp_context=None,
+):
+    """Propagate an SGP4Catalog over a (satellites x times) grid on a process pool.
+    Inputs: 1. catalog: SGP4Catalog
+            2. dt_min: (T,) times [min] from every TLE epoch, or (S, T) times per satellite
+            3. n_workers: number of worker processes (default: os.cpu_count()); 1 runs
+               the tiles in the calling process
+            4. tile_satellites, tile_times: tile size (default: all times per tile)
+            5. output_dir: directory of r_teme.npy, v_teme.npy and error.npy memory
+               maps (default: shared memory, copied to arrays on return, with a
+               peak of about 1.5 times the outputs in memory)
+            6. progress: optional callback progress(n_done, n_total) of states
+            7. mp_context: multiprocessing context or start method (default: platform)
+    Output: 1. (S, T, 3) positions [km] in TEME frame
+            2. (S, T, 3) velocities [km/s] in TEME frame
+            3. (S, T) SGP4 error codes (SGP4_ERROR_*); states in error are NaN
+    """
+    dt_min = np.asarray(dt_min, dtype=np.float64)
+    n_satellites = len(catalog)
+    if dt_min.ndim not in (1, 2) or (
+        dt_min.ndim == 2 and dt_min.shape[0] != n_satellites
+    ):
+        raise ValueError(
+            f"Times of shape {dt_min.shape} must be (T,) or ({n_satellites}, T)."
+        )
+    dt_min = np.ascontiguousarray(dt_min)
+    n_times = dt_min.shape[-1]
+
+    n_workers = n_workers or os.cpu_count()
+    tiles = CatalogTiles(n_satellites, n_times, tile_satellites, tile_times)
+    n_total = n_satellites * n_times
+    n_done = 0
+
+    buffers = _OutputBuffers(n_satellites, n_times, output_dir)
+    try:
+        worker_args = (
+            catalog.elements_,
+            dt_min,
+            buffers.descriptions_,
+            catalog.dEw_max,
+            catalog.n_iter_max,
+        )
+
+        if n_workers == 1 or len(tiles) == 1:
+            _InitializeWorker(*worker_args, outputs=buffers.arrays_)
+            try:
+                for tile in tiles:
+                    n_done += _PropagateTile(tile)
+                    if progress is not None:
+                        progress(n_done, n_total)
+            finally:
+                _worker.clear()
+        else:
+            if not isinstance(mp_context, multiprocessing.context.BaseContext):
+                mp_context = multiprocessing.get_context(mp_context)
+
+            with mp_context.Pool(
+                min(n_workers, len(tiles)), _InitializeWorker, worker_args
+            ) as pool:
+                for n_tile in pool.imap_unordered(_PropagateTile, tiles):
+                    n_done += n_tile
+                    if progress is not None:
+                        progress(n_done, n_total)
+
+        return buffers.Results()
+    finally:
+        buffers.Close()
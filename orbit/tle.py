@@ -1,44 +1,304 @@
 import math
 import numpy as np
+import os
 from acstoolbox.constants.celestial_constants import *
 from acstoolbox.constants.time_constants import *
-from acstoolbox.time import time
-from acstoolbox.constants.time_constants import *
+
+# Astrodynamic constants based on Earth model.
+SGP4_KE = (3600.0 * kG_E / (kr_E**3)) ** 0.5
+SGP4_K2 = 5.41308 * (10 ** (-4))
+SGP4_A30 = -kJ3
+SGP4_K4 = 0.62098875 * (10 ** (-6))
+
+# Astrodynamical constants assuming perigee above 156km.
+SGP4_Q0 = 1.0 + 120 / kr_E
+SGP4_S = 1 + 78 / kr_E
+
+# Mean eccentricity at or below which the drag perturbations of the argument of
+# perigee and mean anomaly (which divide by it) are zero, as in Vallado et al.
+SGP4_DRAG_ECCENTRICITY_MIN = 1.0e-4
+
+# SGP4 error codes, as in Vallado et al., AIAA 2006-6753.
+SGP4_ERROR_NONE = 0
+SGP4_ERROR_MEAN_ELEMENTS = 1  # Mean eccentricity outside [0, 1) or a < 0.95 ER.
+SGP4_ERROR_MEAN_MOTION = 2  # Mean motion is not positive.
+SGP4_ERROR_SEMI_LATUS_RECTUM = 4  # Semi-latus rectum is negative.
+SGP4_ERROR_DECAYED = 6  # Satellite radius is below the Earth's surface.
+SGP4_ERROR_KEPLER = 7  # Kepler's equation did not converge.
+
 
 def strsign2float(str):
-    if str == '-':
+    if str == "-":
         return -1.0
-    
+
     # '+' or ' '
     return +1.0
 
+
+# Fixed-width TLE line length, including the checksum column.
+TLE_LINE_LENGTH = 69
+
+# Two-digit epoch years from 57 are in the 1900s, as in the Space-Track convention.
+TLE_EPOCH_YEAR_PIVOT = 57
+
+# Alpha-5 catalog numbers from 100000: a leading letter (without I and O, which
+# read as digits) counts 10 (A) to 33 (Z) ten-thousands.
+TLE_ALPHA5_LETTERS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+
+# Fixed-width integer fields [start, stop) of lines 1 and 2, which must hold digits
+# or blanks (the catalog numbers [2, 7) may also start with an Alpha-5 letter).
+TLE_DIGIT_FIELDS_1 = [(3, 7), (18, 20), (54, 59), (60, 61)]
+TLE_DIGIT_FIELDS_2 = [(3, 7), (26, 33)]
+
+
+def TLEChecksum(line):
+    # Mod-10 checksum of the first 68 columns: digits count their value, '-' counts 1.
+    return (
+        sum(int(c) if c.isdigit() else c == "-" for c in line[: TLE_LINE_LENGTH - 1])
+        % 10
+    )
+
+
+def _TLELines(tle_source):
+    # Lines of a path or an iterable of lines, read lazily.
+    if isinstance(tle_source, (str, os.PathLike)):
+        with open(tle_source) as opened_file:
+            yield from opened_file
+    else:
+        yield from tle_source
+
+
+def _TLERecords(tle_source):
+    """Group the lines of a 2LE or 3LE file into (name, line 1, line 2, line numbers
+    of lines 1 and 2). The name is the preceding title line (without a '0 '
+    prefix), or '' without one. Blank lines are skipped; a title must be followed
+    by line 1."""
+    name, title_number, line_1, line_1_number = "", None, None, 0
+    for line_number, line in enumerate(_TLELines(tle_source), 1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+
+        if line_1 is None and line.startswith("1 "):
+            line_1, line_1_number = line, line_number
+        elif line_1 is not None:
+            if not line.startswith("2 "):
+                raise ValueError(
+                    f"TLE line {line_number} is not line 2 of an element set."
+                )
+            yield name, line_1, line, (line_1_number, line_number)
+            name, title_number, line_1 = "", None, None
+        elif line.startswith("2 "):
+            raise ValueError(f"TLE line {line_number} is missing its line 1.")
+        elif title_number is not None:
+            raise ValueError(
+                f"TLE title line {title_number} is followed by another title line "
+                f"{line_number} instead of line 1."
+            )
+        else:
+            name = line[2:].strip() if line.startswith("0 ") else line.strip()
+            title_number = line_number
+
+    if line_1 is not None:
+        raise ValueError(f"TLE line {line_1_number} is missing its line 2.")
+
+
+def _TLECharacters(lines):
+    # (n, 69) uint8 array of the fixed-width lines, padded with spaces.
+    return np.frombuffer(
+        "".join(line[:TLE_LINE_LENGTH].ljust(TLE_LINE_LENGTH) for line in lines).encode(
+            "ascii"
+        ),
+        dtype=np.uint8,
+    ).reshape(len(lines), TLE_LINE_LENGTH)
+
+
+def _TLEFloat(chars, start, stop):
+    # Vectorized float() of the fixed-width column [start, stop).
+    return (
+        np.ascontiguousarray(chars[:, start:stop])
+        .view(f"S{stop - start}")[:, 0]
+        .astype(np.float64)
+    )
+
+
+def _TLEDigits(chars, start, stop):
+    # Unsigned integer of the fixed-width column [start, stop); blanks count as 0.
+    digits = np.where(
+        chars[:, start:stop] == ord(" "), 0, chars[:, start:stop] - ord("0")
+    )
+    return digits.astype(np.int64) @ (10 ** np.arange(stop - start - 1, -1, -1))
+
+
+def _TLEAlpha5Values():
+    # Value of the leading character of catalog numbers: digits, blanks (0) and
+    # Alpha-5 letters, or -1.
+    values = np.full(256, -1, dtype=np.int64)
+    values[ord("0") : ord("9") + 1] = np.arange(10)
+    values[ord(" ")] = 0
+    for k, letter in enumerate(TLE_ALPHA5_LETTERS):
+        values[ord(letter)] = 10 + k
+    return values
+
+
+_TLE_ALPHA5_VALUES = _TLEAlpha5Values()
+
+
+def _TLECatalogNumbers(chars):
+    # Catalog numbers of columns [2, 7), 5 digits or Alpha-5.
+    return _TLE_ALPHA5_VALUES[chars[:, 2]] * 10000 + _TLEDigits(chars, 3, 7)
+
+
+def _TLEFieldErrors(chars, line_numbers, digit_fields):
+    # Raise a ValueError at the first catalog number or integer field which holds
+    # other characters than digits and blanks.
+    is_digit = ((chars >= ord("0")) & (chars <= ord("9"))) | (chars == ord(" "))
+    invalid = [(2, 3, _TLE_ALPHA5_VALUES[chars[:, 2]] < 0)] + [
+        (start, stop, ~np.all(is_digit[:, start:stop], axis=1))
+        for start, stop in digit_fields
+    ]
+    for start, stop, rows in invalid:
+        if np.any(rows):
+            row = np.flatnonzero(rows)[0]
+            field = chars[row, start:stop].tobytes().decode("ascii", "replace")
+            raise ValueError(
+                f"TLE line {line_numbers[row]} has an invalid number '{field}' in "
+                f"columns {start + 1}-{stop}."
+            )
+
+
+def _TLESign(chars, column):
+    return np.where(chars[:, column] == ord("-"), -1.0, 1.0)
+
+
+def _TLEChecksumErrors(chars):
+    # Indices of the lines whose mod-10 checksum does not match column 69.
+    body = chars[:, : TLE_LINE_LENGTH - 1]
+    digits = np.where((body >= ord("0")) & (body <= ord("9")), body - ord("0"), 0)
+    checksum = (digits.sum(axis=1) + (body == ord("-")).sum(axis=1)) % 10
+
+    return np.flatnonzero(checksum != chars[:, TLE_LINE_LENGTH - 1] - ord("0"))
+
+
+def TLEEpochToJSJ2000UTC(year, fractional_days):
+    """Vectorized TLE epoch (year, day of year with Jan 1 0h = 1.0) to JS from J2000 (UTC)."""
+    year = np.asarray(year, dtype=np.int64)
+
+    # Julian Date of Jan 0, 0h (UTCFractionalDayToJDUTC with m = 1, d = 0), from J2000.
+    days_jan_0 = 367 * year - (7 * year) // 4 + 30 + 1721013.5 - JD_J2000
+
+    return (days_jan_0 + np.asarray(fractional_days, dtype=np.float64)) * DAY_IN_SECONDS
+
+
+def _ParseTLEColumns(records, validate_checksums, century):
+    names, lines_1, lines_2, line_numbers = zip(*records)
+    line_numbers_1, line_numbers_2 = zip(*line_numbers)
+    chars_1 = _TLECharacters(lines_1)
+    chars_2 = _TLECharacters(lines_2)
+
+    if validate_checksums:
+        for chars, numbers in ((chars_1, line_numbers_1), (chars_2, line_numbers_2)):
+            errors = _TLEChecksumErrors(chars)
+            if len(errors):
+                raise ValueError(f"TLE line {numbers[errors[0]]} fails its checksum.")
+
+    _TLEFieldErrors(chars_1, line_numbers_1, TLE_DIGIT_FIELDS_1)
+    _TLEFieldErrors(chars_2, line_numbers_2, TLE_DIGIT_FIELDS_2)
+
+    columns = {}
+    columns["name"] = np.array(names)
+    columns["norad_id"] = _TLECatalogNumbers(chars_1)
+
+    # B* drag term [1/ER], with an implied leading decimal point and exponent.
+    columns["bstar"] = (
+        _TLESign(chars_1, 53)
+        * _TLEDigits(chars_1, 54, 59)
+        * 1e-5
+        * 10.0 ** (_TLESign(chars_1, 59) * _TLEDigits(chars_1, 60, 61))
+    )
+    columns["inclination"] = np.radians(_TLEFloat(chars_2, 8, 16))
+    columns["argument_perigee"] = np.radians(_TLEFloat(chars_2, 34, 42))
+    columns["eccentricity"] = _TLEDigits(chars_2, 26, 33) * 1e-7
+    columns["right_ascension"] = np.radians(_TLEFloat(chars_2, 17, 25))
+    columns["mean_anomaly"] = np.radians(_TLEFloat(chars_2, 43, 51))
+    columns["mean_motion"] = _TLEFloat(chars_2, 52, 63) * 2 * np.pi / 1440
+
+    # Epoch.
+    year = _TLEDigits(chars_1, 18, 20)
+    if century is None:
+        year = year + np.where(year < TLE_EPOCH_YEAR_PIVOT, 2000, 1900)
+    else:
+        year = year + century
+    columns["year"] = year.astype(np.float64)
+    columns["fractional_days"] = _TLEFloat(chars_1, 20, 32)
+    columns["epoch_jsj2000_utc"] = TLEEpochToJSJ2000UTC(
+        year, columns["fractional_days"]
+    )
+
+    return columns
+
+
+def ReadTLECatalogChunks(
+    tle_source, chunk_size=65536, validate_checksums=True, century=None
+):
+    """Parse a 2LE or 3LE catalog into column arrays, chunk by chunk.
+    Inputs: 1. tle_source: file path or iterable of lines (title lines are optional)
+            2. chunk_size: number of element sets per chunk
+            3. validate_checksums: raise ValueError on a mod-10 checksum mismatch
+            4. century: century added to the two-digit epoch years (default: 57 pivot)
+    Output: Generator of dictionaries of column arrays: name, norad_id and the
+            TLEParametersFromFile keys. Memory is bounded by the chunk size.
+    """
+    records = []
+    for record in _TLERecords(tle_source):
+        records.append(record)
+        if len(records) == chunk_size:
+            yield _ParseTLEColumns(records, validate_checksums, century)
+            records = []
+
+    if records:
+        yield _ParseTLEColumns(records, validate_checksums, century)
+
+
+def ReadTLECatalog(tle_source, validate_checksums=True, century=None):
+    """Parse a whole 2LE or 3LE catalog into column arrays (see ReadTLECatalogChunks).
+
+    Example Call:
+        catalog = SGP4Catalog(ReadTLECatalog("catalog.txt"))
+    """
+    chunks = list(
+        ReadTLECatalogChunks(
+            tle_source, validate_checksums=validate_checksums, century=century
+        )
+    )
+    if not chunks:
+        raise ValueError("The TLE catalog has no element sets.")
+
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def ReadTLEs(tle_source, chunk_size=1024, validate_checksums=True, century=None):
+    # Lazily yield the TLE parameters of each element set of a 2LE or 3LE catalog.
+    for columns in ReadTLECatalogChunks(
+        tle_source, chunk_size, validate_checksums, century
+    ):
+        for i in range(len(columns["norad_id"])):
+            yield {key: value[i].item() for key, value in columns.items()}
+
+
 def TLEParametersFromFile(tle_filepath, century):
-    tle_param = {}
-    
-    with open(tle_filepath) as opened_file:
-        tle_contents = opened_file.readlines()
-    
-        tle_param['bstar'] = strsign2float(tle_contents[0][53])*float("0."+tle_contents[0][54:59]) * 10**(strsign2float(tle_contents[0][59])*float(tle_contents[0][60]))
-        tle_param['inclination'] = float(tle_contents[1][8:15])/180.0*np.pi
-        tle_param['argument_perigee'] = float(tle_contents[1][34:42])/180.0*np.pi
-        tle_param['eccentricity'] = float("0."+tle_contents[1][26:34])
-        tle_param['right_ascension'] = float(tle_contents[1][17:25])/180.0*np.pi
-        tle_param['mean_anomaly'] = float(tle_contents[1][43:51])/180.0*np.pi
-        tle_param['mean_motion'] = float(tle_contents[1][52:63])*2*np.pi/1440
-        tle_param['year'] = float(str(int(century/100)) + tle_contents[0][18:20])
-        tle_param['fractional_days'] = float(tle_contents[0][20:32])
-
-        jd_utc = time.YearFractionalDaystoJDUTC(tle_param['year'], tle_param['fractional_days'])
-        tle_param['epoch_jsj2000_utc'] = (jd_utc - kJDJ2000) * kDayInSeconds
-
-        
-
-    return tle_param
-
-
-class SGP4():
+    # TLE parameters of the first element set of the file (checksums are not validated).
+    for tle_param in ReadTLEs(
+        tle_filepath, chunk_size=1, validate_checksums=False, century=century
+    ):
+        return tle_param
+
+    raise ValueError(f"{tle_filepath} has no element sets.")
+
+
+class SGP4:
     def __init__(self, tle_param):
-        """ SGP4 Algorithm
+        """SGP4 Algorithm
         Accuracy: 10s of km
 
         Source: http://www.celestrak.com/NORAD/documentation/spacetrk.pdf
@@ -54,179 +314,426 @@ class SGP4():
                 2. Time elapsed in [min] from TLE epoch
         Output: 1. Position [km] in TEME frame
                 2. Velocity [km/s] in TEME frame
-        Example: 
+        Example:
 
         # 1 88888U 80 275.98708465 .00073094 13844-3 66816-4 0 8
         # 2 88888 72.8435 115.9689 0086731 52.6988 110.5714 16.05824518 105
         # At 0 min:
         # r     2328.96594238 -5995.21600342 1719.97894287
-        # v     2.91110113 -0.98164053 -7.09049922   
+        # v     2.91110113 -0.98164053 -7.09049922
         # At 360 min:
         # r     2456.00610352 -6071.94232177 1222.95977784
         # v     2.67852119 -0.44705850 -7.22800565
         """
-        
+
         # Iterative solver for Kepler's equation.
         self.dEw0 = 1
         self.dEw_max = 1e-5
         self.n_iter_max = 30
-        
+
         # TLE parameters read from file.
-        self.bstar = tle_param['bstar']
-        self.i0_rad = tle_param['inclination']
-        self.w_rad = tle_param['argument_perigee']
-        self.e0 = tle_param['eccentricity']
-        self.Omega_rad = tle_param['right_ascension']
-        self.M0_rad = tle_param['mean_anomaly']
-        self.n0_radpmin = tle_param['mean_motion']
+        self.bstar = tle_param["bstar"]
+        self.i0_rad = tle_param["inclination"]
+        self.w_rad = tle_param["argument_perigee"]
+        self.e0 = tle_param["eccentricity"]
+        self.Omega_rad = tle_param["right_ascension"]
+        self.M0_rad = tle_param["mean_anomaly"]
+        self.n0_radpmin = tle_param["mean_motion"]
+
+        # Epoch-dependent quantities are evaluated once.
+        self.epoch_ = SGP4Initialize(
+            self.bstar,
+            self.i0_rad,
+            self.w_rad,
+            self.e0,
+            self.Omega_rad,
+            self.M0_rad,
+            self.n0_radpmin,
+        )
 
     def GetOrbitState(self, dt_min):
         """Sample Call
-            tle_param = {}
-            tle_param['bstar'] = 0.66816*(10**(-4))
-            tle_param['inclination'] = 72.8435/180.0*np.pi
-            tle_param['argument_perigee'] = 52.6988/180.0*np.pi
-            tle_param['eccentricity'] = 0.0086731
-            tle_param['right_ascension'] = 115.9689/180.0*np.pi
-            tle_param['mean_anomaly'] = 110.5714/180.0*np.pi
-            tle_param['mean_motion'] = 16.05824518*2*np.pi/1440
-            sgp4 = tle.SGP4(tle_param)
-
-            sgp4.GetOrbitState(0.0)
-            sgp4.GetOrbitState(360.0)
+        tle_param = {}
+        tle_param['bstar'] = 0.66816*(10**(-4))
+        tle_param['inclination'] = 72.8435/180.0*np.pi
+        tle_param['argument_perigee'] = 52.6988/180.0*np.pi
+        tle_param['eccentricity'] = 0.0086731
+        tle_param['right_ascension'] = 115.9689/180.0*np.pi
+        tle_param['mean_anomaly'] = 110.5714/180.0*np.pi
+        tle_param['mean_motion'] = 16.05824518*2*np.pi/1440
+        sgp4 = tle.SGP4(tle_param)
+
+        sgp4.GetOrbitState(0.0)
+        sgp4.GetOrbitState(360.0)
+
+        An array of N times returns (N, 3) positions and velocities.
+        """
+        return SGP4Propagate(self.epoch_, dt_min, self.dEw_max, self.n_iter_max)
+
+    def GetOrbitStates(self, dt_min):
+        """Propagate to an array of N times [min] from the TLE epoch.
+        Output: 1. (N, 3) positions [km] in TEME frame
+                2. (N, 3) velocities [km/s] in TEME frame
+
+        Sample Call
+        r_teme, v_teme = sgp4.GetOrbitStates(np.arange(0.0, 1440.0, 1.0 / 60.0))
         """
-        # Astrodynamic constants based on Earth model.
-        ke = (3600.0 * kG_E / (kr_E**3))**0.5
-        k2 = 5.41308*(10**(-4))
-        A30 = -kJ3
-        k4 = 0.62098875*(10**(-6))
-        Theta = np.cos(self.i0_rad)
-
-        # Astrodynamical constants assuming perigee above 156km.
-        q0 = 1.0 + 120/kr_E 
-        s = 1 + 78/kr_E     
-        
-        # Recover the original mean motion (ni) and semi-major axis (ai).
-        a1 = (ke/self.n0_radpmin) ** (2.0/3.0)
-        d1 = 1.5 * k2/(a1**2) * (3*(Theta**2) - 1)/((1 - self.e0**2)**1.5)
-        a0 = a1 * (1 - (1.0/3.0)*d1 - (d1**2) - (134.0/81.0)*(d1**3))
-        d0 = 1.5 * k2/(a0**2) * (3*(Theta**2) - 1)/((1 - self.e0**2)**1.5)
-        ni = self.n0_radpmin / (1 + d0)
-        ai = a0 / (1 - d0)
-
-        # Astrodynamical constants for evaluating secular effects of drag and gravitation.
-        Tsi = 1 / (ai - s)
-        B0 = (1-(self.e0**2))**0.5
-        eta = ai * self.e0 * Tsi
- 
-        # Exponential constants to simplify secular expressions.
-        k22 = k2**2
-        kc2 = ai**2
-        kc3 = ai**4
-        kc4 = (q0-s)**4
-        kc5 = Tsi**4
-        kc6 = Theta**2
-        kc7 = Theta**4
-        kc8 = eta**2
-        kc9 = eta**3
-        kc10 = 1-(eta**2)
-        kc11 = B0**2
-        kc12 = B0**4
-        kc13 = B0**8
-        kc14 = kc10**(-3.5)
-        
-        # Coefficients used to evaluate the secular effects of drag and gravitation.
-        C2 = kc4 * kc5 * ni * kc14 * (ai*(1+1.5*kc8 + 4*self.e0*eta
-                                      + self.e0*(eta**3)) 
-                                      + 1.5*(k2*Tsi/kc10)*(-0.5 + 1.5*kc6)*(8.0+24.0*kc8+3*(eta**4)))
-        C1 = self.bstar * C2
-        C3 = kc4*(Tsi**5)*A30*ni*kAE*np.sin(self.i0_rad)/(k2*self.e0)
-        C4 = 2.0*ni*kc4*kc5*ai*kc11*kc14*((2*eta*(1+self.e0*eta)+0.5*self.e0+0.5*kc9)
-                                           - 2.0*k2*Tsi/(ai*kc10)*(3.0*(1.0-3.0*kc6)*(1.0 + 1.5*kc8-2.0*self.e0*eta 
-                                           - 0.5*self.e0*kc9)+0.75*(1-kc6)*(2*kc8-self.e0*eta-self.e0*kc9)*np.cos(2*self.w_rad)))
-        C5 = 2.0*kc4*kc5*ai*kc11*kc14 * \
-            (1.0+(11.0/4.0)*eta*(eta+self.e0)+self.e0*kc9)
-        D2 = 4.0*ai*Tsi*(C1**2)
-        D3 = (4.0/3.0)*ai*(Tsi**2)*(17.0*ai + s)*(C1**3)
-        D4 = (2.0/3.0)*ai*(Tsi**3)*(221.0*ai + 31.0*s)*(C1**4)
- 
-        # Secular effects of atmospheric drag and gravitation.
-        MDF = self.M0_rad+(1.0+3.0*k2*(-1.0+3.0*kc6)/(2.0*kc2*(B0**3))+3.0*k22*(13.0-78.0*kc6
-                           + 137.0*kc7)/(16.0*kc3*(B0**7)))*ni*dt_min
-        wDF = self.w_rad+(-3.0*k2*(1.0-5.0*kc6)/(2.0*kc2*kc12)+3.0*k22*(7.0-114.0*kc6
-                          + 395.0*kc7)/(16.0*kc3*kc13)+5.0*k4*(3.0-36.0*kc6+49.0*kc7)/(4.0*kc3*kc13))*ni*dt_min
-        OmegaDF = self.Omega_rad+(-3.0*k2*Theta/(kc2*kc12)+3.0*k22*(4.0*Theta-19.0*(Theta**3))/(2.0*kc3*kc13)
-                                  + 5.0*k4*Theta*(3.0-7.0*kc6)/(2.0*kc3*kc13))*ni*dt_min
-        dw = self.bstar*C3*np.cos(self.w_rad)*dt_min
-        dM = -(2.0/3.0)*kc4*self.bstar*kc5*(kAE/(self.e0*eta))*(((1+eta*np.cos(MDF))**3)-((1+eta*np.cos(self.M0_rad))**3))
-        Mp = MDF + dw + dM
-        w = wDF - dw - dM
-        Omega = OmegaDF - (10.5)*(ni*k2*Theta/(kc2*kc11))*C1*(dt_min**2)
-        e = self.e0 - self.bstar*C4*dt_min - self.bstar * \
-            C5*(np.sin(Mp)-np.sin(self.M0_rad))
-        a = ai*((1-C1*dt_min-D2*(dt_min**2)-D3*(dt_min**3)-D4*(dt_min**4))**2)
-        IL = Mp + w + Omega + ni*(1.5*C1*(dt_min**2)+(D2+2*(C1**2))*(dt_min**3)
-                                  + 0.25*(3.0*D3+12.0*C1*D2+10.0*(C1**3))*(dt_min**4) 
-                                  + 0.2*(3.0*D4+12.0*C1*D3+6.0*(D2**2) + 30.0*(C1**2)*D2+15.0*(C1**4))*(dt_min**5))
-        B = (1-(e**2))**0.5
-        n = ke / (a**1.5)
- 
-        # Long-period periodic terms.
-        axN = e*np.cos(w)
-        IL_L = (A30*np.sin(self.i0_rad)/(8.0*k2*a*(B**2)))*axN*((3.0+5.0*Theta)/(1.0+Theta))
-        ayNL = A30*np.sin(self.i0_rad) / (4.0*k2*a*(B**2))
-        IL_T = IL + IL_L
-        ayN = e*np.sin(w) + ayNL
- 
-        # Set up and solve Kepler's equation for Ew_k = E + w.
-        U = IL_T - Omega
-        Ew_k = U
-        dEw = self.dEw0
-        n_iter = 0
-        while (dEw > self.dEw_max and n_iter < self.n_iter_max):
-            Ew_kp1 = Ew_k + (U - ayN*np.cos(Ew_k) + axN*np.sin(Ew_k)- Ew_k)/(-ayN*np.sin(Ew_k) - axN*np.cos(Ew_k) + 1.0)
-            dEw = abs(Ew_kp1 - Ew_k)
-            Ew_k = Ew_kp1
-            n_iter = n_iter + 1
- 
-        # Preliminary quantities for short-period periodics
-        ecosE = axN*np.cos(Ew_k) + ayN*np.sin(Ew_k)
-        esinE = axN*np.sin(Ew_k) - ayN*np.cos(Ew_k)
-        eL = (((axN**2) + (ayN**2)))**0.5
-        pL = a * (1.0-(eL**2))
-        r = a * (1.0-ecosE)
-        rdot = ke*((a**0.5)/r)*esinE
-        rfdot = ke*(pL**0.5)/r
-        cosu = a/r*(np.cos(Ew_k) - axN + ayN*esinE/(1.0+(1.0-(eL**2))**0.5))
-        sinu = a/r*(np.sin(Ew_k) - ayN - axN*esinE/(1.0+(1.0-(eL**2))**0.5))
-        u = math.atan2(sinu, cosu)
-        dr = (k2/(2.0*pL))*(1-kc6)*np.cos(2*u)
-        du = -(k2/(4.0*(pL**2)))*(7.0*kc6-1)*np.sin(2*u)
-        dOmega = (3.0*k2*Theta/(2.0*(pL**2)))*np.sin(2*u)
-        di = (3.0*k2*Theta/(2.0*(pL**2)))*np.sin(self.i0_rad)*np.cos(2*u)
-        drdot = -(k2*n/pL)*(1.0-kc6)*np.sin(2*u)
-        drfdot = (k2*n/pL)*((1.0-kc6)*np.cos(2*u)-1.5*(1.0-3.0*kc6))
- 
-        # Sum the short-period periodic terms to obtain osculating quantities.
-        rk = r*(1.0-1.5*k2*((1.0-(eL**2))**0.5/((pL**2)))
-                * (3.0*(Theta**2)-1.0))+dr
-        uk = u + du
-        Omegak = Omega + dOmega
-        ik = self.i0_rad + di
-        rkdot = rdot + drdot
-        rfkdot = rfdot + drfdot
- 
-        # Unit orientation vectors.
-        M = np.array([-np.sin(Omegak)*np.cos(ik), np.cos(Omegak)*np.cos(ik), np.sin(ik)])
-        N = np.array([np.cos(Omegak), np.sin(Omegak), 0.0])
-        U = M*np.sin(uk) + N * np.cos(uk)
-        V = M*np.cos(uk) - N * np.sin(uk)
- 
-        # Calculate the position and velocity vectors in TEME.
-        # Transform the velocity from [km/min] to [km/s].
-        kunnormalized = kr_E/kAE
-        r_teme = rk * U * kunnormalized
-        v_teme = (rkdot*U + rfkdot*V) * kunnormalized * \
-                 (kDayInMinutes/kDayInSeconds)
+        return self.GetOrbitState(np.atleast_1d(np.asarray(dt_min, dtype=np.float64)))
+
+
+def SGP4Initialize(bstar, i0_rad, w_rad, e0, Omega_rad, M0_rad, n0_radpmin):
+    """Evaluate the SGP4 quantities which only depend on the TLE epoch elements.
+    The elements may be scalars or arrays (e.g. one element per satellite).
+    """
+    bstar = np.asarray(bstar, dtype=np.float64)
+    i0_rad = np.asarray(i0_rad, dtype=np.float64)
+    w_rad = np.asarray(w_rad, dtype=np.float64)
+    e0 = np.asarray(e0, dtype=np.float64)
+    Omega_rad = np.asarray(Omega_rad, dtype=np.float64)
+    M0_rad = np.asarray(M0_rad, dtype=np.float64)
+    n0_radpmin = np.asarray(n0_radpmin, dtype=np.float64)
+
+    ke = SGP4_KE
+    k2 = SGP4_K2
+    A30 = SGP4_A30
+    k4 = SGP4_K4
+    q0 = SGP4_Q0
+    s = SGP4_S
+    Theta = np.cos(i0_rad)
+
+    # Recover the original mean motion (ni) and semi-major axis (ai).
+    a1 = (ke / n0_radpmin) ** (2.0 / 3.0)
+    d1 = 1.5 * k2 / (a1**2) * (3 * (Theta**2) - 1) / ((1 - e0**2) ** 1.5)
+    a0 = a1 * (1 - (1.0 / 3.0) * d1 - (d1**2) - (134.0 / 81.0) * (d1**3))
+    d0 = 1.5 * k2 / (a0**2) * (3 * (Theta**2) - 1) / ((1 - e0**2) ** 1.5)
+    ni = n0_radpmin / (1 + d0)
+    ai = a0 / (1 - d0)
 
+    # Astrodynamical constants for evaluating secular effects of drag and gravitation.
+    Tsi = 1 / (ai - s)
+    B0 = (1 - (e0**2)) ** 0.5
+    eta = ai * e0 * Tsi
+
+    # Exponential constants to simplify secular expressions.
+    k22 = k2**2
+    kc2 = ai**2
+    kc3 = ai**4
+    kc4 = (q0 - s) ** 4
+    kc5 = Tsi**4
+    kc6 = Theta**2
+    kc7 = Theta**4
+    kc8 = eta**2
+    kc9 = eta**3
+    kc10 = 1 - (eta**2)
+    kc11 = B0**2
+    kc12 = B0**4
+    kc13 = B0**8
+    kc14 = kc10 ** (-3.5)
+
+    # Coefficients used to evaluate the secular effects of drag and gravitation.
+    C2 = (
+        kc4
+        * kc5
+        * ni
+        * kc14
+        * (
+            ai * (1 + 1.5 * kc8 + 4 * e0 * eta + e0 * (eta**3))
+            + 1.5
+            * (k2 * Tsi / kc10)
+            * (-0.5 + 1.5 * kc6)
+            * (8.0 + 24.0 * kc8 + 3 * (eta**4))
+        )
+    )
+    C1 = bstar * C2
+    # Near-circular (and circular) orbits have no drag perturbation of w and M.
+    eccentric = e0 > SGP4_DRAG_ECCENTRICITY_MIN
+    e0_drag = np.where(eccentric, e0, 1.0)
+    e0_eta_drag = np.where(eccentric, e0 * eta, 1.0)
+    C3 = np.where(
+        eccentric,
+        kc4 * (Tsi**5) * A30 * ni * kAE * np.sin(i0_rad) / (k2 * e0_drag),
+        0.0,
+    )
+    C4 = (
+        2.0
+        * ni
+        * kc4
+        * kc5
+        * ai
+        * kc11
+        * kc14
+        * (
+            (2 * eta * (1 + e0 * eta) + 0.5 * e0 + 0.5 * kc9)
+            - 2.0
+            * k2
+            * Tsi
+            / (ai * kc10)
+            * (
+                3.0
+                * (1.0 - 3.0 * kc6)
+                * (1.0 + 1.5 * kc8 - 2.0 * e0 * eta - 0.5 * e0 * kc9)
+                + 0.75 * (1 - kc6) * (2 * kc8 - e0 * eta - e0 * kc9) * np.cos(2 * w_rad)
+            )
+        )
+    )
+    C5 = (
+        2.0
+        * kc4
+        * kc5
+        * ai
+        * kc11
+        * kc14
+        * (1.0 + (11.0 / 4.0) * eta * (eta + e0) + e0 * kc9)
+    )
+    D2 = 4.0 * ai * Tsi * (C1**2)
+    D3 = (4.0 / 3.0) * ai * (Tsi**2) * (17.0 * ai + s) * (C1**3)
+    D4 = (2.0 / 3.0) * ai * (Tsi**3) * (221.0 * ai + 31.0 * s) * (C1**4)
+
+    # Secular rates [rad/min] of the mean anomaly, argument of perigee and RAAN.
+    Mdot = (
+        1.0
+        + 3.0 * k2 * (-1.0 + 3.0 * kc6) / (2.0 * kc2 * (B0**3))
+        + 3.0 * k22 * (13.0 - 78.0 * kc6 + 137.0 * kc7) / (16.0 * kc3 * (B0**7))
+    ) * ni
+    wdot = (
+        -3.0 * k2 * (1.0 - 5.0 * kc6) / (2.0 * kc2 * kc12)
+        + 3.0 * k22 * (7.0 - 114.0 * kc6 + 395.0 * kc7) / (16.0 * kc3 * kc13)
+        + 5.0 * k4 * (3.0 - 36.0 * kc6 + 49.0 * kc7) / (4.0 * kc3 * kc13)
+    ) * ni
+    Omegadot = (
+        -3.0 * k2 * Theta / (kc2 * kc12)
+        + 3.0 * k22 * (4.0 * Theta - 19.0 * (Theta**3)) / (2.0 * kc3 * kc13)
+        + 5.0 * k4 * Theta * (3.0 - 7.0 * kc6) / (2.0 * kc3 * kc13)
+    ) * ni
+
+    return {
+        "bstar": bstar,
+        "i0_rad": i0_rad,
+        "w_rad": w_rad,
+        "e0": e0,
+        "Omega_rad": Omega_rad,
+        "M0_rad": M0_rad,
+        "sin_i0": np.sin(i0_rad),
+        "sin_M0": np.sin(M0_rad),
+        "Theta": Theta,
+        "kc6": kc6,
+        "ni": ni,
+        "ai": ai,
+        "eta": eta,
+        "C1": C1,
+        "C4": C4,
+        "C5": C5,
+        "D2": D2,
+        "D3": D3,
+        "D4": D4,
+        "Mdot": Mdot,
+        "wdot": wdot,
+        "Omegadot": Omegadot,
+        # Drag perturbations of the argument of perigee and mean anomaly.
+        "dw_rate": bstar * C3 * np.cos(w_rad),
+        "dM_coef": np.where(
+            eccentric,
+            -(2.0 / 3.0) * kc4 * bstar * kc5 * (kAE / e0_eta_drag),
+            0.0,
+        ),
+        "dM_M0": (1 + eta * np.cos(M0_rad)) ** 3,
+        # Quadratic drag perturbation of the RAAN.
+        "dOmega_coef": -(10.5) * (ni * k2 * Theta / (kc2 * kc11)) * C1,
+        # Long-period periodic coefficient.
+        "ayNL_coef": A30 * np.sin(i0_rad) / (4.0 * k2),
+        "IL_L_coef": (A30 * np.sin(i0_rad) / (8.0 * k2))
+        * ((3.0 + 5.0 * Theta) / (1.0 + Theta)),
+        # Mean longitude polynomial coefficients.
+        "t3cof": D2 + 2 * (C1**2),
+        "t4cof": 0.25 * (3.0 * D3 + 12.0 * C1 * D2 + 10.0 * (C1**3)),
+        "t5cof": 0.2
+        * (
+            3.0 * D4
+            + 12.0 * C1 * D3
+            + 6.0 * (D2**2)
+            + 30.0 * (C1**2) * D2
+            + 15.0 * (C1**4)
+        ),
+    }
+
+
+def SolveKeplerEquation(U, axN, ayN, dEw_max, n_iter_max):
+    """Solve Kepler's equation for Ew = E + w by Newton iteration.
+    Each element iterates until its own update is below dEw_max (or n_iter_max),
+    and converged elements are masked out of the following iterations.
+    Output: 1. Ew, the shape of the broadcast inputs
+            2. Boolean array, True where the iteration converged
+    """
+    U, axN, ayN = np.broadcast_arrays(U, axN, ayN)
+    shape = U.shape
+    U = U.ravel()
+    axN = axN.ravel()
+    ayN = ayN.ravel()
+
+    Ew = U.copy()
+    active = np.arange(U.size)
+    n_iter = 0
+    while active.size > 0 and n_iter < n_iter_max:
+        Ew_k = Ew[active]
+        ax = axN[active]
+        ay = ayN[active]
+        sinE = np.sin(Ew_k)
+        cosE = np.cos(Ew_k)
+        Ew_kp1 = Ew_k + (U[active] - ay * cosE + ax * sinE - Ew_k) / (
+            -ay * sinE - ax * cosE + 1.0
+        )
+        Ew[active] = Ew_kp1
+        active = active[np.abs(Ew_kp1 - Ew_k) > dEw_max]
+        n_iter = n_iter + 1
+
+    converged = np.ones(U.size, dtype=bool)
+    converged[active] = False
+
+    return Ew.reshape(shape), converged.reshape(shape)
+
+
+def _SetError(error, condition, code):
+    # Keep the first error found for each sample.
+    error[(error == SGP4_ERROR_NONE) & np.broadcast_to(condition, error.shape)] = code
+
+
+def SGP4Propagate(epoch, dt_min, dEw_max=1e-5, n_iter_max=30, return_error=False):
+    """Propagate SGP4 epoch quantities (from SGP4Initialize) to dt_min [min].
+    dt_min broadcasts against the epoch elements, e.g. (S, 1) elements and (1, T)
+    times give (S, T, 3) positions [km] and velocities [km/s] in TEME frame.
+
+    With return_error, an int8 array of SGP4 error codes is also returned and the
+    states of samples in error are set to NaN.
+    """
+    dt_min = np.asarray(dt_min, dtype=np.float64)
+    ke = SGP4_KE
+    k2 = SGP4_K2
+    ni = epoch["ni"]
+    C1 = epoch["C1"]
+    Theta = epoch["Theta"]
+    kc6 = epoch["kc6"]
+    dt2 = dt_min**2
+    dt3 = dt2 * dt_min
+    dt4 = dt3 * dt_min
+
+    # Secular effects of atmospheric drag and gravitation.
+    MDF = epoch["M0_rad"] + epoch["Mdot"] * dt_min
+    wDF = epoch["w_rad"] + epoch["wdot"] * dt_min
+    OmegaDF = epoch["Omega_rad"] + epoch["Omegadot"] * dt_min
+    dw = epoch["dw_rate"] * dt_min
+    dM = epoch["dM_coef"] * (((1 + epoch["eta"] * np.cos(MDF)) ** 3) - epoch["dM_M0"])
+    Mp = MDF + dw + dM
+    w = wDF - dw - dM
+    Omega = OmegaDF + epoch["dOmega_coef"] * dt2
+    e = (
+        epoch["e0"]
+        - epoch["bstar"] * epoch["C4"] * dt_min
+        - epoch["bstar"] * epoch["C5"] * (np.sin(Mp) - epoch["sin_M0"])
+    )
+    a = epoch["ai"] * (
+        (1 - C1 * dt_min - epoch["D2"] * dt2 - epoch["D3"] * dt3 - epoch["D4"] * dt4)
+        ** 2
+    )
+    IL = (
+        Mp
+        + w
+        + Omega
+        + ni
+        * (
+            1.5 * C1 * dt2
+            + epoch["t3cof"] * dt3
+            + epoch["t4cof"] * dt4
+            + epoch["t5cof"] * (dt4 * dt_min)
+        )
+    )
+    B = (1 - (e**2)) ** 0.5
+    n = ke / (a**1.5)
+
+    # Long-period periodic terms.
+    axN = e * np.cos(w)
+    IL_L = epoch["IL_L_coef"] / (a * (B**2)) * axN
+    ayNL = epoch["ayNL_coef"] / (a * (B**2))
+    IL_T = IL + IL_L
+    ayN = e * np.sin(w) + ayNL
+
+    # Set up and solve Kepler's equation for Ew_k = E + w.
+    U = IL_T - Omega
+    Ew_k, converged = SolveKeplerEquation(U, axN, ayN, dEw_max, n_iter_max)
+
+    # Preliminary quantities for short-period periodics
+    sinEw = np.sin(Ew_k)
+    cosEw = np.cos(Ew_k)
+    ecosE = axN * cosEw + ayN * sinEw
+    esinE = axN * sinEw - ayN * cosEw
+    eL = ((axN**2) + (ayN**2)) ** 0.5
+    pL = a * (1.0 - (eL**2))
+    r = a * (1.0 - ecosE)
+    rdot = ke * ((a**0.5) / r) * esinE
+    rfdot = ke * (pL**0.5) / r
+    cosu = a / r * (cosEw - axN + ayN * esinE / (1.0 + (1.0 - (eL**2)) ** 0.5))
+    sinu = a / r * (sinEw - ayN - axN * esinE / (1.0 + (1.0 - (eL**2)) ** 0.5))
+    u = np.arctan2(sinu, cosu)
+    sin2u = np.sin(2 * u)
+    cos2u = np.cos(2 * u)
+    dr = (k2 / (2.0 * pL)) * (1 - kc6) * cos2u
+    du = -(k2 / (4.0 * (pL**2))) * (7.0 * kc6 - 1) * sin2u
+    dOmega = (3.0 * k2 * Theta / (2.0 * (pL**2))) * sin2u
+    di = (3.0 * k2 * Theta / (2.0 * (pL**2))) * epoch["sin_i0"] * cos2u
+    drdot = -(k2 * n / pL) * (1.0 - kc6) * sin2u
+    drfdot = (k2 * n / pL) * ((1.0 - kc6) * cos2u - 1.5 * (1.0 - 3.0 * kc6))
+
+    # Sum the short-period periodic terms to obtain osculating quantities.
+    rk = (
+        r
+        * (
+            1.0
+            - 1.5
+            * k2
+            * ((1.0 - (eL**2)) ** 0.5 / ((pL**2)))
+            * (3.0 * (Theta**2) - 1.0)
+        )
+        + dr
+    )
+    uk = u + du
+    Omegak = Omega + dOmega
+    ik = epoch["i0_rad"] + di
+    rkdot = rdot + drdot
+    rfkdot = rfdot + drfdot
+
+    # Unit orientation vectors.
+    sinOmegak = np.sin(Omegak)
+    cosOmegak = np.cos(Omegak)
+    cosik = np.cos(ik)
+    M = np.stack([-sinOmegak * cosik, cosOmegak * cosik, np.sin(ik)], axis=-1)
+    N = np.stack([cosOmegak, sinOmegak, np.zeros_like(Omegak)], axis=-1)
+    sinuk = np.sin(uk)[..., np.newaxis]
+    cosuk = np.cos(uk)[..., np.newaxis]
+    U = M * sinuk + N * cosuk
+    V = M * cosuk - N * sinuk
+
+    # Calculate the position and velocity vectors in TEME.
+    # Transform the velocity from [km/min] to [km/s].
+    kunnormalized = kr_E / kAE
+    r_teme = rk[..., np.newaxis] * U * kunnormalized
+    v_teme = (
+        (rkdot[..., np.newaxis] * U + rfkdot[..., np.newaxis] * V)
+        * kunnormalized
+        * (kDayInMinutes / DAY_IN_SECONDS)
+    )
+
+    if not return_error:
         return (r_teme, v_teme)
+
+    error = np.zeros(rk.shape, dtype=np.int8)
+    _SetError(
+        error, ~((e < 1.0) & (e >= -0.001) & (a >= 0.95)), SGP4_ERROR_MEAN_ELEMENTS
+    )
+    _SetError(error, ~(epoch["ni"] > 0.0) | ~(n > 0.0), SGP4_ERROR_MEAN_MOTION)
+    _SetError(error, ~(pL >= 0.0), SGP4_ERROR_SEMI_LATUS_RECTUM)
+    _SetError(error, ~converged, SGP4_ERROR_KEPLER)
+    _SetError(error, ~(rk >= 1.0), SGP4_ERROR_DECAYED)
+
+    r_teme[error != SGP4_ERROR_NONE] = np.nan
+    v_teme[error != SGP4_ERROR_NONE] = np.nan
+
+    return (r_teme, v_teme, error)
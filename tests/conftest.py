@@ -0,0 +1,14 @@
+import pytest as pytest
+
+
+# Catalog of a 3LE (with title line) and a 2LE element set.
+# https://en.wikipedia.org/wiki/Two-line_element_set
+@pytest.fixture
+def tle_catalog_lines():
+    return [
+        "ISS (ZARYA)",
+        "1 25544U 98067A   08264.51782528 -.00002182  00000-0 -11606-4 0  2927",
+        "2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537",
+        "1 88888U          80275.98708465  .00073094  13844-3  66816-4 0    87",
+        "2 88888  72.8435 115.9689 0086731  52.6988 110.5714 16.05824518  1058",
+    ]
@@ -1,5 +1,5 @@
 from acstoolbox.time.clock import Clock
-from acstoolbox.ephemerides.sun import Sun
+from acstoolbox.ephemerides.sun import Sun, SunTable
 
 import numpy as np
 import pytest as pytest
@@ -27,3 +27,104 @@ def test_sun_vector_from_utc():
     us_mod_almanac = s_mod_almanac / np.linalg.norm(s_mod_almanac)
     dphi = np.arccos(np.dot(s_mod, us_mod_almanac)) / np.pi * 180.0
     assert dphi < 1e-1
+
+
+# 2. Evaluate unit sun vectors from JS from J2000 (UTC) through the conversion cache.
+def test_sun_vector_cache():
+    clock = Clock()
+    sun = Sun(clock)
+    js_j2000_utc = clock.GregorianToJSJ2000([2006, 4, 2, 0, 0, 0])
+    s_mod = sun.GetMODFromJSJ2000UTC(js_j2000_utc)
+
+    with clock.CachedConversions() as cache:
+        for _ in range(4):
+            s_mod_cached = sun.GetMODFromJSJ2000UTC(js_j2000_utc)
+            assert np.array_equal(s_mod_cached, s_mod)
+
+            # Callers own the returned vectors.
+            s_mod_cached[0] = 0.0
+
+    assert cache.Statistics()["hits"] == 3
+
+
+# 3. Evaluate unit sun vectors over an array of epochs.
+def test_sun_vector_array():
+    clock = Clock()
+    sun = Sun(clock)
+    js_start = clock.GregorianToJSJ2000([2006, 4, 2, 0, 0, 0])
+    js_j2000_utc = js_start + np.linspace(0.0, 365.0 * 86400.0, 50)
+
+    s_mod = sun.GetMODFromJSJ2000UTC(js_j2000_utc)
+    assert s_mod.shape == (50, 3)
+    assert np.linalg.norm(s_mod, axis=1) == pytest.approx(np.ones(50), abs=1e-14)
+
+    # Each row matches the scalar evaluation.
+    s_mod_scalar = np.array([sun.GetMODFromJSJ2000UTC(js) for js in js_j2000_utc])
+    assert np.max(np.abs(s_mod - s_mod_scalar)) < 1e-14
+
+    # Arrays of UT1 centuries give (..., 3) vectors.
+    t_ut1 = clock.JDToT(clock.JSJ2000ToJD(js_j2000_utc)).reshape(5, 10)
+    s_mod_t = sun.GetUnitMODPositionFromTUT1(t_ut1)
+    assert s_mod_t.shape == (5, 10, 3)
+    assert s_mod_t[0, 0] == pytest.approx(sun.GetUnitMODPositionFromTUT1(t_ut1[0, 0]))
+
+
+# 4. Epochs after the end of the EOP table clamp dUT1, unless asked to raise.
+def test_sun_vector_after_eop_table():
+    clock = Clock()
+    sun = Sun(clock)
+    epoch_gregorian_utc = [2026, 10, 18, 0, 0, 0]
+    js_j2000_utc = clock.GregorianToJSJ2000(epoch_gregorian_utc)
+    assert clock.MJD(clock.JSJ2000ToJD(js_j2000_utc)) > clock.eop_.mjd_last_
+
+    s_mod = sun.GetMODFromJSJ2000UTC(js_j2000_utc)
+    assert s_mod == pytest.approx(sun.GetUnitMODPositionFromUTC(epoch_gregorian_utc))
+    s_mod_array = sun.GetMODFromJSJ2000UTC(js_j2000_utc + np.arange(3) * 86400.0)
+    assert s_mod_array[0] == pytest.approx(s_mod, abs=1e-14)
+
+    # The clamped dUT1 moves the Sun by far less than the model accuracy.
+    t_utc = clock.JDToT(clock.JSJ2000ToJD(js_j2000_utc))
+    s_mod_utc = sun.GetUnitMODPositionFromTUT1(t_utc)
+    assert np.degrees(np.arccos(min(s_mod @ s_mod_utc, 1.0))) < 1e-4
+
+    sun_raise = Sun(clock, out_of_range="raise")
+    with pytest.raises(ValueError):
+        sun_raise.GetMODFromJSJ2000UTC(js_j2000_utc)
+    with pytest.raises(ValueError):
+        sun_raise.GetUnitMODPositionFromUTC(epoch_gregorian_utc)
+
+
+# 5. Interpolate unit sun vectors from an hourly table, over years past the EOP table.
+def test_sun_table(tmp_path):
+    clock = Clock()
+    sun = Sun(clock)
+    js_start = clock.GregorianToJSJ2000([2006, 4, 2, 0, 0, 0])
+    table = sun.Tabulate(js_start, js_start + 30 * 86400.0)
+    assert table.metadata_["checked_error_deg"] < 1e-4
+
+    js_j2000_utc = js_start + np.linspace(0.0, 30 * 86400.0, 1001)
+    s_mod = sun.GetMODFromJSJ2000UTC(js_j2000_utc)
+    s_table = table.GetMODFromJSJ2000UTC(js_j2000_utc)
+    assert s_table.shape == (1001, 3)
+    assert np.degrees(table.AngleTo(s_mod, js_j2000_utc)).max() < 1e-4
+    assert table.GetMODFromJSJ2000UTC(js_start) == pytest.approx(s_mod[0], abs=1e-12)
+
+    # Saved tables interpolate identically.
+    table.Save(tmp_path / "sun_table.npz")
+    loaded = SunTable.Load(tmp_path / "sun_table.npz")
+    assert np.array_equal(loaded.GetMODFromJSJ2000UTC(js_j2000_utc), s_table)
+    assert loaded.metadata_ == table.metadata_
+
+    with pytest.raises(ValueError):
+        table.GetMODFromJSJ2000UTC(js_start - 1.0)
+
+    # Multi-year tables may run past the end of the EOP table (2022-03-27).
+    js_start = clock.GregorianToJSJ2000([2021, 1, 1, 0, 0, 0])
+    js_end = clock.GregorianToJSJ2000([2026, 1, 1, 0, 0, 0])
+    lifetime_table = sun.Tabulate(js_start, js_end)
+    assert lifetime_table.metadata_["checked_error_deg"] < 1e-4
+    js_j2000_utc = np.linspace(js_start, js_end, 1001)
+    s_mod = sun.GetMODFromJSJ2000UTC(js_j2000_utc)
+    assert np.degrees(lifetime_table.AngleTo(s_mod, js_j2000_utc)).max() < 1e-4
+    with pytest.raises(ValueError):
+        Sun(clock, out_of_range="raise").Tabulate(js_start, js_end)
@@ -0,0 +1,178 @@
+from acstoolbox.foundation.files import (
+    AtomicWrite,
+    LoadVersionedArrays,
+    SaveVersionedArrays,
+)
+from acstoolbox.foundation.math import (
+    apply_stack,
+    compose_stack,
+    transpose_stack,
+    vX,
+    vX_stack,
+)
+from acstoolbox.foundation.quaternion import Quaternion
+from acstoolbox.foundation.so3 import EulerAxis, EulerAxisStack
+from acstoolbox.foundation.timeseries import TimeSeriesFile, TimeSeriesWriter
+
+import numpy as np
+import os
+import pytest as pytest
+
+
+# 1. Stacked rotations and cross-matrices match the single-matrix functions.
+def test_so3_stacks():
+    rng = np.random.default_rng(1)
+    a = rng.normal(size=(50, 3))
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    phi = rng.uniform(-np.pi, np.pi, 50)
+    v = rng.normal(size=(50, 3))
+
+    C = EulerAxisStack(a, phi)
+    assert C.shape == (50, 3, 3)
+    for n in range(50):
+        assert C[n] == pytest.approx(EulerAxis(a[n], phi[n]), abs=1e-15)
+        assert vX_stack(v)[n] == pytest.approx(vX(v[n]))
+
+    # Rotations are orthonormal, compose and apply per element.
+    assert compose_stack(transpose_stack(C), C) == pytest.approx(
+        np.broadcast_to(np.identity(3), (50, 3, 3)), abs=1e-14
+    )
+    assert apply_stack(C, v)[7] == pytest.approx(C[7] @ v[7])
+    assert compose_stack(C, C[0])[3] == pytest.approx(C[3] @ C[0])
+    assert apply_stack(vX_stack(a), v) == pytest.approx(np.cross(a, v))
+
+    # A single angle applies to every axis; shapes are checked once per stack.
+    assert EulerAxisStack(a, 0.5)[9] == pytest.approx(EulerAxis(a[9], 0.5))
+    with pytest.raises(AssertionError):
+        EulerAxisStack(a[0], phi[0])
+
+
+# 2. Quaternions match the rotation matrices of EulerAxis.
+def test_quaternion():
+    rng = np.random.default_rng(2)
+    a = rng.normal(size=(50, 3))
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    phi = rng.uniform(-np.pi, np.pi, 50)
+    v = rng.normal(size=(50, 3))
+
+    C = EulerAxisStack(a, phi)
+    q = Quaternion.FromEulerAxis(a, phi)
+    assert len(q) == 50
+    assert q.DCM() == pytest.approx(C, abs=1e-15)
+    assert Quaternion.FromEulerAxis(a[0], phi[0]).DCM()[0] == pytest.approx(
+        EulerAxis(a[0], phi[0]), abs=1e-15
+    )
+
+    # Shepperd's method recovers q up to sign, including half turns.
+    assert np.abs(np.sum(Quaternion.FromDCM(C).q_ * q.q_, axis=1)) == pytest.approx(
+        np.ones(50)
+    )
+    C_half_turn = EulerAxisStack(a, np.pi)
+    assert Quaternion.FromDCM(C_half_turn).DCM() == pytest.approx(
+        C_half_turn, abs=1e-15
+    )
+
+    # Products compose like rotation matrices; inverses undo rotations.
+    p = q[::-1]
+    assert (q * p).DCM() == pytest.approx(C @ C[::-1], abs=1e-14)
+    assert (q * q[0]).DCM()[5] == pytest.approx(C[5] @ C[0], abs=1e-14)
+    assert q.Rotate(v) == pytest.approx(np.einsum("nij,nj->ni", C, v))
+    assert q.Inverse().Rotate(q.Rotate(v)) == pytest.approx(v)
+    assert Quaternion(2.0 * q.q_).Normalize().q_ == pytest.approx(q.q_)
+
+    # SLERP about a common axis interpolates the angle.
+    q_0 = Quaternion.FromEulerAxis(a, 0.2)
+    q_1 = Quaternion.FromEulerAxis(a, 1.4)
+    q_t = q_0.Slerp(q_1, np.linspace(0.0, 1.0, 50))
+    assert q_t.q_ == pytest.approx(
+        Quaternion.FromEulerAxis(a, 0.2 + 1.2 * np.linspace(0.0, 1.0, 50)).q_
+    )
+    assert q_0.Slerp(q_0, 0.5).q_ == pytest.approx(q_0.q_)
+
+
+# 3. Time series chunks are appended and read back by time windows.
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_time_series(tmp_path, compression):
+    rng = np.random.default_rng(4)
+    js = 1e8 + np.arange(1000.0)
+    attitude = EulerAxisStack(np.broadcast_to([0.0, 0.0, 1.0], (1000, 3)), js / 100.0)
+    r_km = rng.normal(size=(1000, 3))
+    path = tmp_path / "series.acsts"
+
+    with TimeSeriesWriter(path, compression=compression) as writer:
+        for start in range(0, 600, 100):
+            rows = slice(start, start + 100)
+            writer.Append(
+                {
+                    "js_j2000_utc": js[rows],
+                    "attitude": attitude[rows],
+                    "r_km": r_km[rows],
+                }
+            )
+        with pytest.raises(ValueError, match="increase"):
+            writer.Append(
+                {"js_j2000_utc": js[:1], "attitude": attitude[:1], "r_km": r_km[:1]}
+            )
+
+    # Appends continue the existing file, in chunks of any size.
+    with TimeSeriesWriter(path, compression=compression) as writer:
+        writer.Append(
+            {"js_j2000_utc": js[600:], "attitude": attitude[600:], "r_km": r_km[600:]}
+        )
+
+    series = TimeSeriesFile(path)
+    assert len(series) == 1000
+    assert len(series.chunk_offset_) == 7
+
+    window = series.Read(js[250] - 0.5, js[749])
+    assert np.array_equal(window["js_j2000_utc"], js[250:750])
+    assert np.array_equal(window["attitude"], attitude[250:750])
+    assert np.array_equal(window["r_km"], r_km[250:750])
+    assert np.array_equal(series.Read()["r_km"], r_km)
+    assert series.Read(0.0, 1.0)["attitude"].shape == (0, 3, 3)
+
+    # Windows within an uncompressed chunk are views of the memory map.
+    window = series.Read(js[310], js[320], columns=["attitude"])
+    assert list(window) == ["attitude"]
+    assert np.array_equal(window["attitude"], attitude[310:321])
+    assert np.shares_memory(window["attitude"], series.map_) == (compression is None)
+
+    # A writer which stopped before its index is recovered from the chunk headers.
+    size = os.path.getsize(path)
+    with open(path, "r+b") as stream:
+        stream.truncate(size - 20)
+    series = TimeSeriesFile(path)
+    assert len(series) == 1000
+    with open(path, "r+b") as stream:
+        stream.truncate(series.chunk_offset_[-1] + 100)
+    assert len(TimeSeriesFile(path)) == 600
+
+
+# 4. Atomic writes replace a file whole, or leave it untouched if they fail.
+def test_atomic_write(tmp_path):
+    path = tmp_path / "table.bin"
+    AtomicWrite(path, lambda f: f.write(b"old"))
+    AtomicWrite(path, lambda f: f.write(b"new"))
+    assert path.read_bytes() == b"new"
+
+    def FailedWrite(f):
+        f.write(b"partial")
+        raise RuntimeError("write failed")
+
+    with pytest.raises(RuntimeError):
+        AtomicWrite(path, FailedWrite)
+    assert path.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["table.bin"]
+
+
+# 5. Versioned arrays round-trip with their metadata, and other versions are rejected.
+def test_versioned_arrays(tmp_path):
+    path = tmp_path / "fit.npz"
+    SaveVersionedArrays(path, 2, {"nodes": np.arange(4.0)}, {"error_km": 1e-4})
+    arrays, metadata = LoadVersionedArrays(path, 2, "Fit")
+    assert list(arrays) == ["nodes"]
+    assert np.array_equal(arrays["nodes"], np.arange(4.0))
+    assert metadata == {"error_km": 1e-4}
+
+    with pytest.raises(ValueError, match="Fit version 2"):
+        LoadVersionedArrays(path, 1, "Fit")
@@ -0,0 +1,113 @@
+from acstoolbox.frames.transformations import (
+    FrameTransformations,
+    PrecessionNutationAngles,
+    PrecessionNutationAnglesExact,
+    FRAMES,
+)
+from acstoolbox.time.clock import Clock
+from acstoolbox.constants.time_constants import (
+    JD_J2000,
+    MODIFIED_JULIAN_DATE_OFFSET,
+    kCenturyInJulianDays,
+)
+
+import numpy as np
+import pytest as pytest
+
+# TODO
+# 1. IAU-2006/2000A (CIO based) transformations with the dX, dY EOP corrections.
+
+# Vallado, Fundamentals of Astrodynamics and Applications, Example 3-15.
+# 2004 April 6 07:51:28.386009 UTC.
+VALLADO_EPOCH_UTC = [2004, 4, 6, 7, 51, 28.386009]
+VALLADO_R_KM = {
+    "ITRF": [-1033.4793830, 7901.2952754, 6380.3565958],
+    "PEF": [-1033.4750313, 7901.3055856, 6380.3445328],
+    "TEME": [5094.18016210, 6127.64465950, 6380.34453270],
+    "TOD": [5094.5147804, 6127.3664612, 6380.3445328],
+    "MOD": [5094.0283745, 6127.8708164, 6380.2485164],
+    "GCRF": [5102.508958, 6123.011401, 6378.136928],
+}
+VALLADO_V_KMS = {
+    "ITRF": [-3.225636520, -2.872451450, 5.531924446],
+    "TEME": [-4.746131487, 0.785818041, 5.531931288],
+    "GCRF": [-4.743220157, 0.790536497, 5.533755727],
+}
+
+
+# FrameTransformations.Transform
+# Transform the ITRF position of Vallado's example to the other frames.
+def test_frame_transformations():
+    clock = Clock()
+    js_j2000_utc = clock.GregorianToJSJ2000(VALLADO_EPOCH_UTC)
+    frames = FrameTransformations([js_j2000_utc], clock)
+    r_itrf = np.array([VALLADO_R_KM["ITRF"]])
+
+    # The truncated IAU-80 nutation, without the EOP nutation corrections, is
+    # accurate to a few meters in the inertial frames.
+    tolerance_m = {"PEF": 0.5, "TEME": 1.0, "TOD": 1.0, "MOD": 5.0, "GCRF": 5.0}
+    for frame, r_km in VALLADO_R_KM.items():
+        r_frame = frames.Transform(r_itrf, "ITRF", frame)
+        assert np.linalg.norm(r_frame[0] - r_km) * 1000.0 < tolerance_m.get(frame, 1e-6)
+
+    for frame in ("TEME", "GCRF"):
+        r_frame, v_frame = frames.TransformState(
+            r_itrf, np.array([VALLADO_V_KMS["ITRF"]]), "ITRF", frame
+        )
+        assert v_frame[0] == pytest.approx(VALLADO_V_KMS[frame], abs=1e-5)
+
+        # And back to the Earth-fixed frame.
+        r_back, v_back = frames.TransformState(r_frame, v_frame, frame, "ITRF")
+        assert r_back[0] == pytest.approx(VALLADO_R_KM["ITRF"], abs=1e-9)
+        assert v_back[0] == pytest.approx(VALLADO_V_KMS["ITRF"], abs=1e-12)
+
+
+# FrameTransformations.Rotation
+# Rotations of an array of epochs are orthonormal and match those of each epoch.
+def test_frame_rotation_stacks():
+    clock = Clock()
+    js_j2000_utc = clock.GregorianToJSJ2000(VALLADO_EPOCH_UTC) + np.linspace(
+        0.0, 5 * 86400.0, 7
+    )
+    frames = FrameTransformations(js_j2000_utc, clock)
+
+    for from_frame in FRAMES:
+        for to_frame in FRAMES:
+            M = frames.Rotation(from_frame, to_frame)
+            assert M.shape == (7, 3, 3)
+            assert np.allclose(M @ np.swapaxes(M, -1, -2), np.identity(3), atol=1e-12)
+
+    M = frames.Rotation("TEME", "GCRF")
+    for n, js in enumerate(js_j2000_utc):
+        assert np.allclose(
+            FrameTransformations([js], clock).Rotation("TEME", "GCRF")[0],
+            M[n],
+            atol=1e-15,
+        )
+
+    # Precession-nutation angles interpolated between the cached nodes.
+    mjd_tt = np.linspace(53000.0, 53030.0, 1001)
+    t_tt = (mjd_tt + MODIFIED_JULIAN_DATE_OFFSET - JD_J2000) / kCenturyInJulianDays
+    angles_rad = PrecessionNutationAngles(mjd_tt)
+    angles_exact_rad = PrecessionNutationAnglesExact(t_tt)
+    assert np.abs(angles_rad - angles_exact_rad).max() < 1e-3 / 206264.8
+
+
+# FrameTransformations(out_of_range)
+# Epochs after the end of the EOP table hold its last dUT1 and polar motion.
+def test_frame_transformations_after_eop_table():
+    clock = Clock()
+    mjd_last = clock.eop_.mjd_last_
+    js_last = (mjd_last + MODIFIED_JULIAN_DATE_OFFSET - JD_J2000) * 86400.0
+    js_today = clock.GregorianToJSJ2000([2026, 10, 18, 0, 0, 0])
+    frames = FrameTransformations([js_last, js_today], clock)
+
+    # The polar motion (PEF to ITRF) is the one of the last day of the table.
+    r_itrf = frames.Transform(np.array([[7000.0, 0.0, 0.0]] * 2), "TEME", "ITRF")
+    assert np.linalg.norm(r_itrf, axis=1) == pytest.approx([7000.0, 7000.0])
+    W = frames.Rotation("PEF", "ITRF")
+    assert np.allclose(W[1], W[0], rtol=0.0, atol=1e-13)
+    assert not np.allclose(W[0], np.identity(3), rtol=0.0, atol=1e-9)
+
+    with pytest.raises(ValueError):
+        FrameTransformations([js_today], clock, out_of_range="raise")
@@ -0,0 +1,522 @@
+from acstoolbox.orbit import tle
+from acstoolbox.orbit.archive import TLEArchive, WriteTLEArchive
+from acstoolbox.orbit.catalog import SGP4Catalog
+from acstoolbox.orbit.conjunction import OrbitPathFilter, ScreenConjunctions
+from acstoolbox.orbit.ephemeris import ChebyshevEphemeris
+from acstoolbox.orbit.events import ShadowEventFinder
+from acstoolbox.orbit.illumination import (
+    BetaAngles,
+    LifetimeIllumination,
+    OrbitNormals,
+)
+from acstoolbox.ephemerides.sun import Sun
+from acstoolbox.time.clock import Clock
+from acstoolbox.orbit.parallel import PropagateCatalogParallel
+from acstoolbox.constants.time_constants import DAY_IN_SECONDS
+
+import numpy as np
+import pytest as pytest
+
+# TODO
+# 1. Reference for deep-space (SDP4) test cases
+
+
+# Test case of Spacetrack Report #3 (SGP4).
+# 1 88888U 80 275.98708465 .00073094 13844-3 66816-4 0 8
+# 2 88888 72.8435 115.9689 0086731 52.6988 110.5714 16.05824518 105
+def Spacetrack3TLEParameters():
+    tle_param = {}
+    tle_param["bstar"] = 0.66816 * (10 ** (-4))
+    tle_param["inclination"] = 72.8435 / 180.0 * np.pi
+    tle_param["argument_perigee"] = 52.6988 / 180.0 * np.pi
+    tle_param["eccentricity"] = 0.0086731
+    tle_param["right_ascension"] = 115.9689 / 180.0 * np.pi
+    tle_param["mean_anomaly"] = 110.5714 / 180.0 * np.pi
+    tle_param["mean_motion"] = 16.05824518 * 2 * np.pi / 1440
+    return tle_param
+
+
+# SGP4.GetOrbitState
+# Evaluate the orbit state against Spacetrack Report #3.
+def test_sgp4_orbit_state():
+    sgp4 = tle.SGP4(Spacetrack3TLEParameters())
+
+    r_teme, v_teme = sgp4.GetOrbitState(0.0)
+    assert r_teme == pytest.approx(
+        [2328.96594238, -5995.21600342, 1719.97894287], abs=1e-2
+    )
+    assert v_teme == pytest.approx([2.91110113, -0.98164053, -7.09049922], abs=1e-2)
+
+    # Values at 360 min as tabulated in Spacetrack Report #3.
+    r_teme, v_teme = sgp4.GetOrbitState(360.0)
+    assert r_teme == pytest.approx(
+        [2456.10705566, -6071.93853760, 1222.89727783], abs=1e-2
+    )
+    assert v_teme == pytest.approx([2.67938992, -0.44829041, -7.22879231], abs=1e-2)
+
+
+# SGP4.GetOrbitStates
+# Propagate to an array of times, identical to propagating each time.
+def test_sgp4_orbit_states():
+    sgp4 = tle.SGP4(Spacetrack3TLEParameters())
+    dt_min = np.linspace(0.0, 1440.0, 97)
+
+    r_teme, v_teme = sgp4.GetOrbitStates(dt_min)
+    assert r_teme.shape == (97, 3)
+    assert v_teme.shape == (97, 3)
+    for i, dt_min_i in enumerate(dt_min):
+        r_teme_i, v_teme_i = sgp4.GetOrbitState(dt_min_i)
+        assert np.array_equal(r_teme[i], r_teme_i)
+        assert np.array_equal(v_teme[i], v_teme_i)
+
+
+# SGP4Catalog.Propagate
+# Propagate a catalog over a (satellites x times) grid with per-satellite error codes.
+def test_sgp4_catalog():
+    tle_params = []
+    for k in range(5):
+        tle_param = Spacetrack3TLEParameters()
+        tle_param["right_ascension"] += 0.3 * k
+        tle_param["mean_anomaly"] += 0.7 * k
+        tle_params.append(tle_param)
+
+    # Orbit decayed by drag and invalid eccentricity.
+    tle_params.append(dict(tle_params[0], bstar=0.5))
+    tle_params.append(dict(tle_params[0], eccentricity=1.2))
+
+    catalog = SGP4Catalog.FromTLEParameters(tle_params)
+    dt_min = np.linspace(0.0, 14400.0, 11)
+    r_teme, v_teme, error = catalog.Propagate(dt_min, chunk_size=2)
+    assert r_teme.shape == (7, 11, 3)
+    assert error.shape == (7, 11)
+
+    for i in range(5):
+        r_teme_i, v_teme_i = tle.SGP4(tle_params[i]).GetOrbitStates(dt_min)
+        assert np.array_equal(r_teme[i], r_teme_i)
+        assert np.array_equal(v_teme[i], v_teme_i)
+    assert np.all(error[:5] == tle.SGP4_ERROR_NONE)
+
+    assert error[5, 0] == tle.SGP4_ERROR_NONE
+    assert np.all(error[5, 1:] == tle.SGP4_ERROR_MEAN_ELEMENTS)
+    assert np.all(np.isnan(r_teme[5, 1:]))
+    assert np.all(error[6] == tle.SGP4_ERROR_MEAN_ELEMENTS)
+
+    # Circular orbits are valid, and match nearly circular ones without the drag
+    # perturbations of the argument of perigee and mean anomaly.
+    circular = [dict(tle_params[0], eccentricity=e) for e in (0.0, 1e-9)]
+    r_teme, v_teme, error = SGP4Catalog.FromTLEParameters(circular).Propagate(dt_min)
+    assert np.all(error == tle.SGP4_ERROR_NONE)
+    assert r_teme[0] == pytest.approx(r_teme[1], abs=1e-3)
+    assert v_teme[0] == pytest.approx(v_teme[1], abs=1e-6)
+    r_teme_i, _ = tle.SGP4(circular[0]).GetOrbitStates(dt_min)
+    assert np.array_equal(r_teme[0], r_teme_i)
+
+    # Times are validated before the outputs are sized.
+    for dt_invalid in (0.0, np.zeros((2, 11)), np.zeros((7, 11, 1))):
+        with pytest.raises(ValueError):
+            catalog.Propagate(dt_invalid)
+
+
+# PropagateCatalogParallel
+# Tiles propagated by worker processes into shared memory and memory maps match a serial run.
+def test_sgp4_catalog_parallel(tmp_path):
+    tle_params = []
+    for k in range(7):
+        tle_param = Spacetrack3TLEParameters()
+        tle_param["mean_anomaly"] += 0.7 * k
+        tle_params.append(tle_param)
+    tle_params[3]["bstar"] = 0.5
+
+    catalog = SGP4Catalog.FromTLEParameters(tle_params)
+    dt_min = np.linspace(0.0, 14400.0, 11)
+    states_serial = catalog.Propagate(dt_min)
+
+    progress = []
+    states_parallel = PropagateCatalogParallel(
+        catalog,
+        dt_min,
+        n_workers=2,
+        tile_satellites=3,
+        tile_times=4,
+        progress=lambda n_done, n_total: progress.append((n_done, n_total)),
+        mp_context="spawn",
+    )
+    assert len(progress) == 9
+    assert progress[-1] == (77, 77)
+
+    states_mapped = PropagateCatalogParallel(
+        catalog, dt_min, n_workers=1, tile_satellites=2, output_dir=tmp_path
+    )
+    assert np.array_equal(np.load(tmp_path / "error.npy"), states_serial[2])
+
+    for serial, parallel, mapped in zip(states_serial, states_parallel, states_mapped):
+        assert np.array_equal(serial, parallel, equal_nan=True)
+        assert np.array_equal(serial, mapped, equal_nan=True)
+
+    # Times are validated before the tiles are laid out.
+    for dt_invalid in (0.0, np.zeros((2, 11))):
+        with pytest.raises(ValueError):
+            PropagateCatalogParallel(catalog, dt_invalid, n_workers=1)
+
+
+# tle.ReadTLEs and tle.ReadTLECatalog
+# Parse a catalog lazily and in bulk, with checksum validation.
+def test_read_tle_catalog(tmp_path, tle_catalog_lines):
+    tle_params = list(tle.ReadTLEs(tle_catalog_lines))
+    assert [p["name"] for p in tle_params] == ["ISS (ZARYA)", ""]
+    assert [p["norad_id"] for p in tle_params] == [25544, 88888]
+
+    # Epoch 2008-09-20 12:25:40.104 UTC.
+    assert tle_params[0]["year"] == 2008
+    assert tle_params[0]["epoch_jsj2000_utc"] / DAY_IN_SECONDS == pytest.approx(
+        3185.01782528, abs=1e-9
+    )
+    assert tle_params[0]["bstar"] == pytest.approx(-0.11606e-4)
+
+    reference = Spacetrack3TLEParameters()
+    for key, value in reference.items():
+        assert tle_params[1][key] == pytest.approx(value, rel=1e-12)
+    assert tle_params[1]["year"] == 1980
+
+    tle_file = tmp_path / "catalog.txt"
+    tle_file.write_text("\n".join(tle_catalog_lines) + "\n")
+    columns = tle.ReadTLECatalog(tle_file)
+    assert list(columns["norad_id"]) == [25544, 88888]
+    assert len(SGP4Catalog(columns)) == 2
+
+    chunks = list(tle.ReadTLECatalogChunks(tle_file, chunk_size=1))
+    assert [list(chunk["norad_id"]) for chunk in chunks] == [[25544], [88888]]
+
+    corrupted = tle_catalog_lines[:1] + [tle_catalog_lines[1][:-1] + "0"]
+    corrupted += tle_catalog_lines[2:]
+    with pytest.raises(ValueError, match="line 2 fails its checksum"):
+        list(tle.ReadTLEs(corrupted))
+    assert len(list(tle.ReadTLEs(corrupted, validate_checksums=False))) == 2
+
+    with pytest.raises(ValueError, match="missing its line 2"):
+        list(tle.ReadTLEs(tle_catalog_lines[:2]))
+
+    # Blank and whitespace-only lines are skipped; titles must precede line 1.
+    spaced = [
+        line
+        for pair in zip(["", "   ", "\t", " \r\n", ""], tle_catalog_lines)
+        for line in pair
+    ]
+    tle_params_spaced = list(tle.ReadTLEs(spaced))
+    assert [p["name"] for p in tle_params_spaced] == ["ISS (ZARYA)", ""]
+    with pytest.raises(ValueError, match="followed by another title"):
+        list(tle.ReadTLEs(["SATELLITE A", *tle_catalog_lines]))
+    with pytest.raises(ValueError, match="missing its line 1"):
+        list(tle.ReadTLEs(tle_catalog_lines[2:]))
+
+    # Checksum errors name the physical line, after blank lines.
+    spaced_corrupted = tle_catalog_lines[:2] + ["", tle_catalog_lines[2][:-1] + "0"]
+    with pytest.raises(ValueError, match="line 4 fails its checksum"):
+        list(tle.ReadTLEs(spaced_corrupted))
+
+    # Alpha-5 catalog numbers (letters count 0 in the checksum).
+    def Renumbered(line, catalog_number):
+        line = line[:2] + catalog_number + line[7:68]
+        return line + str(tle.TLEChecksum(line))
+
+    alpha5 = [tle_catalog_lines[0]] + [
+        Renumbered(line, "A5544") for line in tle_catalog_lines[1:3]
+    ]
+    assert next(tle.ReadTLEs(alpha5))["norad_id"] == 105544
+    assert (
+        next(tle.ReadTLEs([Renumbered(line, "Z9999") for line in alpha5[1:]]))[
+            "norad_id"
+        ]
+        == 339999
+    )
+
+    # Other characters in numeric fields are rejected, with or without checksums.
+    for lines, match in (
+        ([Renumbered(line, "I5544") for line in alpha5[1:]], "line 1 .* columns 3-3"),
+        ([alpha5[1], Renumbered(alpha5[2], "A55x4")], "line 2 .* columns 4-7"),
+        ([alpha5[1], alpha5[2][:30] + "x" + alpha5[2][31:]], "line 2 .* columns 27-33"),
+    ):
+        with pytest.raises(ValueError, match=match):
+            list(tle.ReadTLEs(lines, validate_checksums=False))
+
+
+# TLEArchive.Lookup and TLEArchive.ElementsAt
+# Select the latest element set at or before each (object, time) query.
+def test_tle_archive(tmp_path, tle_catalog_lines):
+    columns = tle.ReadTLECatalog(tle_catalog_lines)
+
+    # History of three element sets per object, written unsorted with a duplicate.
+    history = {key: np.concatenate([value] * 3) for key, value in columns.items()}
+    history["epoch_jsj2000_utc"] = history["epoch_jsj2000_utc"] + np.repeat(
+        [2 * DAY_IN_SECONDS, 0.0, DAY_IN_SECONDS], 2
+    )
+    history["mean_anomaly"] = history["mean_anomaly"] + np.repeat([0.2, 0.0, 0.1], 2)
+    duplicate = {key: value[:1] for key, value in history.items()}
+    duplicate["mean_anomaly"] = duplicate["mean_anomaly"] + 0.3
+    history = {key: np.append(history[key], duplicate[key]) for key in history}
+
+    archive_file = tmp_path / "history.tlea"
+    WriteTLEArchive(archive_file, history)
+    archive = TLEArchive(archive_file)
+    assert len(archive) == 6
+    assert list(archive.norad_ids_) == [25544, 88888]
+    assert np.all(np.diff(archive.Object(88888)["epoch_jsj2000_utc"]) > 0.0)
+
+    epoch_iss, epoch_sgp4 = columns["epoch_jsj2000_utc"]
+    norad_ids = [25544, 25544, 25544, 88888, 88888]
+    js_j2000_utc = [
+        epoch_iss,
+        epoch_iss + 1.5 * DAY_IN_SECONDS,
+        epoch_iss + 10.0 * DAY_IN_SECONDS,
+        epoch_sgp4 + DAY_IN_SECONDS - 1e-3,
+        epoch_sgp4 + DAY_IN_SECONDS,
+    ]
+    elements, dt_min = archive.ElementsAt(norad_ids, js_j2000_utc)
+    assert elements["mean_anomaly"] - columns["mean_anomaly"][[0, 0, 0, 1, 1]] == (
+        pytest.approx([0.0, 0.1, 0.5, 0.0, 0.1])
+    )
+    assert dt_min == pytest.approx([0.0, 720.0, 11520.0, 1440.0 - 1e-3 / 60.0, 0.0])
+
+    # Propagating the selected element sets matches SGP4 of the latest record.
+    r_teme, _, error = SGP4Catalog(elements).Propagate(dt_min[:, np.newaxis])
+    r_teme_ref, _ = tle.SGP4(next(tle.ReadTLEs(tle_catalog_lines))).GetOrbitState(0.0)
+    assert r_teme[0, 0] == pytest.approx(r_teme_ref)
+    assert np.all(error == tle.SGP4_ERROR_NONE)
+
+    with pytest.raises(KeyError):
+        archive.Lookup([88888], [epoch_sgp4 - 1.0])
+    rows = archive.Lookup([88888, 12345, 25544], epoch_iss, out_of_range="mask")
+    assert list(rows) == [5, -1, 0]
+
+    # Masked rows give NaN elements instead of the last archived element set.
+    masked = archive.Elements(rows)
+    assert list(masked["norad_id"]) == [88888, -1, 25544]
+    assert np.isnan(masked["mean_motion"][1])
+    assert masked["mean_anomaly"][[0, 2]] == pytest.approx(
+        archive.Elements([5, 0])["mean_anomaly"]
+    )
+    elements, dt_min = archive.ElementsAt(
+        [88888, 12345], [epoch_sgp4 - 1.0, epoch_iss], out_of_range="mask"
+    )
+    assert np.all(np.isnan(dt_min)) and np.all(elements["norad_id"] == -1)
+    with pytest.raises(IndexError):
+        archive.Elements([-2])
+    with pytest.raises(ValueError):
+        archive.Lookup([88888], [epoch_sgp4], out_of_range="clip")
+
+    # An empty archive has no element sets.
+    empty_file = tmp_path / "empty.tlea"
+    WriteTLEArchive(empty_file, {key: value[:0] for key, value in history.items()})
+    empty = TLEArchive(empty_file)
+    assert len(empty) == 0
+    assert list(empty.Lookup([88888, 25544], epoch_iss, out_of_range="mask")) == [
+        -1,
+        -1,
+    ]
+    with pytest.raises(KeyError):
+        empty.Lookup([88888], [epoch_iss])
+    assert np.isnan(empty.ElementsAt(88888, epoch_iss, "mask")[1])
+
+
+# ChebyshevEphemeris.FromSGP4
+# Dense queries of the fitted ephemeris stay within its error bound of SGP4.
+def test_chebyshev_ephemeris(tmp_path):
+    sgp4 = tle.SGP4(Spacetrack3TLEParameters())
+    ephemeris = ChebyshevEphemeris.FromSGP4(sgp4, 0.0, 1440.0, max_error_km=1e-4)
+    assert ephemeris.metadata_["checked_error_km"] <= 1e-4
+
+    dt_min = np.linspace(0.0, 1440.0, 20001)
+    r_teme, v_teme = ephemeris.GetOrbitStates(dt_min)
+    r_teme_ref, v_teme_ref = sgp4.GetOrbitStates(dt_min)
+    assert np.linalg.norm(r_teme - r_teme_ref, axis=1).max() < 2e-4
+    assert np.linalg.norm(v_teme - v_teme_ref, axis=1).max() < 1e-6
+
+    r_teme, v_teme = ephemeris.GetOrbitState(360.0)
+    assert r_teme.shape == (3,)
+    assert r_teme == pytest.approx(sgp4.GetOrbitState(360.0)[0], abs=2e-4)
+
+    ephemeris_file = tmp_path / "ephemeris.npz"
+    ephemeris.Save(ephemeris_file)
+    loaded = ChebyshevEphemeris.Load(ephemeris_file)
+    assert loaded.metadata_ == ephemeris.metadata_
+    assert np.array_equal(
+        loaded.GetOrbitStates(dt_min)[0], ephemeris.GetOrbitStates(dt_min)[0]
+    )
+
+    with pytest.raises(ValueError):
+        ephemeris.GetOrbitState(1440.5)
+
+
+# ScreenConjunctions
+# The screened conjunctions match the minima of an all-pairs, 1 s range search.
+def test_screen_conjunctions():
+    rng = np.random.default_rng(1)
+    n_satellites = 60
+    a_km = 6378.135 + rng.uniform(600.0, 620.0, n_satellites)
+    elements = {
+        "bstar": np.full(n_satellites, 1e-5),
+        "inclination": rng.uniform(0.0, np.pi, n_satellites),
+        "argument_perigee": rng.uniform(0.0, 2 * np.pi, n_satellites),
+        "eccentricity": rng.uniform(1e-4, 1e-2, n_satellites),
+        "right_ascension": rng.uniform(0.0, 2 * np.pi, n_satellites),
+        "mean_anomaly": rng.uniform(0.0, 2 * np.pi, n_satellites),
+        "mean_motion": np.sqrt(398600.8 / a_km**3) * 60.0,
+        "epoch_jsj2000_utc": rng.uniform(-DAY_IN_SECONDS, 0.0, n_satellites),
+    }
+    # A satellite in a different shell, which the apogee/perigee filter removes.
+    elements["mean_motion"][-1] = 0.01
+
+    catalog = SGP4Catalog(elements)
+    js_end = 3.0 * 3600.0
+    conjunctions = ScreenConjunctions(catalog, 0.0, js_end, threshold_km=100.0)
+    assert np.all(conjunctions["miss_km"] <= 100.0)
+    assert np.all(np.diff(conjunctions["tca_jsj2000_utc"]) >= 0.0)
+
+    # Local minima of the range below the threshold, over all pairs.
+    js = np.arange(0.0, js_end + 0.5, 1.0)
+    r_teme, _, _ = catalog.PropagateToJSJ2000UTC(js)
+    minima = []
+    for i in range(n_satellites):
+        range_km = np.linalg.norm(r_teme[i + 1 :] - r_teme[i], axis=2)
+        is_minimum = (range_km[:, 1:-1] < range_km[:, :-2]) & (
+            range_km[:, 1:-1] <= range_km[:, 2:]
+        )
+        for j, k in zip(*np.nonzero(is_minimum & (range_km[:, 1:-1] <= 100.0))):
+            minima.append((i, i + 1 + j, js[k + 1], range_km[j, k + 1]))
+
+    assert len(minima) == len(conjunctions["miss_km"]) > 0
+    minima.sort(key=lambda minimum: minimum[2])
+    for n, (i, j, js_tca, miss_km) in enumerate(minima):
+        assert conjunctions["primary"][n] == i
+        assert conjunctions["secondary"][n] == j
+        assert conjunctions["tca_jsj2000_utc"][n] == pytest.approx(js_tca, abs=1.0)
+        assert conjunctions["miss_km"][n] <= miss_km + 1e-6
+
+    # Only the first satellites are screened against the catalog.
+    primaries = [0, 1, 2]
+    conjunctions_primaries = ScreenConjunctions(
+        catalog, 0.0, js_end, threshold_km=100.0, primaries=primaries
+    )
+    expected = [m for m in minima if m[0] in primaries or m[1] in primaries]
+    assert len(conjunctions_primaries["miss_km"]) == len(expected)
+
+    # Spans without candidates give an empty table; empty spans are errors.
+    far = ScreenConjunctions(catalog, 0.0, 600.0, threshold_km=1e-3, primaries=[59])
+    assert all(len(column) == 0 for column in far.values())
+    with pytest.raises(ValueError):
+        ScreenConjunctions(catalog, js_end, 0.0)
+
+
+# OrbitPathFilter
+# Orbits crossing at different radii near their mutual nodes are rejected.
+def test_orbit_path_filter():
+    a_km = np.array([7000.0, 7000.0, 8000.0, 8000.0, 7500.0])
+    elements = {
+        "bstar": np.zeros(5),
+        "inclination": np.radians([0.0, 90.0, 90.0, 90.0, 1e-3]),
+        "argument_perigee": np.radians([0.0, 0.0, 90.0, 0.0, 0.0]),
+        "eccentricity": np.array([1e-4, 1e-4, 0.125, 0.125, 1e-4]),
+        "right_ascension": np.zeros(5),
+        "mean_anomaly": np.zeros(5),
+        "mean_motion": np.sqrt(398600.8 / a_km**3) * 60.0,
+        "epoch_jsj2000_utc": np.zeros(5),
+    }
+    catalog = SGP4Catalog(elements)
+
+    # 1. Equal radii, 2. perigee 90 deg from the nodes, 3. perigee at a node,
+    # 4. nearly coplanar.
+    near = OrbitPathFilter(
+        catalog, np.zeros(4, dtype=np.int64), np.arange(1, 5), 0.0, 130.0
+    )
+    assert near.tolist() == [True, False, True, True]
+
+
+# ShadowEventFinder.Events
+# Eclipse events refined from a coarse step match the sign changes sampled at 1 s.
+def test_shadow_events(tle_catalog_lines):
+    tle_param = next(tle.ReadTLEs(tle_catalog_lines))
+    js_start = tle_param["epoch_jsj2000_utc"]
+    js_end = js_start + 4 * 3600.0
+    js = np.arange(js_start, js_end, 1.0)
+
+    for model, boundaries in (
+        ("cylindrical", ["shadow"]),
+        ("conical", ["penumbra", "umbra"]),
+    ):
+        finder = ShadowEventFinder(
+            tle.SGP4(tle_param), tle_param["epoch_jsj2000_utc"], Sun(Clock()), model
+        )
+        events = finder.Events(js_start, js_end)
+        assert np.all(np.diff(events["js_j2000_utc"]) >= 0.0)
+        assert finder.n_evaluations_ < len(js) / 10
+
+        shadow = finder.Shadow(js)
+        for boundary in boundaries:
+            g = shadow[boundary]
+            sign_change = np.flatnonzero((g[:-1] > 0.0) != (g[1:] > 0.0))
+            is_boundary = events["boundary"] == boundary
+            assert len(sign_change) == np.count_nonzero(is_boundary) > 0
+            assert events["js_j2000_utc"][is_boundary] == pytest.approx(
+                js[sign_change] + 0.5, abs=0.5
+            )
+            assert np.array_equal(events["entering"][is_boundary], g[sign_change] > 0.0)
+
+    # The ISS starts the span in the umbra, inside the penumbra windows.
+    umbra_start, umbra_end = finder.Windows(js_start, js_end, "umbra")
+    penumbra_start, penumbra_end = finder.Windows(js_start, js_end)
+    assert umbra_start[0] == js_start
+    assert np.all(penumbra_start <= umbra_start)
+    assert np.all(umbra_end <= penumbra_end)
+
+    lit_start, lit_end = finder.SunlitWindows(js_start, js_end)
+    assert lit_start == pytest.approx(penumbra_end[: len(lit_start)])
+
+
+# LifetimeIllumination
+# Analytic beta angles and eclipse fractions match the propagated orbit and shadow.
+def test_lifetime_illumination(tle_catalog_lines):
+    tle_param = next(tle.ReadTLEs(tle_catalog_lines))
+    js_start = tle_param["epoch_jsj2000_utc"]
+    catalog = SGP4Catalog.FromTLEParameters([tle_param, tle_param])
+    catalog.elements_["epoch_jsj2000_utc"][1] -= DAY_IN_SECONDS
+    sun = Sun(Clock())
+
+    table = LifetimeIllumination(catalog, sun, js_start, js_start + 3 * DAY_IN_SECONDS)
+    assert table["beta_rad"].shape == (2, 47)
+    assert np.all(np.diff(table["js_j2000_utc"], axis=1) > 0.0)
+
+    sgp4 = tle.SGP4(tle_param)
+    finder = ShadowEventFinder(sgp4, js_start, sun, model="cylindrical")
+    period_s = np.diff(table["js_j2000_utc"][0, :2])[0]
+    for k in (0, 20, 46):
+        js = table["js_j2000_utc"][0, k]
+        r_teme, v_teme = sgp4.GetOrbitState((js - js_start) / 60.0)
+        h_unit = np.cross(r_teme, v_teme) / np.linalg.norm(np.cross(r_teme, v_teme))
+        beta_rad = np.arcsin(h_unit @ sun.GetMODFromJSJ2000UTC(js))
+        assert table["beta_rad"][0, k] == pytest.approx(beta_rad, abs=1e-3)
+
+        shadow_start, shadow_end = finder.Windows(js - period_s / 2, js + period_s / 2)
+        fraction = np.sum(shadow_end - shadow_start) / period_s
+        assert table["eclipse_fraction"][0, k] == pytest.approx(fraction, abs=2e-3)
+
+    # The RAAN of the second satellite has drifted for one more day.
+    assert not np.allclose(table["beta_rad"][0], table["beta_rad"][1])
+
+    # Lifetimes from today run past the end of the EOP table (2022-03-27), through
+    # a Sun table.
+    js_today = Clock().GregorianToJSJ2000([2026, 10, 18, 0, 0, 0])
+    catalog.elements_["epoch_jsj2000_utc"][:] = js_today
+    js_end = js_today + 5 * 365 * DAY_IN_SECONDS
+    lifetime = LifetimeIllumination(
+        catalog, sun.Tabulate(js_today, js_end), js_today, js_end
+    )
+    assert np.all(np.isfinite(lifetime["beta_rad"][:, :-1]))
+    assert lifetime["beta_rad"].shape[1] > 5 * 365 * 15
+    js = lifetime["js_j2000_utc"][0, -2]
+    Omega_rad = catalog.epoch_["Omega_rad"][0] + catalog.epoch_["Omegadot"][0] * (
+        (js - js_today) / 60.0
+    )
+    h_unit = OrbitNormals(catalog.epoch_["i0_rad"][0], Omega_rad)
+    assert lifetime["beta_rad"][0, -2] == pytest.approx(
+        BetaAngles(h_unit, sun.GetMODFromJSJ2000UTC(js)), abs=1e-6
+    )
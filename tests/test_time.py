@@ -1,11 +1,24 @@
-from acstoolbox.time.clock import Clock
+from acstoolbox.time import dAT
+from acstoolbox.time.clock import Clock, GREGORIAN_DTYPE
+from acstoolbox.time.epoch import Epoch
+from acstoolbox.time.shared import AttachClock, SharedTimeTables
+from acstoolbox.time.eop import (
+    DefaultEarthObservationParameterFile,
+    EarthObservationParameterStore,
+    IngestEarthObservationParameters,
+    LoadEarthObservationParameters,
+    StorePaths,
+    EOP_STORE_VERSION,
+)
 from acstoolbox.constants.time_constants import (
     DAY_IN_SECONDS,
     JD_J2000,
     MODIFIED_JULIAN_DATE_OFFSET,
     ATOMIC_TO_TERRESTRIAL_S,
 )
+import multiprocessing
 import numpy as np
+import os
 import pytest as pytest
 
 # TODO
@@ -16,10 +29,9 @@ import pytest as pytest
 # 1. In test_julian_date test for each before/after epoch when a leap second is added
 # 1. JSJ2000 methods use the TT DAY_IN_SECONDS which may not be valid for UTC, UT1, etc.
 # 1. Reference for Julian Centuries test
-# 1. test_utc_to_seconds_in_tt suffers from overflow and doesn't pass assert
+# 1. test_utc_to_seconds_in_tt suffers from overflow and doesn't pass assert (see Epoch)
 
 # Additional tests to add.
-# 1. EOP lookup for date that is out of bounds
 # 1. EOP download
 
 # UTCtoJDUTC
@@ -156,3 +168,321 @@ def test_dut1_from_gregorian():
     dUT1_s = (-0.1005632 - 0.1001852) / 2.0  # MJD of 59662.5.
 
     assert clock.GetdUT1fromGregorian(epoch_gregorian) == dUT1_s
+
+
+# LoadEarthObservationParameters
+# The compiled EOP store is memory-mapped read-only and matches the text table.
+def test_eop_store_matches_text_table(tmp_path):
+    eop_file = tmp_path / "EOP.txt"
+    eop_file.write_bytes(open(DefaultEarthObservationParameterFile(), "rb").read())
+
+    eop = LoadEarthObservationParameters(str(eop_file))
+    assert isinstance(eop.table_, np.memmap)
+    assert not eop.table_.flags.writeable
+    assert eop.metadata_["version"] == EOP_STORE_VERSION
+
+    text_table = np.loadtxt(str(eop_file))
+    assert np.array_equal(eop.Column("mjd"), text_table[:, 3])
+    assert np.array_equal(eop.Column("dUT1_s"), text_table[:, 6])
+
+
+# The compiled EOP store is rebuilt when the content of EOP.txt changes.
+def test_eop_store_invalidation(tmp_path):
+    eop_file = tmp_path / "EOP.txt"
+    lines = open(DefaultEarthObservationParameterFile()).read().splitlines()
+    eop_file.write_text("\n".join(lines[:10]))
+    assert len(LoadEarthObservationParameters(str(eop_file))) == 10
+
+    # Touching the file without changing it does not rebuild the store.
+    table_path, _ = StorePaths(str(tmp_path))
+    compiled_mtime = os.stat(table_path).st_mtime_ns
+    os.utime(eop_file, ns=(0, 0))
+    assert len(LoadEarthObservationParameters(str(eop_file))) == 10
+    assert os.stat(table_path).st_mtime_ns == compiled_mtime
+
+    eop_file.write_text("\n".join(lines[:20]))
+    assert len(LoadEarthObservationParameters(str(eop_file))) == 20
+
+
+# GetEarthObservationParameters
+# Evaluate all interpolated EOPs for an array of MJDs in one call.
+def test_eop_interpolation_array():
+    clock = Clock()
+    mjd = np.array([59662.0, 59662.25, 59662.5, 59665.0])
+    eop = clock.GetEarthObservationParameters(mjd)
+
+    # dUT1 on March 24 and 25, 2022 (MJD 59662 and 59663).
+    dUT1_s = np.array([-0.1005632, -0.1005632, -0.1005632, -0.0993188])
+    dUT1_s[1] += 0.25 * (-0.1001852 + 0.1005632)
+    dUT1_s[2] += 0.50 * (-0.1001852 + 0.1005632)
+    assert eop["dUT1_s"] == pytest.approx(dUT1_s, abs=1e-12)
+    assert sorted(eop.keys()) == sorted(
+        ["dUT1_s", "LOD_s", "x_arcsec", "y_arcsec", "dX_arcsec", "dY_arcsec"]
+    )
+
+    # Each element matches the scalar lookup.
+    for i, mjd_i in enumerate(mjd):
+        assert (
+            clock.GetEarthObservationParameter(mjd_i, "x_arcsec") == eop["x_arcsec"][i]
+        )
+
+
+# EOP lookup for dates that are out of bounds.
+def test_eop_interpolation_out_of_range():
+    clock = Clock()
+    with pytest.raises(ValueError):
+        clock.GetEarthObservationParameter(59666.0, "dUT1_s")
+    with pytest.raises(ValueError):
+        clock.GetEarthObservationParameter(np.array([37664.5, 50000.0]), "dUT1_s")
+
+    clamped = clock.GetEarthObservationParameter(
+        np.array([37000.0, 70000.0]), "dUT1_s", out_of_range="clamp"
+    )
+    assert clamped == pytest.approx([0.0326338, -0.0993188], abs=1e-12)
+
+
+# Batch conversions
+# Evaluate time-scale conversions for arrays of epochs, identical to the scalar path.
+def test_batch_conversions_match_scalar():
+    clock = Clock()
+    rng = np.random.default_rng(0)
+    n = 50
+    epochs = np.column_stack(
+        [
+            rng.integers(2000, 2022, n),
+            rng.integers(1, 13, n),
+            rng.integers(1, 29, n),
+            rng.integers(0, 24, n),
+            rng.integers(0, 60, n),
+            rng.uniform(0.0, 60.0, n),
+        ]
+    ).astype(np.float64)
+
+    batch = {
+        "GregorianToJulianDate": clock.GregorianToJulianDateBatch(epochs),
+        "GregorianToJSJ2000": clock.GregorianToJSJ2000Batch(epochs),
+        "UTCGregorianToUT1JSJ2000": clock.UTCGregorianToUT1JSJ2000Batch(epochs),
+        "UTCGregoriantoTAIJD": clock.UTCGregoriantoTAIJDBatch(epochs),
+        "UTCGregorianToTTSeconds": clock.UTCGregorianToTTSecondsBatch(epochs),
+        "UTCGregotianToTUT1": clock.UTCGregotianToTUT1Batch(epochs),
+    }
+    for method, values in batch.items():
+        assert values.shape == (n,)
+        for i in range(n):
+            # The scalar methods add offsets to the seconds of their input list.
+            assert getattr(clock, method)(list(epochs[i])) == values[i]
+
+    # Structured epoch arrays are equivalent to (N, 6) arrays.
+    structured = np.zeros(n, dtype=GREGORIAN_DTYPE)
+    for i, name in enumerate(GREGORIAN_DTYPE.names):
+        structured[name] = epochs[:, i]
+    assert np.array_equal(
+        clock.GregorianToJulianDateBatch(structured), batch["GregorianToJulianDate"]
+    )
+
+
+def _SharedClockdUT1(handle, mjd):
+    return AttachClock(handle).GetEarthObservationParameter(mjd, "dUT1_s")
+
+
+# SharedTimeTables
+# Worker clocks attached to the shared tables match a clock which loads its own.
+def test_shared_time_tables():
+    clock = Clock()
+    epoch_gregorian = np.array([[2022, 3, 24, 12, 0, 0], [2012, 7, 1, 0, 0, 0]])
+    mjd = clock.MJD(clock.GregorianToJulianDateBatch(epoch_gregorian))
+
+    with SharedTimeTables() as tables:
+        shared_clock = AttachClock(tables.Handle())
+        assert not shared_clock.eop_.table_.flags.writeable
+        assert np.array_equal(
+            shared_clock.UTCGregoriantoTAIJDBatch(epoch_gregorian),
+            clock.UTCGregoriantoTAIJDBatch(epoch_gregorian),
+        )
+
+        with multiprocessing.get_context("spawn").Pool(2) as pool:
+            dut1_s = pool.starmap(
+                _SharedClockdUT1, [(tables.Handle(), mjd_i) for mjd_i in mjd]
+            )
+
+    assert dut1_s == list(clock.GetEarthObservationParameter(mjd, "dUT1_s"))
+
+
+# LeapSecondTable
+# Evaluate the TAI-UTC step function at and around leap seconds.
+def test_leap_second_lookup():
+    clock = Clock()
+    epochs_gregorian = np.array(
+        [
+            [2016, 12, 31, 23, 59, 59],
+            [2017, 1, 1, 0, 0, 0],
+            [2022, 3, 24, 12, 1, 0],
+            [1999, 1, 1, 0, 0, 0],
+            [1972, 1, 1, 0, 0, 0],
+        ]
+    )
+    dat_s = np.array([36, 37, 37, 32, 10])
+
+    assert np.array_equal(clock.GetdATfromGregorianBatch(epochs_gregorian), dat_s)
+    for epoch_gregorian, dat_s_i in zip(epochs_gregorian, dat_s):
+        assert clock.GetdATfromGregorian(list(epoch_gregorian)) == dat_s_i
+        jd_utc = clock.GregorianToJulianDate(list(epoch_gregorian))
+        assert dAT.GetdAT(jd_utc) == dat_s_i
+
+    with pytest.raises(ValueError):
+        clock.GetdATfromGregorian([1971, 12, 31, 0, 0, 0])
+
+
+# The leap second table is loaded from a local Leap_Second.dat file.
+def test_leap_second_file(tmp_path):
+    leap_second_file = tmp_path / "Leap_Second.dat"
+    leap_second_file.write_text(
+        "#  MJD        Date        TAI-UTC (s)\n"
+        "    57204.0    1  7 2015       36\n"
+        "    57754.0    1  1 2017       37\n"
+        "    70000.0    1  1 2050       38\n"
+    )
+    clock = Clock(dAT=dAT.LoadLeapSecondTable(str(leap_second_file)))
+    assert clock.GetdATfromGregorian([2051, 1, 1, 0, 0, 0]) == 38
+    assert clock.GetdATfromGregorian([2022, 3, 24, 12, 1, 0]) == 37
+
+
+# Epoch
+# Epochs are exact int64 nanoseconds from J2000 in their time scale.
+def test_epoch_from_gregorian():
+    clock = Clock()
+    epochs_gregorian = np.array(
+        [[2000, 1, 1, 12, 0, 0], [2022, 3, 24, 12, 1, 30.25], [1980, 1, 6, 0, 0, 0]]
+    )
+    t_utc = Epoch.FromGregorian(epochs_gregorian, "UTC")
+
+    assert t_utc.ns_[0] == 0
+    assert t_utc.ToJSJ2000() == pytest.approx(
+        clock.GregorianToJSJ2000Batch(epochs_gregorian), abs=1e-5
+    )
+    jd1, jd2 = t_utc.ToJulianDate()
+    assert jd1 + jd2 == pytest.approx(
+        clock.GregorianToJulianDateBatch(epochs_gregorian), abs=1e-9
+    )
+    assert np.all(Epoch.FromJulianDate(jd1, jd2, "UTC") == t_utc)
+
+    # Fractional days, hours and minutes carry over, as in the Clock.
+    epochs_fractional = np.array(
+        [[2020, 1, 1, 12.5, 0, 0], [2020, 1, 1.25, 0, 0.5, 0], [2020, 1, 1, 0, 0, 0]]
+    )
+    t_fractional = Epoch.FromGregorian(epochs_fractional)
+    assert list(t_fractional.DiffNanoseconds(t_fractional[2])) == [
+        45000 * 10**9,
+        21630 * 10**9,
+        0,
+    ]
+    assert t_fractional.ToJSJ2000() == pytest.approx(
+        clock.GregorianToJSJ2000Batch(epochs_fractional), abs=1e-4
+    )
+    with pytest.raises(ValueError):
+        Epoch.FromGregorian([[2020, 1.5, 1, 0, 0, 0]])
+
+
+# Time-scale conversions of epochs are exact for TAI and TT.
+def test_epoch_time_scales():
+    clock = Clock()
+    t_utc = Epoch.FromGregorian([[2022, 3, 24, 12, 0, 0], [2000, 1, 1, 12, 0, 0]])
+
+    t_tt = t_utc.ToScale("TT", clock)
+    assert list(t_tt.DiffNanoseconds(Epoch(t_utc.ns_, "TT"))) == [
+        69184000000,
+        64184000000,
+    ]
+    assert np.all(t_tt.ToScale("UTC", clock) == t_utc)
+
+    # UT1 matches the dUT1 interpolated by the Clock.
+    t_ut1 = t_utc.ToScale("UT1", clock)
+    dUT1_s = (-0.1005632 - 0.1001852) / 2.0  # MJD of 59662.5.
+    assert (t_ut1.ns_[0] - t_utc.ns_[0]) / 1e9 == pytest.approx(dUT1_s, abs=1e-9)
+    assert np.all(np.abs(t_ut1.ToScale("UTC", clock).DiffNanoseconds(t_utc)) <= 1)
+
+    with pytest.raises(ValueError):
+        t_utc < t_tt
+
+
+# Epoch arithmetic does not lose precision far from J2000.
+def test_epoch_arithmetic():
+    t0 = Epoch.FromGregorian([[2100, 1, 1, 0, 0, 0]], "TT")
+    t = t0 + np.arange(1000000) * 1e-9
+
+    assert np.array_equal(t.DiffNanoseconds(t0), np.arange(1000000))
+    assert (t[-1] - t0)[0] == pytest.approx(999999e-9, abs=1e-15)
+    assert np.all(t[1:] > t[:-1])
+    assert (t0 + np.timedelta64(1, "D") - t0)[0] == DAY_IN_SECONDS
+    assert (t0 - 1.5).DiffNanoseconds(t0)[0] == -1500000000
+
+    # Epochs are not equal to, nor ordered with, other types.
+    assert not (t0 == None)
+    assert t0 != None
+    assert t0 not in [None, 1.0]
+    with pytest.raises(TypeError):
+        t0 < 1.0
+
+
+# IngestEarthObservationParameters
+# Rows past the last MJD of the store are appended with their provenance.
+def test_eop_ingestion(tmp_path):
+    lines = open(DefaultEarthObservationParameterFile()).read().splitlines()
+    eop_file = tmp_path / "EOP.txt"
+    eop_file.write_text("\n".join(lines[:100]))
+    new_eop_file = tmp_path / "eopc04.txt"
+    new_eop_file.write_text("\n".join(["  YEAR  MONTH  DAY  MJD"] + lines[50:150]))
+
+    clock = Clock(eop=LoadEarthObservationParameters(str(eop_file)))
+    mjd_new = clock.eop_.mjd_last_ + 25.5
+    with pytest.raises(ValueError):
+        clock.GetEarthObservationParameter(mjd_new, "dUT1_s")
+
+    assert IngestEarthObservationParameters(str(new_eop_file), str(eop_file)) == 50
+    assert IngestEarthObservationParameters(str(new_eop_file), str(eop_file)) == 0
+
+    # Running clocks hot-reload the extended store.
+    assert clock.ReloadEarthObservationParameters()
+    assert not clock.ReloadEarthObservationParameters()
+    assert len(clock.eop_) == 150
+    assert np.array_equal(clock.eop_.table_.T, np.loadtxt(lines[:150]))
+    assert clock.eop_.Provenance(mjd_new)["path"] == str(new_eop_file)
+    assert clock.eop_.Provenance(clock.eop_.mjd_first_)["path"] == str(eop_file)
+
+    # Rebuilding the store from a changed EOP.txt re-ingests the newer file.
+    eop_file.write_text("\n".join(lines[:120]))
+    assert len(LoadEarthObservationParameters(str(eop_file))) == 150
+
+    # Rows must continue the store daily.
+    gap_eop_file = tmp_path / "gap.txt"
+    gap_eop_file.write_text("\n".join(lines[160:170]))
+    with pytest.raises(ValueError):
+        IngestEarthObservationParameters(str(gap_eop_file), str(eop_file))
+
+
+# CachedConversions
+# Repeated epochs are served from a size-bounded LRU cache scoped to a block.
+def test_conversion_cache():
+    clock = Clock()
+    epoch_gregorian = [2022, 3, 24, 12, 0, 0]
+    js_ut1 = clock.UTCGregorianToUT1JSJ2000(epoch_gregorian)
+
+    with clock.CachedConversions(maxsize=2) as cache:
+        for _ in range(3):
+            assert clock.UTCGregorianToUT1JSJ2000(epoch_gregorian) == js_ut1
+        assert cache.Statistics()["hits"] == 2
+        assert cache.Statistics()["misses"] == 1
+
+        # The least recently used epochs are evicted.
+        clock.UTCGregorianToUT1JSJ2000([2022, 3, 24, 13, 0, 0])
+        clock.UTCGregorianToUT1JSJ2000([2022, 3, 24, 14, 0, 0])
+        assert len(cache) == 2
+        assert cache.Statistics()["evictions"] == 1
+
+        # A new EOP store invalidates the cache.
+        clock.eop_ = EarthObservationParameterStore(clock.eop_.table_)
+        assert clock.UTCGregorianToUT1JSJ2000(epoch_gregorian) == js_ut1
+        assert cache.Statistics()["invalidations"] == 1
+        assert len(cache) == 1
+
+    assert clock.cache_ is None
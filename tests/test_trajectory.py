@@ -0,0 +1,164 @@
+from acstoolbox.ephemerides.sun import Sun
+from acstoolbox.foundation.quaternion import Quaternion
+from acstoolbox.foundation.so3 import EulerAxisStack
+from acstoolbox.orbit import tle
+from acstoolbox.time.clock import Clock
+from acstoolbox.trajectory.alignconstrained import AlignConstrained
+from acstoolbox.trajectory.pipeline import (
+    AttitudeProfile,
+    CallbackSink,
+    NpyFileSink,
+    ReduceSink,
+    TimeSeriesSink,
+)
+from acstoolbox.foundation.timeseries import TimeSeriesFile
+
+import numpy as np
+import pytest as pytest
+
+
+# 1. Aligned and constrained attitudes over a stack of inertial vectors.
+def test_align_constrained_batch():
+    rng = np.random.default_rng(3)
+    p_b = np.array([0.0, 0.0, 1.0])
+    s_b = np.array([1.0, 1.0, 0.0])
+    trajectory = AlignConstrained(p_b, s_b)
+
+    a_i = rng.normal(size=(200, 3))
+    c_i = rng.normal(size=(200, 3))
+    C_bi = trajectory.AttitudeBatch(a_i, c_i)
+    assert C_bi.shape == (200, 3, 3)
+    assert np.einsum("nji,njk->nik", C_bi, C_bi) == pytest.approx(
+        np.broadcast_to(np.identity(3), (200, 3, 3)), abs=1e-14
+    )
+
+    # p_b is aligned with a_i.
+    a_unit = a_i / np.linalg.norm(a_i, axis=1, keepdims=True)
+    assert np.einsum("nij,nj->ni", C_bi, a_unit) == pytest.approx(
+        np.broadcast_to(p_b, (200, 3)), abs=1e-14
+    )
+
+    # s_b is as close as possible to c_i, over all rotations about p_b.
+    c_unit = c_i / np.linalg.norm(c_i, axis=1, keepdims=True)
+    s_unit = s_b / np.linalg.norm(s_b)
+    cos_sc = np.einsum("nij,nj->ni", C_bi, c_unit) @ s_unit
+    for phi in np.linspace(-np.pi, np.pi, 37):
+        C_phi = EulerAxisStack(np.broadcast_to(p_b, (200, 3)), phi)
+        assert np.all(
+            np.einsum("nij,nj->ni", C_phi @ C_bi, c_unit) @ s_unit <= cos_sc + 1e-12
+        )
+
+    # The single-epoch attitude and quaternions match the stack.
+    assert trajectory.Attitude(a_i[4], c_i[4]) == pytest.approx(C_bi[4])
+    q_bi = trajectory.AttitudeBatch(a_i, c_i, representation="quaternion")
+    assert q_bi.DCM() == pytest.approx(C_bi, abs=1e-14)
+
+
+# 2. Degenerate alignments and constraints are finite rotations.
+def test_align_constrained_degenerate():
+    p_b = np.array([1.0, 0.0, 0.0])
+    trajectory = AlignConstrained(p_b, np.array([0.0, 1.0, 0.0]))
+
+    # Parallel, antiparallel and constraint-parallel-to-alignment epochs.
+    a_i = np.array([[2.0, 0.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    c_i = np.array([[0.0, 0.0, 1.0], [0.0, 0.0, 1.0], [0.0, 0.0, 3.0]])
+    C_bi, degenerate = trajectory.AttitudeBatch(a_i, c_i, return_degenerate=True)
+    assert np.all(np.isfinite(C_bi))
+    assert list(degenerate) == [False, False, True]
+    a_unit = a_i / np.linalg.norm(a_i, axis=1, keepdims=True)
+    assert np.einsum("nij,nj->ni", C_bi, a_unit) == pytest.approx(
+        np.broadcast_to(p_b, (3, 3)), abs=1e-15
+    )
+    assert C_bi[:2] @ np.array([0.0, 0.0, 1.0]) == pytest.approx(
+        np.array([[0.0, 1.0, 0.0], [0.0, 1.0, 0.0]]), abs=1e-15
+    )
+
+
+# 3. Attitude profiles streamed in blocks match a single batch.
+def test_attitude_profile(tmp_path, tle_catalog_lines):
+    tle_param = next(tle.ReadTLEs(tle_catalog_lines))
+    js_start = tle_param["epoch_jsj2000_utc"]
+    js_end = js_start + 7200.0
+    profile = AttitudeProfile(
+        tle.SGP4(tle_param),
+        js_start,
+        Sun(Clock()),
+        AlignConstrained(np.array([0.0, 0.0, 1.0]), np.array([1.0, 0.0, 0.0])),
+    )
+
+    def MaxDeterminantError(error, block):
+        return max(error, np.abs(np.linalg.det(block["attitude"]) - 1.0).max())
+
+    block_sizes = []
+    paths, max_determinant_error, _, series_path = profile.Run(
+        js_start,
+        js_end,
+        1.0,
+        [
+            NpyFileSink(tmp_path, ["js_j2000_utc", "attitude"]),
+            ReduceSink(MaxDeterminantError, 0.0),
+            CallbackSink(lambda start, block: block_sizes.append(len(block["a_i"]))),
+            TimeSeriesSink(tmp_path / "profile.acsts", ["attitude"], "zlib"),
+        ],
+        block_size=1000,
+    )
+    assert block_sizes == [1000] * 7 + [201]
+    assert max_determinant_error < 1e-14
+
+    # Blocks written to disk match the attitudes of a single block.
+    js = np.load(paths["js_j2000_utc"], mmap_mode="r")
+    attitude = np.load(paths["attitude"], mmap_mode="r")
+    assert js.shape == (7201,)
+    assert np.array_equal(js, js_start + np.arange(7201.0))
+    assert np.array_equal(attitude, profile.Block(np.asarray(js))["attitude"])
+
+    # Time windows read back from the time series file.
+    window = TimeSeriesFile(series_path).Read(js[1500], js[2500])
+    assert np.array_equal(window["js_j2000_utc"], js[1500:2501])
+    assert np.array_equal(window["attitude"], attitude[1500:2501])
+
+    # Sun-pointing with a nadir constraint, as quaternions.
+    profile = AttitudeProfile(
+        tle.SGP4(tle_param),
+        js_start,
+        Sun(Clock()),
+        AlignConstrained(np.array([0.0, 0.0, 1.0]), np.array([1.0, 0.0, 0.0])),
+        representation="quaternion",
+    )
+    _, block = next(profile.Blocks(js_start, js_end, 60.0))
+    assert block["attitude"].shape == (121, 4)
+    q_bi = Quaternion(block["attitude"])
+    assert q_bi.Rotate(block["s_mod"]) == pytest.approx(
+        np.broadcast_to([0.0, 0.0, 1.0], (121, 3)), abs=1e-12
+    )
+
+
+# 4. Sinks of a failed run are released, with the blocks written before the failure.
+def test_attitude_profile_failure(tmp_path, tle_catalog_lines):
+    tle_param = next(tle.ReadTLEs(tle_catalog_lines))
+    js_start = tle_param["epoch_jsj2000_utc"]
+    profile = AttitudeProfile(
+        tle.SGP4(tle_param),
+        js_start,
+        Sun(Clock()),
+        AlignConstrained(np.array([0.0, 0.0, 1.0]), np.array([1.0, 0.0, 0.0])),
+    )
+
+    def Fail(start, block):
+        if start >= 2000:
+            raise RuntimeError("Sink failure.")
+
+    sinks = [
+        TimeSeriesSink(tmp_path / "profile.acsts", ["attitude"]),
+        NpyFileSink(tmp_path, ["js_j2000_utc"]),
+        CallbackSink(Fail),
+    ]
+    with pytest.raises(RuntimeError, match="Sink failure"):
+        profile.Run(js_start, js_start + 3600.0, 1.0, sinks, block_size=1000)
+
+    assert sinks[0].writer_.file_ is None
+    assert sinks[1].outputs_ == {}
+    series = TimeSeriesFile(tmp_path / "profile.acsts")
+    assert len(series) == 3000
+    js = np.load(tmp_path / "js_j2000_utc.npy")
+    assert np.array_equal(js[:3000], js_start + np.arange(3000.0))
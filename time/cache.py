@@ -0,0 +1,73 @@
+"""ACS Toolbox: Conversion Cache
+This module contains an opt-in, size-bounded LRU cache of Clock and Sun
+conversions keyed by exact epoch. It is enabled on a Clock, either for a scope
+with Clock.CachedConversions() or until Clock.DisableCache().
+"""
+
+# Standard libraries.
+from collections import OrderedDict
+
+# Third party libraries.
+import numpy as np
+
+
+class ConversionCache:
+    def __init__(self, maxsize=4096):
+        """Conversion Cache
+        Inputs: 1. maxsize: maximum number of cached conversions (least recently used evicted)
+
+        Comments: The cache remembers the EOP store its entries were computed with and
+                  is invalidated by the Clock when that store changes.
+        """
+        if maxsize < 1:
+            raise ValueError(f"The cache size {maxsize} must be positive.")
+
+        self.maxsize_ = maxsize
+        self.entries_ = OrderedDict()
+        self.eop_ = None
+
+        # Statistics.
+        self.hits_ = 0
+        self.misses_ = 0
+        self.evictions_ = 0
+        self.invalidations_ = 0
+
+    def __len__(self):
+        return len(self.entries_)
+
+    def Get(self, key, compute):
+        # Return the cached value of key, or compute and cache it.
+        try:
+            value = self.entries_[key]
+        except KeyError:
+            self.misses_ += 1
+            value = compute()
+            self.entries_[key] = value
+            if len(self.entries_) > self.maxsize_:
+                self.entries_.popitem(last=False)
+                self.evictions_ += 1
+        else:
+            self.hits_ += 1
+            self.entries_.move_to_end(key)
+
+        # Callers own the arrays they receive.
+        if isinstance(value, np.ndarray):
+            return value.copy()
+
+        return value
+
+    def Invalidate(self):
+        self.entries_.clear()
+        self.invalidations_ += 1
+
+    def Statistics(self):
+        lookups = self.hits_ + self.misses_
+        return {
+            "hits": self.hits_,
+            "misses": self.misses_,
+            "hit_rate": self.hits_ / lookups if lookups else 0.0,
+            "evictions": self.evictions_,
+            "invalidations": self.invalidations_,
+            "size": len(self.entries_),
+            "maxsize": self.maxsize_,
+        }
@@ -1,6 +1,12 @@
 import os
 from acstoolbox.constants.time_constants import *
-import math
+from acstoolbox.time.cache import ConversionCache
+from acstoolbox.time.dAT import LoadLeapSecondTable
+from acstoolbox.time.eop import (
+    EOP_INTERPOLATED_COLUMNS,
+    LoadEarthObservationParameters,
+)
+import contextlib
 import numpy as np
 import os
 import pandas as pd
@@ -10,9 +16,12 @@ import pandas as pd
 # 1. Add check to JD when the formula becomes invalid
 # 1. Confirm in UTCGregorianToTTSeconds if 1 JD in TT (or TAI) have 86400s
 # 1. UTCGregorianToTTSeconds must use modified julian dates because of overflow
+#    (epoch.Epoch carries exact int64 nanoseconds from J2000 in TT)
 
 
 def ConstructEarthObservationParameterTables():
+    # NOTE: Clock reads the compiled binary store (see time/eop.py); this
+    # DataFrame view of EOP.txt is kept for interactive inspection.
     # TODO: Confirm infer_nrows to determine negative values of columns
     # Long Term: EOP 14 C04 (IAU2000A)
     # Reference: https://hpiers.obspm.fr/eoppc/eop/eopc04/C04.guide.pdf
@@ -72,25 +81,8 @@ def DayofYear(yyyy, mm, dd, h, m, s):
 
 
 def YearFractionalDaystoJDUTC(yyyy, total_fractional_days):
-    days_per_month = GetDaysInEachMonth()
-    if IsLeapYear(yyyy):
-        days_per_month[1] = 29
-
-    mm = 0
-    full_months_in_days = 0
-    for month in np.linspace(0, 11, 12):
-        days_up_to_month_end = sum(days_per_month[0 : int(month + 1)])
-        if days_up_to_month_end > total_fractional_days:
-            mm = month + 1
-            if month > 0:
-                full_months_in_days = sum(days_per_month[0 : (int(month))])
-            break
-    print(f"full: {full_months_in_days}")
-    fractional_days_remaining = total_fractional_days - full_months_in_days
-    dd = math.floor(fractional_days_remaining)
-
-    print(f"month: {mm}, day: {dd}, fract: {fractional_days_remaining-dd}")
-    return UTCFractionalDayToJDUTC(yyyy, mm, dd, fractional_days_remaining - dd)
+    # Day of year (Jan 1 0h = 1.0) counted from Jan 0 of the year, i.e. m = 1, d = 0.
+    return UTCFractionalDayToJDUTC(yyyy, 1, 0, total_fractional_days)
 
 
 def UTCFractionalDayToJDUTC(y, m, d, fractional_day):
@@ -104,18 +96,43 @@ def UTCFractionalDayToJDUTC(y, m, d, fractional_day):
     )
 
 
+# Structured epoch array for batch conversions, equivalent to an (N, 6) array.
+GREGORIAN_DTYPE = np.dtype(
+    [
+        ("year", np.float64),
+        ("month", np.float64),
+        ("day", np.float64),
+        ("hour", np.float64),
+        ("minute", np.float64),
+        ("second", np.float64),
+    ]
+)
+
+
+def GregorianArray(epochs):
+    """Convert an (N, 6) array or a GREGORIAN_DTYPE structured array of Gregorian
+    epochs [y m d hh mm ss] into an (N, 6) float64 array."""
+    epochs = np.asarray(epochs)
+    if epochs.dtype.names is not None:
+        return np.stack(
+            [epochs[name].astype(np.float64) for name in GREGORIAN_DTYPE.names],
+            axis=-1,
+        ).reshape(-1, 6)
+
+    epochs = np.asarray(epochs, dtype=np.float64)
+    if epochs.ndim != 2 or epochs.shape[1] != 6:
+        raise ValueError(
+            f"Gregorian epochs of shape {epochs.shape} must be of shape (N, 6)."
+        )
+
+    return epochs
+
+
 def GetdATTable():
-    return {
-        "51179.0": 32,
-        "53736.0": 33,
-        "54832.0": 34,
-        "56109.0": 35,
-        "57204.0": 36,
-        "57754.0": 37,
-    }
+    # Legacy {"MJD": dAT} view of the leap second table (see time/dAT.py).
+    return LoadLeapSecondTable().ToDict()
 
 
-# TODO: Update dAT table
 # TODO: Pass list of [y, m, d, mm, hh, s] instead of individual floats
 # TODO: Other functions
 # TODO: check for units [seconds, days, years]
@@ -124,9 +141,52 @@ def GetdATTable():
 # TODO: CLS vs SELF
 # NOTE: Gregorian dates are stored as lists in the format [y m d hh mm ss]
 class Clock:
-    def __init__(self):
-        self.eop_df_ = ConstructEarthObservationParameterTables()
-        self.dAT_ = GetdATTable()
+    def __init__(self, eop=None, dAT=None):
+        # The compiled EOP store is memory-mapped once per process and shared by all clocks.
+        # Workers may instead pass the tables attached from shared memory (see time/shared.py).
+        self.eop_ = eop if eop is not None else LoadEarthObservationParameters()
+        self.dAT_ = dAT if dAT is not None else LoadLeapSecondTable()
+
+        # Opt-in conversion cache (see EnableCache and CachedConversions).
+        self.cache_ = None
+
+    # -----------------------------------------------------------------------
+    # Conversion cache.
+    def EnableCache(self, maxsize=4096):
+        self.cache_ = ConversionCache(maxsize)
+        return self.cache_
+
+    def DisableCache(self):
+        self.cache_ = None
+
+    @contextlib.contextmanager
+    def CachedConversions(self, maxsize=4096):
+        """Scope a conversion cache to a block, e.g. one simulation run.
+
+        Example Call:
+            with clock.CachedConversions(maxsize=100000) as cache:
+                run_simulation(clock, sun)
+            print(cache.Statistics())
+        """
+        previous_cache = self.cache_
+        cache = self.EnableCache(maxsize)
+        try:
+            yield cache
+        finally:
+            self.cache_ = previous_cache
+
+    def Memoize(self, key, compute):
+        # Evaluate compute() through the cache, if enabled, under an exact epoch key.
+        if self.cache_ is None:
+            return compute()
+
+        # Entries computed with another EOP store are stale.
+        if self.cache_.eop_ is not self.eop_:
+            if self.cache_.eop_ is not None:
+                self.cache_.Invalidate()
+            self.cache_.eop_ = self.eop_
+
+        return self.cache_.Get(key, compute)
 
     # Evaluate the Julian Date from a Gregorian date input.
     # The Julian Date frame is the same frame as the input.
@@ -158,20 +218,23 @@ class Clock:
         return (jd - JD_J2000) / kCenturyInJulianDays
 
     def UTCGregorianToUT1JSJ2000(self, gregorian):
-        jd_utc = self.GregorianToJulianDate(gregorian)
-        mjd_utc = self.MJD(jd_utc)
-        js_from_j2000_utc = (jd_utc - JD_J2000) * DAY_IN_SECONDS
+        def Compute():
+            jd_utc = self.GregorianToJulianDate(gregorian)
+            mjd_utc = self.MJD(jd_utc)
+            js_from_j2000_utc = (jd_utc - JD_J2000) * DAY_IN_SECONDS
 
-        dut1_s = self.GetEarthObservationParameter(mjd_utc, "dUT1_s")
+            dut1_s = self.GetEarthObservationParameter(mjd_utc, "dUT1_s")
 
-        return js_from_j2000_utc + dut1_s
+            return js_from_j2000_utc + dut1_s
+
+        return self.Memoize(("UTCGregorianToUT1JSJ2000", tuple(gregorian)), Compute)
 
     def UTCGregoriantoTAIJD(self, gregorian_utc):
         dat_s = self.GetdATfromGregorian(gregorian_utc)
 
         # Add the leap second offset to the UTC seconds.
         # Valid addition since the JD conversion divides the seconds by 60 (61) to sum minutes.
-        gregorian_tai = gregorian_utc
+        gregorian_tai = list(gregorian_utc)
         gregorian_tai[5] = gregorian_tai[5] + dat_s
 
         return self.GregorianToJulianDate(gregorian_tai)
@@ -186,34 +249,112 @@ class Clock:
         # return self.TAIstoTTs(jd_tai * DAY_IN_SECONDS)
         return jd_tai * DAY_IN_SECONDS
 
-    def UTCGregotianToTUT1(self, gregorian_utc):
-        jd_utc = self.GregorianToJulianDate(gregorian_utc)
-        mjd_utc = self.MJD(jd_utc)
-        dut1_s = self.GetEarthObservationParameter(mjd_utc, "dUT1_s")
+    def UTCGregotianToTUT1(self, gregorian_utc, out_of_range="raise"):
+        # out_of_range: "raise" a ValueError or "clamp" dUT1 to the EOP table bounds.
+        def Compute():
+            jd_utc = self.GregorianToJulianDate(gregorian_utc)
+            mjd_utc = self.MJD(jd_utc)
+            dut1_s = self.GetEarthObservationParameter(mjd_utc, "dUT1_s", out_of_range)
 
-        # Add the UT1 offset to the UTC seconds.
-        # Valid addition since the JD conversion divides the seconds by 60 (61) to sum minutes.
-        gregorian_ut1 = gregorian_utc
-        gregorian_ut1[5] = gregorian_ut1[5] + dut1_s
-        jd_ut1 = self.GregorianToJulianDate(gregorian_ut1)
+            # Add the UT1 offset to the UTC seconds.
+            # Valid addition since the JD conversion divides the seconds by 60 (61) to sum minutes.
+            gregorian_ut1 = list(gregorian_utc)
+            gregorian_ut1[5] = gregorian_ut1[5] + dut1_s
+            jd_ut1 = self.GregorianToJulianDate(gregorian_ut1)
 
-        return self.JDToT(jd_ut1)
+            return self.JDToT(jd_ut1)
+
+        return self.Memoize(
+            ("UTCGregotianToTUT1", tuple(gregorian_utc), out_of_range), Compute
+        )
 
     def GetdUT1fromGregorian(self, gregorian):
         MJD = self.MJD(self.GregorianToJulianDate(gregorian))
         return self.GetEarthObservationParameter(MJD, "dUT1_s")
 
-    def GetEarthObservationParameter(self, mjd, param):
-        mjd_lb = math.floor(mjd)
-        mjd_ub = math.ceil(mjd)
+    def ReloadEarthObservationParameters(self):
+        # Swap to the latest compiled EOP store, e.g. after new rows were ingested
+        # by another process. Returns True if the store was reloaded.
+        if self.eop_.paths_ is None:
+            return False
+
+        eop = LoadEarthObservationParameters(*self.eop_.paths_)
+        if eop is self.eop_:
+            return False
+
+        self.eop_ = eop
+        if self.cache_ is not None:
+            self.cache_.Invalidate()
+            self.cache_.eop_ = eop
 
-        lb = pd.to_numeric(self.eop_df_.loc[self.eop_df_["mjd"] == mjd_lb, param])
-        ub = pd.to_numeric(self.eop_df_.loc[self.eop_df_["mjd"] == mjd_ub, param])
+        return True
 
-        return np.interp(mjd, [mjd_lb, mjd_ub], [lb.iloc[0], ub.iloc[0]])
+    def GetEarthObservationParameter(self, mjd, param, out_of_range="raise"):
+        # mjd may be a scalar or an array of MJDs (UTC).
+        # out_of_range: "raise" a ValueError or "clamp" to the EOP table bounds.
+        return self.eop_.Interpolate(mjd, [param], out_of_range)[param]
+
+    def GetEarthObservationParameters(
+        self, mjd, params=EOP_INTERPOLATED_COLUMNS, out_of_range="raise"
+    ):
+        # Interpolate dUT1, LOD, x, y, dX and dY for all MJDs in one call.
+        return self.eop_.Interpolate(mjd, params, out_of_range)
 
     def GetdATfromGregorian(self, gregorian):
         MJD = self.MJD(self.GregorianToJulianDate(gregorian))
-        index = [x for x in self.dAT_.keys() if float(x) <= MJD]
+        return self.dAT_.GetdAT(MJD)
+
+    # -----------------------------------------------------------------------
+    # Batch conversions.
+    # Each method takes an (N, 6) array (or a GREGORIAN_DTYPE structured array)
+    # of Gregorian epochs and returns an (N,) array, identical to the scalar method.
+    def GregorianToJulianDateBatch(self, epochs):
+        g = GregorianArray(epochs)
+        return (
+            367 * g[:, 0]
+            - np.trunc(7 * (g[:, 0] + np.trunc((g[:, 1] + 9) / 12)) / 4)
+            + np.trunc(275 * g[:, 1] / 9)
+            + g[:, 2]
+            + 1721013.5
+            + ((g[:, 5] / 60 + g[:, 4]) / 60 + g[:, 3]) / 24
+        )
+
+    def GregorianToJSJ2000Batch(self, epochs):
+        jd_from_j2000 = self.GregorianToJulianDateBatch(epochs) - JD_J2000
+        return jd_from_j2000 * DAY_IN_SECONDS
+
+    def UTCGregorianToUT1JSJ2000Batch(self, epochs_utc):
+        jd_utc = self.GregorianToJulianDateBatch(epochs_utc)
+        mjd_utc = self.MJD(jd_utc)
+        js_from_j2000_utc = (jd_utc - JD_J2000) * DAY_IN_SECONDS
+
+        dut1_s = self.GetEarthObservationParameter(mjd_utc, "dUT1_s")
+
+        return js_from_j2000_utc + dut1_s
+
+    def UTCGregoriantoTAIJDBatch(self, epochs_utc):
+        # Copy, such that the leap second offset is not added to the input epochs.
+        epochs_tai = np.array(GregorianArray(epochs_utc))
+        epochs_tai[:, 5] = epochs_tai[:, 5] + self.GetdATfromGregorianBatch(epochs_tai)
+
+        return self.GregorianToJulianDateBatch(epochs_tai)
+
+    def UTCGregorianToTTSecondsBatch(self, epochs_utc):
+        jd_tai = self.UTCGregoriantoTAIJDBatch(epochs_utc)
+
+        # TT and TAI both have 86400 s in 1 day.
+        return jd_tai * DAY_IN_SECONDS
+
+    def UTCGregotianToTUT1Batch(self, epochs_utc):
+        epochs_ut1 = np.array(GregorianArray(epochs_utc))
+        epochs_ut1[:, 5] = epochs_ut1[:, 5] + self.GetdUT1fromGregorianBatch(epochs_ut1)
+
+        return self.JDToT(self.GregorianToJulianDateBatch(epochs_ut1))
+
+    def GetdUT1fromGregorianBatch(self, epochs):
+        MJD = self.MJD(self.GregorianToJulianDateBatch(epochs))
+        return self.GetEarthObservationParameter(MJD, "dUT1_s")
 
-        return self.dAT_[index[-1]]
+    def GetdATfromGregorianBatch(self, epochs):
+        MJD = self.MJD(self.GregorianToJulianDateBatch(epochs))
+        return self.dAT_.GetdATBatch(MJD)
@@ -1,8 +1,105 @@
-dATs = {2456109.5: 35, 2457204.5: 36, 2457754.5: 37}
+"""ACS Toolbox: Leap Seconds
+This module contains the TAI-UTC (dAT) step function shared by every Clock.
+The table is loaded from a local IERS Leap_Second.dat file and stored as sorted
+NumPy arrays: scalar lookups bisect the table and batch lookups use searchsorted.
+"""
+
+# Standard libraries.
+import bisect
+import os
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.constants.time_constants import MODIFIED_JULIAN_DATE_OFFSET
+
+# Tables loaded by this process, keyed by file path.
+_loaded_tables = {}
+
+
+def DefaultLeapSecondFile():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "Leap_Second.dat")
+
+
+def ParseLeapSecondFile(leap_second_file):
+    """Parse an IERS Leap_Second.dat file into (MJD start, TAI-UTC [s]) arrays.
+    Each row holds: MJD, day, month, year, TAI-UTC. Lines starting with '#' are comments.
+    """
+    table = np.loadtxt(leap_second_file, comments="#", dtype=np.float64, ndmin=2)
+
+    return table[:, 0], table[:, 4]
+
+
+class LeapSecondTable:
+    def __init__(self, mjd_start, dat_s):
+        """Leap Second Table
+        Inputs: 1. mjd_start: MJD (UTC) from which each dAT applies, strictly increasing
+                2. dat_s: TAI-UTC [s]
+
+        Comments: dAT is a step function of the UTC MJD. Epochs before the first
+                  leap second (1972) are not supported.
+        """
+        self.mjd_start_ = np.asarray(mjd_start, dtype=np.float64)
+        self.dat_s_ = np.asarray(dat_s, dtype=np.float64)
+
+        if self.mjd_start_.ndim != 1 or self.mjd_start_.shape != self.dat_s_.shape:
+            raise ValueError(
+                "The leap second MJDs and dATs must be 1D arrays of equal size."
+            )
+        if len(self.mjd_start_) == 0 or np.any(np.diff(self.mjd_start_) <= 0.0):
+            raise ValueError(
+                "The leap second MJDs must be non-empty and strictly increasing."
+            )
+
+        # Python lists for the scalar bisect lookup.
+        self.mjd_start_list_ = self.mjd_start_.tolist()
+        self.dat_s_list_ = self.dat_s_.tolist()
+
+    def __len__(self):
+        return len(self.mjd_start_)
+
+    def GetdAT(self, mjd_utc):
+        # O(log n) lookup of the last leap second at or before the epoch.
+        index = bisect.bisect_right(self.mjd_start_list_, mjd_utc) - 1
+        if index < 0:
+            raise ValueError(f"MJD {mjd_utc} precedes the leap second table.")
+
+        return self.dat_s_list_[index]
+
+    def GetdATBatch(self, mjd_utc):
+        mjd_utc = np.asarray(mjd_utc, dtype=np.float64)
+        index = np.searchsorted(self.mjd_start_, mjd_utc, side="right") - 1
+        if np.any(index < 0):
+            raise ValueError(
+                f"MJD {mjd_utc[index < 0].flat[0]} precedes the leap second table."
+            )
+
+        return self.dat_s_[index]
+
+    def ToDict(self):
+        # Legacy {"MJD": dAT} format of GetdATTable.
+        return {
+            str(mjd): int(s) for mjd, s in zip(self.mjd_start_list_, self.dat_s_list_)
+        }
+
+
+def LoadLeapSecondTable(leap_second_file=None):
+    """Load (once per process) the leap second table from a local file.
+
+    Example Call:
+        dat = LoadLeapSecondTable()
+        dat_s = dat.GetdAT(59662.5)
+    """
+    leap_second_file = os.path.abspath(leap_second_file or DefaultLeapSecondFile())
+    if leap_second_file not in _loaded_tables:
+        _loaded_tables[leap_second_file] = LeapSecondTable(
+            *ParseLeapSecondFile(leap_second_file)
+        )
+
+    return _loaded_tables[leap_second_file]
+
 
 def GetdAT(JD_UTC):
-    # Retrieve all the dATs which start at JDs before the date
-    # of interest. The last of these is the desired dAT.
-    dAT_list = [v for k,v in dATs.items() if k < JD_UTC]
-    
-    return dAT_list[-1]
+    # Retrieve the dAT which applies at the Julian Date (UTC).
+    return LoadLeapSecondTable().GetdAT(JD_UTC - MODIFIED_JULIAN_DATE_OFFSET)
@@ -0,0 +1,392 @@
+"""ACS Toolbox: Earth Observation Parameter Store
+This module compiles the IERS EOP 14 C04 text table (EOP.txt) into a versioned
+binary store which is memory-mapped read-only by every Clock.
+
+The store is a pair of files written next to the source table:
+  1. EOP.v<version>.npy:  float64 table of shape (n_columns, n_days), one
+                          contiguous row per EOP column, indexed by MJD.
+  2. EOP.v<version>.json: metadata (version, columns, source mtime/size/sha256).
+
+The store is rebuilt when the source mtime (or size) changes and its hash differs.
+Rows of newer C04 files are appended with IngestEarthObservationParameters, and
+the metadata records the file and MJD range (segment) each row came from.
+"""
+
+# Standard libraries.
+import copy
+import hashlib
+import json
+import os
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.foundation.files import AtomicWrite
+
+# Long Term: EOP 14 C04 (IAU2000A)
+# Reference: https://hpiers.obspm.fr/eoppc/eop/eopc04/C04.guide.pdf
+EOP_COLUMNS = [
+    "year",
+    "month",
+    "date",
+    "mjd",
+    "x_arcsec",
+    "y_arcsec",
+    "dUT1_s",
+    "LOD_s",
+    "dX_arcsec",
+    "dY_arcsec",
+    "x_Err_arcsec",
+    "y_err_arcsec",
+    "dUT1_err_s",
+    "LOD_err_s",
+    "dX_err_arcsec",
+    "dY_err_arcsec",
+]
+EOP_STORE_VERSION = 2
+
+# Columns returned by default from the interpolation engine.
+EOP_INTERPOLATED_COLUMNS = [
+    "dUT1_s",
+    "LOD_s",
+    "x_arcsec",
+    "y_arcsec",
+    "dX_arcsec",
+    "dY_arcsec",
+]
+
+# Stores loaded by this process, keyed by (source, store directory).
+_loaded_stores = {}
+
+
+def DefaultEarthObservationParameterFile():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "EOP.txt")
+
+
+def StorePaths(store_dir, version=EOP_STORE_VERSION):
+    """Paths of the (table, metadata) files of a compiled store."""
+    stem = os.path.join(store_dir, f"EOP.v{version}")
+    return stem + ".npy", stem + ".json"
+
+
+def FileSHA256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as opened_file:
+        for block in iter(lambda: opened_file.read(1 << 20), b""):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+
+def ParseEarthObservationParameterFile(eop_file):
+    """Parse an EOP C04 text table (path or lines) into a (n_columns, n_days) float64 table."""
+    table = np.loadtxt(eop_file, dtype=np.float64, ndmin=2)
+    if table.shape[1] != len(EOP_COLUMNS):
+        raise ValueError(
+            f"EOP file {eop_file} has {table.shape[1]} columns, expected {len(EOP_COLUMNS)}."
+        )
+
+    return np.ascontiguousarray(table.T)
+
+
+def _WriteMetadata(metadata_path, metadata):
+    AtomicWrite(
+        metadata_path,
+        lambda f: f.write(json.dumps(metadata, indent=2).encode("utf-8")),
+    )
+
+
+def _SourceSignature(eop_file):
+    stat = os.stat(eop_file)
+    return {
+        "path": os.path.abspath(eop_file),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+class EarthObservationParameterStore:
+    def __init__(self, table, columns=EOP_COLUMNS, metadata=None):
+        """Earth Observation Parameter Store
+        Inputs: 1. table: float64 array of shape (n_columns, n_days), one row per column
+                2. columns: column names in table row order
+                3. metadata: store metadata (version, source)
+
+        Comments: The table is typically a read-only memory map of the compiled store,
+                  hence the pages are shared by every process which loads it.
+                  The table must be daily and contiguous in MJD, such that an MJD
+                  maps directly to a column offset.
+        """
+        self.table_ = table
+        self.columns_ = {name: index for index, name in enumerate(columns)}
+        self.metadata_ = metadata if metadata is not None else {}
+
+        # (EOP file, store directory) of stores loaded from disk, used to reload them.
+        self.paths_ = None
+
+        mjd = self.Column("mjd")
+        if len(mjd) < 2 or mjd[-1] - mjd[0] != len(mjd) - 1:
+            raise ValueError("The EOP table must contain at least 2 contiguous days.")
+        self.mjd_first_ = float(mjd[0])
+        self.mjd_last_ = float(mjd[-1])
+
+    def __len__(self):
+        return self.table_.shape[1]
+
+    def Column(self, param):
+        return self.table_[self.columns_[param]]
+
+    def Provenance(self, mjd):
+        # Return the segment (file, sha256, MJD range) which provided the row of an MJD.
+        for segment in self.metadata_.get("segments", []):
+            if segment["mjd_first"] <= mjd <= segment["mjd_last"]:
+                return segment
+
+        return None
+
+    def Interpolate(self, mjd, params=EOP_INTERPOLATED_COLUMNS, out_of_range="raise"):
+        """Linearly interpolate EOP columns at one or many MJDs.
+        Inputs: 1. mjd: scalar or array of MJD (UTC)
+                2. params: EOP column names to interpolate
+                3. out_of_range: "raise" a ValueError, or "clamp" to the first/last day
+        Output: 1. Dictionary of interpolated values, each the shape of mjd
+
+        Example Call:
+            eop = LoadEarthObservationParameters()
+            values = eop.Interpolate(np.array([59662.25, 59662.5]), ["dUT1_s", "LOD_s"])
+        """
+        mjd = np.asarray(mjd, dtype=np.float64)
+        n_days = len(self)
+
+        # The table is daily and contiguous: the MJD is a direct offset into each column.
+        offset = mjd - self.mjd_first_
+        if out_of_range == "clamp":
+            offset = np.clip(offset, 0.0, n_days - 1)
+        elif out_of_range == "raise":
+            in_range = (offset >= 0.0) & (offset <= n_days - 1)
+            if not np.all(in_range):
+                raise ValueError(
+                    f"MJD {mjd[~in_range].flat[0]} is outside of the EOP table "
+                    f"[{self.mjd_first_}, {self.mjd_last_}]."
+                )
+        else:
+            raise ValueError(f"Unknown out_of_range behaviour '{out_of_range}'.")
+
+        # The last day interpolates from the previous day with a fraction of 1.
+        index_lb = np.minimum(np.floor(offset).astype(np.intp), n_days - 2)
+        index_ub = index_lb + 1
+        fraction = offset - index_lb
+
+        values = {}
+        for param in params:
+            column = self.Column(param)
+            lb = column[index_lb]
+            value = (column[index_ub] - lb) * fraction + lb
+            values[param] = value if value.ndim else float(value)
+
+        return values
+
+
+def _Segment(eop_file, table):
+    mjd = table[EOP_COLUMNS.index("mjd")]
+    return {
+        "path": os.path.abspath(eop_file),
+        "sha256": FileSHA256(eop_file),
+        "mjd_first": float(mjd[0]),
+        "mjd_last": float(mjd[-1]),
+    }
+
+
+def _WriteStore(store_dir, table, metadata):
+    table_path, metadata_path = StorePaths(store_dir)
+    metadata["shape"] = list(table.shape)
+
+    # The table is written before the metadata, which marks the store as complete.
+    AtomicWrite(table_path, lambda f: np.save(f, table))
+    _WriteMetadata(metadata_path, metadata)
+
+
+def CompileEarthObservationParameters(eop_file=None, store_dir=None):
+    """Compile the EOP text table into the binary store and return the store metadata."""
+    eop_file = eop_file or DefaultEarthObservationParameterFile()
+    store_dir = store_dir or os.path.dirname(os.path.abspath(eop_file))
+
+    table = ParseEarthObservationParameterFile(eop_file)
+    segment = _Segment(eop_file, table)
+    source = _SourceSignature(eop_file)
+    source["sha256"] = segment["sha256"]
+
+    metadata = {
+        "version": EOP_STORE_VERSION,
+        "columns": EOP_COLUMNS,
+        "source": source,
+        "segments": [segment],
+    }
+    _WriteStore(store_dir, table, metadata)
+
+    return metadata
+
+
+def ReadNewEarthObservationParameterRows(eop_file, mjd_last):
+    """Parse only the rows of an EOP C04 text file with an MJD past mjd_last.
+    Rows before it (and header lines) are skipped without parsing their values.
+    """
+    new_lines = []
+    with open(eop_file) as opened_file:
+        for line in opened_file:
+            fields = line.split(None, 4)
+            try:
+                mjd = float(fields[3])
+            except (IndexError, ValueError):
+                continue
+            if mjd > mjd_last:
+                new_lines.append(line)
+
+    if not new_lines:
+        return np.empty((len(EOP_COLUMNS), 0))
+
+    return ParseEarthObservationParameterFile(new_lines)
+
+
+def IngestEarthObservationParameters(new_eop_file, eop_file=None, store_dir=None):
+    """Append the rows of a newer EOP C04 file past the last MJD of the compiled store.
+    Inputs: 1. new_eop_file: updated EOP C04 text file (e.g. the weekly IERS C04)
+            2. eop_file, store_dir: identify the store, as in LoadEarthObservationParameters
+    Output: 1. Number of rows appended
+
+    Comments: The rows are appended to the store and recorded as a new segment of its
+              metadata. Loaded stores remain valid; Clock.ReloadEarthObservationParameters
+              swaps a running Clock to the extended store. When EOP.txt itself changes,
+              the store is rebuilt and the ingested files which still exist are re-ingested.
+
+    Example Call:
+        n_rows = IngestEarthObservationParameters("/data/iers/eopc04.txt")
+        clock.ReloadEarthObservationParameters()
+    """
+    store = LoadEarthObservationParameters(eop_file, store_dir)
+    if store.paths_ is None or "segments" not in store.metadata_:
+        raise ValueError("Only compiled EOP stores on disk can ingest new rows.")
+
+    new_table = ReadNewEarthObservationParameterRows(new_eop_file, store.mjd_last_)
+    if new_table.shape[1] == 0:
+        return 0
+
+    new_mjd = new_table[EOP_COLUMNS.index("mjd")]
+    if new_mjd[0] != store.mjd_last_ + 1 or np.any(np.diff(new_mjd) != 1.0):
+        raise ValueError(
+            f"The rows of {new_eop_file} from MJD {new_mjd[0]} do not continue the "
+            f"EOP store daily from MJD {store.mjd_last_}."
+        )
+
+    metadata = copy.deepcopy(store.metadata_)
+    metadata["segments"].append(_Segment(new_eop_file, new_table))
+    table = np.concatenate([store.table_, new_table], axis=1)
+    _WriteStore(store.paths_[1], table, metadata)
+
+    return new_table.shape[1]
+
+
+def _ReadMetadata(metadata_path):
+    try:
+        with open(metadata_path) as opened_file:
+            return json.load(opened_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _ReadValidMetadata(eop_file, metadata_path, table_path):
+    # Return the metadata of an up-to-date store, or None if it must be (re)built.
+    if not os.path.exists(table_path):
+        return None
+
+    metadata = _ReadMetadata(metadata_path)
+    if metadata is None:
+        return None
+    if metadata.get("version") != EOP_STORE_VERSION:
+        return None
+    if metadata.get("columns") != EOP_COLUMNS:
+        return None
+
+    source = metadata.get("source", {})
+    signature = _SourceSignature(eop_file)
+    if (
+        source.get("mtime_ns") == signature["mtime_ns"]
+        and source.get("size") == signature["size"]
+    ):
+        return metadata
+
+    # The source was touched: only rebuild if its content changed.
+    if source.get("sha256") != FileSHA256(eop_file):
+        return None
+
+    source.update(signature)
+    try:
+        _WriteMetadata(metadata_path, metadata)
+    except OSError:
+        pass
+
+    return metadata
+
+
+def _StoreSignature(eop_file, metadata_path):
+    # The metadata is rewritten by every (re)build and ingestion.
+    source = _SourceSignature(eop_file)
+    try:
+        stat = os.stat(metadata_path)
+        return source, (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return source, None
+
+
+def LoadEarthObservationParameters(eop_file=None, store_dir=None):
+    """Load the compiled EOP store, (re)building it from the text table if required.
+
+    Example Call:
+        eop = LoadEarthObservationParameters()
+        dut1_s = eop.Column("dUT1_s")
+    """
+    eop_file = os.path.abspath(eop_file or DefaultEarthObservationParameterFile())
+    store_dir = os.path.abspath(store_dir or os.path.dirname(eop_file))
+    table_path, metadata_path = StorePaths(store_dir)
+
+    # Reuse the store already mapped by this process if nothing changed on disk.
+    key = (eop_file, store_dir)
+    signature = _StoreSignature(eop_file, metadata_path)
+    if key in _loaded_stores:
+        loaded_signature, store = _loaded_stores[key]
+        if loaded_signature == signature:
+            return store
+
+    metadata = _ReadValidMetadata(eop_file, metadata_path, table_path)
+    try:
+        if metadata is None:
+            previous_metadata = _ReadMetadata(metadata_path) or {}
+            metadata = CompileEarthObservationParameters(eop_file, store_dir)
+
+            # Re-ingest the newer files of the previous store which still exist.
+            for segment in previous_metadata.get("segments", [])[1:]:
+                if os.path.exists(segment["path"]):
+                    try:
+                        IngestEarthObservationParameters(
+                            segment["path"], eop_file, store_dir
+                        )
+                    except ValueError:
+                        continue
+            metadata = _ReadMetadata(metadata_path)
+        table = np.load(table_path, mmap_mode="r")
+    except OSError:
+        # Read-only installation: fall back to an in-memory table.
+        table = ParseEarthObservationParameterFile(eop_file)
+        table.flags.writeable = False
+        metadata = {"version": EOP_STORE_VERSION, "source": signature[0]}
+
+    if table.ndim != 2 or table.shape[0] != len(EOP_COLUMNS):
+        raise ValueError(f"EOP store {table_path} has an invalid shape {table.shape}.")
+
+    store = EarthObservationParameterStore(table, EOP_COLUMNS, metadata)
+    if "segments" in metadata:
+        store.paths_ = key
+    _loaded_stores[key] = (_StoreSignature(eop_file, metadata_path), store)
+
+    return store
@@ -0,0 +1,263 @@
+"""ACS Toolbox: Epoch Module
+This module contains the Epoch array type: a contiguous int64 array of
+nanoseconds from J2000 (JD 2451545.0) tagged with its time scale.
+
+Integer nanoseconds give exact arithmetic over +/- 292 years from J2000, unlike
+float64 Julian Dates (~20 us resolution) or seconds multiplied from them.
+"""
+
+# Standard libraries.
+import operator
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.constants.time_constants import *
+from acstoolbox.time.clock import Clock, GregorianArray
+
+TIME_SCALES = ("UTC", "TAI", "TT", "UT1")
+
+NANOSECONDS_IN_SECOND = 1000000000
+NANOSECONDS_IN_DAY = 86400 * NANOSECONDS_IN_SECOND
+ATOMIC_TO_TERRESTRIAL_NS = 32184000000
+
+
+def SecondsToNanoseconds(seconds):
+    return np.round(
+        np.asarray(seconds, dtype=np.float64) * NANOSECONDS_IN_SECOND
+    ).astype(np.int64)
+
+
+class Epoch:
+    def __init__(self, ns, scale):
+        """Epoch Array
+        Inputs: 1. ns: int64 nanoseconds from J2000 in the time scale
+                2. scale: time scale, one of UTC, TAI, TT or UT1
+
+        Comments: J2000 is JD 2451545.0 in the epoch's own time scale, as for the
+                  JS from J2000 methods of Clock.
+
+        Example Call:
+            t_utc = Epoch.FromGregorian([[2022, 3, 24, 12, 0, 0]], "UTC")
+            t_tt = t_utc.ToScale("TT")
+            dt_s = (t_tt + 60.0) - t_tt
+        """
+        if scale not in TIME_SCALES:
+            raise ValueError(
+                f"Unknown time scale '{scale}', expected one of {TIME_SCALES}."
+            )
+
+        self.ns_ = np.asarray(ns, dtype=np.int64)
+        self.scale_ = scale
+
+    # -----------------------------------------------------------------------
+    # Construction.
+    @classmethod
+    def FromJSJ2000(cls, js_j2000, scale):
+        return cls(SecondsToNanoseconds(js_j2000), scale)
+
+    @classmethod
+    def FromJulianDate(cls, jd1, jd2=0.0, scale="UTC"):
+        # The two-part Julian Date jd1 + jd2 keeps the precision of both parts.
+        days = np.asarray(jd1, dtype=np.float64) - JD_J2000
+        whole_days = np.floor(days)
+        return cls(
+            whole_days.astype(np.int64) * NANOSECONDS_IN_DAY
+            + np.round((days - whole_days) * NANOSECONDS_IN_DAY).astype(np.int64)
+            + np.round(np.asarray(jd2, dtype=np.float64) * NANOSECONDS_IN_DAY).astype(
+                np.int64
+            ),
+            scale,
+        )
+
+    @classmethod
+    def FromGregorian(cls, epochs, scale="UTC"):
+        """Exact integer form of Clock.GregorianToJulianDate for (N, 6) epochs.
+        Fractional days, hours and minutes carry over to the seconds, as in Clock;
+        the year and month must be integral.
+        """
+        g = GregorianArray(epochs)
+        if np.any(g[:, :2] != np.floor(g[:, :2])):
+            raise ValueError("The year and month of Gregorian epochs must be integral.")
+        y = g[:, 0].astype(np.int64)
+        m = g[:, 1].astype(np.int64)
+
+        # Whole days, hours and minutes, and the seconds of their fractional parts.
+        whole = np.floor(g[:, 2:5])
+        seconds = (g[:, 2:5] - whole) @ np.array([86400.0, 3600.0, 60.0]) + g[:, 5]
+        whole = whole.astype(np.int64)
+
+        # Day number of the Julian Date at 0h (JD = day + 0.5).
+        day = (
+            367 * y
+            - (7 * (y + (m + 9) // 12)) // 4
+            + (275 * m) // 9
+            + whole[:, 0]
+            + 1721013
+        )
+        ns = (
+            (day - int(JD_J2000)) * NANOSECONDS_IN_DAY
+            + NANOSECONDS_IN_DAY // 2
+            + whole[:, 1] * 3600 * NANOSECONDS_IN_SECOND
+            + whole[:, 2] * 60 * NANOSECONDS_IN_SECOND
+            + SecondsToNanoseconds(seconds)
+        )
+
+        return cls(ns, scale)
+
+    # -----------------------------------------------------------------------
+    # Conversion.
+    def ToJSJ2000(self):
+        seconds = self.ns_ // NANOSECONDS_IN_SECOND
+        return (
+            seconds
+            + (self.ns_ - seconds * NANOSECONDS_IN_SECOND) / NANOSECONDS_IN_SECOND
+        )
+
+    def ToJulianDate(self):
+        # Two-part Julian Date (jd1, jd2): whole days from J2000 and the day fraction.
+        days = self.ns_ // NANOSECONDS_IN_DAY
+        fraction = (self.ns_ - days * NANOSECONDS_IN_DAY) / NANOSECONDS_IN_DAY
+        return JD_J2000 + days, fraction
+
+    def ToMJD(self):
+        jd1, jd2 = self.ToJulianDate()
+        return (jd1 - MODIFIED_JULIAN_DATE_OFFSET) + jd2
+
+    def ToCenturies(self):
+        # Julian centuries from J2000 (e.g. T_UT1, T_TT).
+        days = self.ns_ // NANOSECONDS_IN_DAY
+        fraction = (self.ns_ - days * NANOSECONDS_IN_DAY) / NANOSECONDS_IN_DAY
+        return (days + fraction) / kCenturyInJulianDays
+
+    def ToScale(self, scale, clock=None):
+        """Convert to another time scale: UTC <-> TAI <-> TT, UTC <-> UT1.
+        The clock provides the leap second and EOP tables (default: Clock()).
+        """
+        if scale not in TIME_SCALES:
+            raise ValueError(
+                f"Unknown time scale '{scale}', expected one of {TIME_SCALES}."
+            )
+        if scale == self.scale_:
+            return self
+
+        clock = clock if clock is not None else Clock()
+
+        # Convert through UTC, the scale of the EOP and leap second tables.
+        ns_utc = self._ToUTC(clock)
+        if scale == "UTC":
+            return Epoch(ns_utc, "UTC")
+        if scale == "UT1":
+            return Epoch(ns_utc + self._dUT1(ns_utc, clock), "UT1")
+
+        ns_tai = ns_utc + self._dAT(ns_utc, clock)
+        if scale == "TAI":
+            return Epoch(ns_tai, "TAI")
+
+        return Epoch(ns_tai + ATOMIC_TO_TERRESTRIAL_NS, "TT")
+
+    def _ToUTC(self, clock):
+        if self.scale_ == "UTC":
+            return self.ns_
+        if self.scale_ == "UT1":
+            # dUT1 is tabulated against UTC: evaluate it at the first UTC estimate.
+            ns_utc = self.ns_ - self._dUT1(self.ns_, clock)
+            return self.ns_ - self._dUT1(ns_utc, clock)
+
+        ns_tai = self.ns_
+        if self.scale_ == "TT":
+            ns_tai = ns_tai - ATOMIC_TO_TERRESTRIAL_NS
+
+        # dAT is tabulated against UTC: evaluate it at the first UTC estimate.
+        ns_utc = ns_tai - self._dAT(ns_tai, clock)
+        return ns_tai - self._dAT(ns_utc, clock)
+
+    @staticmethod
+    def _dAT(ns_utc, clock):
+        mjd_utc = Epoch(ns_utc, "UTC").ToMJD()
+        return SecondsToNanoseconds(clock.dAT_.GetdATBatch(mjd_utc))
+
+    @staticmethod
+    def _dUT1(ns_utc, clock):
+        mjd_utc = Epoch(ns_utc, "UTC").ToMJD()
+        return SecondsToNanoseconds(
+            clock.GetEarthObservationParameter(mjd_utc, "dUT1_s")
+        )
+
+    # -----------------------------------------------------------------------
+    # Arithmetic and comparison.
+    def __len__(self):
+        return len(self.ns_)
+
+    def __getitem__(self, index):
+        return Epoch(self.ns_[index], self.scale_)
+
+    def __repr__(self):
+        return f"Epoch({self.ns_!r}, '{self.scale_}')"
+
+    @property
+    def shape(self):
+        return self.ns_.shape
+
+    def AddNanoseconds(self, ns):
+        return Epoch(self.ns_ + np.asarray(ns, dtype=np.int64), self.scale_)
+
+    def DiffNanoseconds(self, other):
+        self._CheckScale(other)
+        return self.ns_ - other.ns_
+
+    def __add__(self, seconds):
+        # Add a duration in seconds (float, array or np.timedelta64).
+        if isinstance(seconds, np.timedelta64) or (
+            isinstance(seconds, np.ndarray) and seconds.dtype.kind == "m"
+        ):
+            return self.AddNanoseconds(
+                np.asarray(seconds).astype("timedelta64[ns]").astype(np.int64)
+            )
+
+        return self.AddNanoseconds(SecondsToNanoseconds(seconds))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        # Epoch - Epoch is a duration in seconds, Epoch - seconds is an Epoch.
+        if isinstance(other, Epoch):
+            return self.DiffNanoseconds(other) / NANOSECONDS_IN_SECOND
+
+        return self + (-np.asarray(other))
+
+    def _CheckScale(self, other):
+        if other.scale_ != self.scale_:
+            raise ValueError(
+                f"Epochs in {self.scale_} and {other.scale_} cannot be compared; "
+                "convert them with ToScale first."
+            )
+
+    def _Compare(self, other, compare):
+        # Element-wise comparison of epochs of the same scale; other types are not
+        # comparable (e.g. epoch == None is False).
+        if not isinstance(other, Epoch):
+            return NotImplemented
+        self._CheckScale(other)
+        return compare(self.ns_, other.ns_)
+
+    def __eq__(self, other):
+        return self._Compare(other, operator.eq)
+
+    def __ne__(self, other):
+        return self._Compare(other, operator.ne)
+
+    def __lt__(self, other):
+        return self._Compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._Compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._Compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._Compare(other, operator.ge)
+
+    __hash__ = None
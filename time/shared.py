@@ -0,0 +1,127 @@
+"""ACS Toolbox: Shared Time Tables
+This module publishes the EOP and leap second tables once into
+multiprocessing.shared_memory, such that the Clocks of worker processes attach
+to them zero-copy instead of each loading their own copy.
+
+Example Call:
+    def Propagate(handle, epochs):
+        clock = AttachClock(handle)
+        return clock.UTCGregorianToUT1JSJ2000Batch(epochs)
+
+    with SharedTimeTables() as tables:
+        with multiprocessing.Pool(8) as pool:
+            pool.starmap(Propagate, [(tables.Handle(), e) for e in epoch_chunks])
+"""
+
+# Standard libraries.
+import sys
+from multiprocessing import shared_memory
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.time.clock import Clock
+from acstoolbox.time.dAT import LeapSecondTable, LoadLeapSecondTable
+from acstoolbox.time.eop import (
+    EOP_COLUMNS,
+    EarthObservationParameterStore,
+    LoadEarthObservationParameters,
+)
+
+# Tables attached by this process, keyed by shared memory name. The attachments
+# are kept for the lifetime of the process since the tables are views of them.
+_attached_tables = {}
+
+
+def AttachSharedMemory(name):
+    # Attach to shared memory which the publishing process owns (and unlinks).
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    return shared_memory.SharedMemory(name=name)
+
+
+def _PublishArray(array):
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared_array = np.ndarray(array.shape, dtype=np.float64, buffer=shm.buf)
+    shared_array[...] = array
+
+    return shm
+
+
+def _SharedArray(shm, shape):
+    array = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    array.flags.writeable = False
+
+    return array
+
+
+class SharedTimeTables:
+    def __init__(self, eop=None, dAT=None):
+        """Shared Time Tables
+        Inputs: 1. eop: EarthObservationParameterStore to publish (default: compiled store)
+                2. dAT: LeapSecondTable to publish (default: Leap_Second.dat)
+
+        Comments: The publishing (parent) process owns the shared memory and must
+                  Close() it once the workers are finished, preferably by using
+                  the tables as a context manager. Handle() returns a small
+                  picklable description that workers pass to AttachClock().
+        """
+        eop = eop if eop is not None else LoadEarthObservationParameters()
+        dAT = dAT if dAT is not None else LoadLeapSecondTable()
+        dat_table = np.stack([dAT.mjd_start_, dAT.dat_s_])
+
+        self.eop_shm_ = _PublishArray(eop.table_)
+        self.dat_shm_ = _PublishArray(dat_table)
+        self.handle_ = {
+            "eop": {
+                "name": self.eop_shm_.name,
+                "shape": tuple(eop.table_.shape),
+                "metadata": eop.metadata_,
+            },
+            "dAT": {"name": self.dat_shm_.name, "shape": dat_table.shape},
+        }
+
+    def Handle(self):
+        return self.handle_
+
+    def Close(self):
+        for shm in (self.eop_shm_, self.dat_shm_):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.Close()
+
+
+def AttachTimeTables(handle):
+    """Attach to published tables and return (EOP store, leap second table) views."""
+    name = handle["eop"]["name"]
+    if name not in _attached_tables:
+        eop_shm = AttachSharedMemory(name)
+        dat_shm = AttachSharedMemory(handle["dAT"]["name"])
+
+        eop = EarthObservationParameterStore(
+            _SharedArray(eop_shm, handle["eop"]["shape"]),
+            EOP_COLUMNS,
+            handle["eop"]["metadata"],
+        )
+        dat = LeapSecondTable(*_SharedArray(dat_shm, handle["dAT"]["shape"]))
+
+        _attached_tables[name] = (eop, dat, (eop_shm, dat_shm))
+
+    eop, dat, _ = _attached_tables[name]
+
+    return eop, dat
+
+
+def AttachClock(handle):
+    """Construct a Clock from tables published by SharedTimeTables (zero-copy)."""
+    eop, dat = AttachTimeTables(handle)
+
+    return Clock(eop=eop, dAT=dat)
@@ -1,48 +1,93 @@
 # Standard libraries.
 import numpy as np
-import math
 
 # ACS Toolbox.
-from acs_toolbox.foundation import rotation as C
+from acstoolbox.foundation import so3 as C
+from acstoolbox.foundation.math import compose_stack, is_column_stack
+from acstoolbox.foundation.quaternion import Quaternion
+
+# Vectors closer to parallel than this (sine of their angle) are degenerate.
+ALIGN_CONSTRAINED_PARALLEL_TOL = 1e-12
+
 
 class AlignConstrained:
     def __init__(self, p_b, s_b):
-        '''Align Constrained Trajectory
+        """Align Constrained Trajectory
         Constructor: 1) p_b: body-fixed vector to align with
                      2) s_b: body-fixed vector to constrain with
         Outputs:     Inertial trajectory which *aligns* p_b with an inertial
                      vector a_i. Since a simple alignment results in an indeterminate
                      attitude, it is *constrained* by rotating about p_b to
                      align s_b as closely as possible with an inertial vector c_i.
-        TODO:        1) Attitude: Protect against +/- infinity (+/- pi/2 rotation) in atan comp
-        '''
+        """
 
         # Normalize the align/constrain vectors.
         self.p_b_ = p_b / np.linalg.norm(p_b)
         self.s_b_ = s_b / np.linalg.norm(s_b)
 
     def Attitude(self, a_i, c_i):
-        '''
+        """
         Input: 1) a_i: Inertial vector which p_b aligns with
                2) c_i: Inertial vector which p_b constrains with
-        '''
+        Output: Rotation matrix C_bi from inertial to body, C_bi a_i = p_b
+        """
+        return self.AttitudeBatch(
+            np.asarray(a_i, dtype=np.float64)[np.newaxis],
+            np.asarray(c_i, dtype=np.float64)[np.newaxis],
+        )[0]
+
+    def AttitudeBatch(self, a_i, c_i, representation="dcm", return_degenerate=False):
+        """
+        Input: 1) a_i: (N, 3) inertial vectors which p_b aligns with
+               2) c_i: (N, 3) inertial vectors which s_b constrains with
+               3) representation: "dcm" for (N, 3, 3) rotation matrices C_bi, or
+                  "quaternion" for a Quaternion stack of the same rotations
+               4) return_degenerate: also return the (N,) mask of the epochs where
+                  c_i is parallel to a_i, and the rotation about p_b is undefined (0)
+        Comments: When p_b and a_i are antiparallel, the alignment is a half turn
+                  about an axis perpendicular to p_b.
+        """
+        if representation not in ("dcm", "quaternion"):
+            raise ValueError(
+                f"Unknown attitude representation '{representation}', "
+                "expected 'dcm' or 'quaternion'."
+            )
+        is_column_stack(a_i)
+        is_column_stack(c_i)
 
         # Normalize vectors.
-        a_i = a_i / np.linalg.norm(a_i)
-        c_i = c_i / np.linalg.norm(c_i)
+        a_i = a_i / np.linalg.norm(a_i, axis=1, keepdims=True)
+        c_i = c_i / np.linalg.norm(c_i, axis=1, keepdims=True)
+        p_b, s_b = self.p_b_, self.s_b_
+
+        # Rotation from inertial to aligned, about p_b x a_i.
+        a_a = np.cross(p_b, a_i)
+        sin_ai = np.linalg.norm(a_a, axis=1)
+        phi_ai = np.arctan2(sin_ai, a_i @ p_b)
 
-        # Rotation from inertial to aligned.
-        a_a = np.cross(self.p_b_, a_i)
-        phi_ai = math.acos(self.p_b_.dot(a_i) / np.linalg.norm(a_i))
-        C_ai = C.EulerAxis(a_a, phi_ai)
+        # Parallel vectors: any axis perpendicular to p_b.
+        parallel = sin_ai <= ALIGN_CONSTRAINED_PARALLEL_TOL
+        a_a[parallel] = np.cross(p_b, np.identity(3)[np.argmin(np.abs(p_b))])
+        a_a /= np.linalg.norm(a_a, axis=1, keepdims=True)
+        C_ai = C.EulerAxisStack(a_a, phi_ai)
 
-        # Rotation from aligned to constrained.
-        c_a = C_ai.dot(c_i)
-        ppt_mone = np.outer(self.p_b_, self.p_b_) - np.identity(3)
-        phi_ca = math.atan( self.s_b_.dot(np.cross(self.p_b_, c_a)) /  self.s_b_.dot( ppt_mone.dot(c_a)) )
-        C_ca = C.EulerAxis(self.p_b_, phi_ca)
+        # Rotation from aligned to constrained, about p_b, maximizing s_b . C_ca c_a:
+        # s_b . C_ca c_a = A cos(phi) - B sin(phi) + const.
+        c_a = np.einsum("nij,nj->ni", C_ai, c_i)
+        A = c_a @ s_b - (c_a @ p_b) * (s_b @ p_b)
+        B = np.cross(p_b, c_a) @ s_b
+        degenerate = np.hypot(A, B) <= ALIGN_CONSTRAINED_PARALLEL_TOL
+        phi_ca = np.where(degenerate, 0.0, np.arctan2(-B, A))
 
-        return C_ai.dot(C_ca)
+        if representation == "quaternion":
+            attitude = Quaternion.FromEulerAxis(p_b, phi_ca) * (
+                Quaternion.FromEulerAxis(a_a, phi_ai)
+            )
+        else:
+            attitude = compose_stack(
+                C.EulerAxisStack(np.broadcast_to(p_b, a_a.shape), phi_ca), C_ai
+            )
 
-    
-    
+        if return_degenerate:
+            return attitude, degenerate
+        return attitude
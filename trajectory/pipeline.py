@@ -0,0 +1,263 @@
+"""ACS Toolbox: Attitude Profile Pipeline Module
+This module generates attitude profiles lazily: the orbit, Sun vectors, target
+vectors and AlignConstrained attitudes are evaluated block by block of
+block_size epochs, and each block is passed to sinks and released, so the
+memory is constant over any time span.
+
+Blocks are dictionaries of (n, ...) arrays:
+    js_j2000_utc: epochs [JS from J2000, UTC]
+    r_teme, v_teme: orbit position [km] and velocity [km/s]
+    s_mod: unit Sun vectors
+    a_i, c_i: align and constrain vectors
+    attitude: (n, 3, 3) rotation matrices C_bi, or (n, 4) quaternions
+    degenerate: epochs where the constraint is undefined (see AlignConstrained)
+
+Comments: The orbit (TEME) and Sun (MOD) frames are not distinguished.
+
+Example Call:
+    profile = AttitudeProfile(tle.SGP4(tle_param), tle_param["epoch_jsj2000_utc"], Sun(clock),
+                              AlignConstrained(p_b, s_b), align="sun", constrain="nadir")
+    degenerate_count = ReduceSink(lambda n, block: n + np.count_nonzero(block["degenerate"]), 0)
+    sinks = [TimeSeriesSink("profile.acsts", ["attitude"], "zlib"), degenerate_count]
+    path, n_degenerate = profile.Run(js_start, js_start + 365 * DAY_IN_SECONDS, 0.1, sinks)
+"""
+
+# Standard libraries.
+import os
+
+# Third party libraries.
+import numpy as np
+
+# ACS Toolbox.
+from acstoolbox.foundation.timeseries import TimeSeriesWriter
+
+# Number of epochs per block.
+PIPELINE_BLOCK_SIZE = 65536
+
+# Target vectors of a block, by name.
+PIPELINE_TARGETS = {
+    "sun": lambda block: block["s_mod"],
+    "nadir": lambda block: -block["r_teme"],
+    "zenith": lambda block: block["r_teme"],
+    "velocity": lambda block: block["v_teme"],
+    "orbit_normal": lambda block: np.cross(block["r_teme"], block["v_teme"]),
+}
+
+
+def EpochCount(js_start, js_end, step_s):
+    # Number of epochs js_start + k step_s within [js_start, js_end].
+    return int(np.floor((js_end - js_start) / step_s + 1e-9)) + 1
+
+
+def EpochBlocks(js_start, js_end, step_s, block_size=PIPELINE_BLOCK_SIZE):
+    """Generator of (start index, epochs) blocks of js_start + k step_s within
+    [js_start, js_end], block_size epochs at a time (fewer in the last block)."""
+    n_epochs = EpochCount(js_start, js_end, step_s)
+    for start in range(0, n_epochs, block_size):
+        k = np.arange(start, min(start + block_size, n_epochs))
+        yield start, js_start + k * step_s
+
+
+class AttitudeProfile:
+    def __init__(
+        self,
+        orbit,
+        epoch_jsj2000_utc,
+        sun,
+        trajectory,
+        align="sun",
+        constrain="nadir",
+        representation="dcm",
+    ):
+        """Attitude Profile
+        Inputs: 1. orbit: SGP4 (or ChebyshevEphemeris) object with GetOrbitStates(dt_min)
+                2. epoch_jsj2000_utc: epoch of the orbit times [JS from J2000, UTC]
+                3. sun: Sun (or SunTable) object
+                4. trajectory: AlignConstrained object
+                5. align, constrain: name of a PIPELINE_TARGETS vector, or function of
+                   a block returning (n, 3) vectors
+                6. representation: "dcm" or "quaternion" attitudes
+        """
+        self.orbit_ = orbit
+        self.epoch_jsj2000_utc_ = epoch_jsj2000_utc
+        self.sun_ = sun
+        self.trajectory_ = trajectory
+        self.align_ = self._Target(align)
+        self.constrain_ = self._Target(constrain)
+        self.representation_ = representation
+
+    @staticmethod
+    def _Target(target):
+        if callable(target):
+            return target
+        if target not in PIPELINE_TARGETS:
+            raise ValueError(
+                f"Unknown target '{target}', expected a function or one of "
+                f"{list(PIPELINE_TARGETS)}."
+            )
+        return PIPELINE_TARGETS[target]
+
+    def Block(self, js_j2000_utc):
+        # Evaluate every stage of the pipeline at the epochs of one block.
+        block = {"js_j2000_utc": js_j2000_utc}
+        block["r_teme"], block["v_teme"] = self.orbit_.GetOrbitStates(
+            (js_j2000_utc - self.epoch_jsj2000_utc_) / 60.0
+        )
+        block["s_mod"] = self.sun_.GetMODFromJSJ2000UTC(js_j2000_utc)
+        block["a_i"] = self.align_(block)
+        block["c_i"] = self.constrain_(block)
+
+        attitude, block["degenerate"] = self.trajectory_.AttitudeBatch(
+            block["a_i"],
+            block["c_i"],
+            representation=self.representation_,
+            return_degenerate=True,
+        )
+        block["attitude"] = (
+            attitude.q_ if self.representation_ == "quaternion" else attitude
+        )
+
+        return block
+
+    def Blocks(self, js_start, js_end, step_s, block_size=PIPELINE_BLOCK_SIZE):
+        """Generator of (start index, block) of the epochs js_start + k step_s within
+        [js_start, js_end] [JS from J2000, UTC]."""
+        for start, js_j2000_utc in EpochBlocks(js_start, js_end, step_s, block_size):
+            yield start, self.Block(js_j2000_utc)
+
+    def Run(self, js_start, js_end, step_s, sinks, block_size=PIPELINE_BLOCK_SIZE):
+        """Stream the profile through the sinks.
+        Output: List of the result of each sink.
+
+        Comments: Sinks implement Open(n_epochs), Consume(start, block), Close(), which
+                  returns their result, and Abort(), which releases their resources
+                  if the run fails.
+        """
+        n_epochs = EpochCount(js_start, js_end, step_s)
+        opened = []
+        try:
+            for sink in sinks:
+                sink.Open(n_epochs)
+                opened.append(sink)
+
+            for start, block in self.Blocks(js_start, js_end, step_s, block_size):
+                for sink in sinks:
+                    sink.Consume(start, block)
+        except BaseException:
+            # Release the resources of the open sinks before propagating the error.
+            for sink in opened:
+                try:
+                    sink.Abort()
+                except Exception:
+                    pass
+            raise
+
+        return [sink.Close() for sink in sinks]
+
+
+class ReduceSink:
+    def __init__(self, reduce, initial=None):
+        """In-memory reducer: accumulator = reduce(accumulator, block), from initial.
+        Example Call:
+            ReduceSink(lambda n, block: n + np.count_nonzero(block["degenerate"]), 0)
+        """
+        self.reduce_ = reduce
+        self.initial_ = initial
+
+    def Open(self, n_epochs):
+        self.accumulator_ = self.initial_
+
+    def Consume(self, start, block):
+        self.accumulator_ = self.reduce_(self.accumulator_, block)
+
+    def Close(self):
+        return self.accumulator_
+
+    def Abort(self):
+        self.accumulator_ = None
+
+
+class CallbackSink:
+    def __init__(self, callback):
+        # Calls callback(start, block) for every block.
+        self.callback_ = callback
+
+    def Open(self, n_epochs):
+        pass
+
+    def Consume(self, start, block):
+        self.callback_(start, block)
+
+    def Close(self):
+        return None
+
+    def Abort(self):
+        pass
+
+
+class NpyFileSink:
+    def __init__(self, directory, columns=None):
+        """Writes block columns to <directory>/<column>.npy files of the whole profile,
+        through memory maps, such that they can be read back with np.load(mmap_mode="r").
+        Input: 1. columns: names of the columns to write (default: all)
+        """
+        self.directory_ = directory
+        self.columns_ = columns
+
+    def Open(self, n_epochs):
+        os.makedirs(self.directory_, exist_ok=True)
+        self.n_epochs_ = n_epochs
+        self.outputs_ = {}
+
+    def Consume(self, start, block):
+        for column in self.columns_ or list(block):
+            value = block[column]
+            if column not in self.outputs_:
+                self.outputs_[column] = np.lib.format.open_memmap(
+                    os.path.join(self.directory_, column + ".npy"),
+                    mode="w+",
+                    dtype=value.dtype,
+                    shape=(self.n_epochs_,) + value.shape[1:],
+                )
+            self.outputs_[column][start : start + len(value)] = value
+
+    def Close(self):
+        for output in self.outputs_.values():
+            output.flush()
+        paths = {
+            column: os.path.join(self.directory_, column + ".npy")
+            for column in self.outputs_
+        }
+        self.outputs_ = {}
+        return paths
+
+    def Abort(self):
+        # Flush the rows written so far and release the memory maps.
+        self.Close()
+
+
+class TimeSeriesSink:
+    def __init__(self, path, columns=None, compression=None):
+        """Appends blocks as chunks of a time series file (see foundation.timeseries).
+        Input: 1. columns: names of the columns to write (default: all)
+        """
+        self.path_ = path
+        self.columns_ = columns
+        self.compression_ = compression
+
+    def Open(self, n_epochs):
+        self.writer_ = TimeSeriesWriter(self.path_, compression=self.compression_)
+
+    def Consume(self, start, block):
+        columns = self.columns_ or list(block)
+        if "js_j2000_utc" not in columns:
+            columns = ["js_j2000_utc"] + list(columns)
+        self.writer_.Append({column: block[column] for column in columns})
+
+    def Close(self):
+        self.writer_.Close()
+        return self.path_
+
+    def Abort(self):
+        # Close the file with the index of the chunks written so far.
+        self.writer_.Close()